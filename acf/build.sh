@@ -5,6 +5,15 @@ set -e
 # 1. Copies source files to package data directory
 # 2. Builds the package
 # 3. Validates the build
+#
+# Usage: ./build.sh [--archive]
+#   --archive  Ship package data as a single indexed archive (src/acf/data.tar.gz)
+#              instead of loose files under src/acf/data
+
+ARCHIVE=false
+if [ "$1" = "--archive" ]; then
+    ARCHIVE=true
+fi
 
 echo "=== ACF Complete Build Process ==="
 echo "Step 1: Building package data..."
@@ -41,6 +50,14 @@ cp "$REPO_ROOT/CHANGELOG.md" "$PACKAGE_DATA/acf/"
 echo "Copying CLAUDE.md..."
 cp "$REPO_ROOT/CLAUDE.md" "$PACKAGE_DATA/"
 
+PACKAGE_ARCHIVE="$(dirname "$PACKAGE_DATA")/data.tar.gz"
+rm -f "$PACKAGE_ARCHIVE"
+if [ "$ARCHIVE" = true ]; then
+    echo "Packing package data into a single archive..."
+    PYTHONPATH="$(dirname "$(dirname "$PACKAGE_DATA")")" python -m acf.core.archive "$PACKAGE_DATA" "$PACKAGE_ARCHIVE"
+    rm -rf "$PACKAGE_DATA"/{claude,acf,CLAUDE.md}
+fi
+
 echo "Step 1 complete - Package data prepared!"
 
 echo ""
@@ -0,0 +1,125 @@
+"""Single-archive package data format.
+
+The archive is a gzip-compressed tar whose first member is ``index.json``
+listing every file with its size, mode and SHA-256 digest, followed by the
+files in index order. It is read front to back in one pass, straight from
+the wheel through importlib.resources, so the package never needs to be
+unpacked on disk.
+
+Build it from a package data directory with:
+
+    python -m acf.core.archive src/acf/data src/acf/data.tar.gz
+"""
+
+import gzip
+import io
+import json
+import sys
+import tarfile
+from pathlib import Path, PurePosixPath
+
+from .manifest import package_version
+from .source import SourceFile, SourceTree
+
+# Archive location inside the acf package
+ARCHIVE_NAME = "data.tar.gz"
+
+INDEX_NAME = "index.json"
+
+ARCHIVE_FORMAT = 1
+
+
+def build_archive(data_path: Path, archive_path: Path) -> int:
+    """Pack a package data directory into a single indexed archive.
+
+    Output is deterministic: files are sorted and timestamps and owners zeroed.
+
+    Args:
+        data_path: Package data directory with claude/, acf/ and CLAUDE.md
+        archive_path: Archive file to write
+
+    Returns:
+        Number of files packed
+    """
+    tree = SourceTree.from_directory(data_path)
+    index = {
+        "format": ARCHIVE_FORMAT,
+        "version": package_version(),
+        "files": [
+            {"path": f.rel_path, "size": f.size, "mode": f.mode, "digest": f.digest}
+            for f in tree.files
+        ]
+    }
+
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(archive_path, "wb") as raw, \
+            gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as compressed, \
+            tarfile.open(fileobj=compressed, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        _add_member(tar, INDEX_NAME, json.dumps(index, indent=2).encode("utf-8"), 0o644)
+        for f in tree.files:
+            _add_member(tar, f.rel_path, f.content, f.mode)
+    return len(tree.files)
+
+
+def _add_member(tar: tarfile.TarFile, name: str, content: bytes, mode: int):
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    info.mode = mode
+    info.mtime = 0
+    tar.addfile(info, io.BytesIO(content))
+
+
+def read_archive(fileobj) -> SourceTree:
+    """Read an indexed archive into memory in a single sequential pass.
+
+    Args:
+        fileobj: Binary file object positioned at the start of the archive
+
+    Returns:
+        SourceTree with every file listed in the index
+
+    Raises:
+        ValueError: If the archive is malformed or does not match its index
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        members = iter(tar)
+        first = next(members, None)
+        if first is None or first.name != INDEX_NAME:
+            raise ValueError(f"Package archive must start with {INDEX_NAME}")
+        index = json.loads(tar.extractfile(first).read())
+        if index.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"Unsupported package archive format: {index.get('format')}")
+
+        entries = {entry["path"]: entry for entry in index["files"]}
+        files = []
+        for member in members:
+            entry = entries.get(member.name)
+            if entry is None or not member.isfile():
+                raise ValueError(f"Unexpected member in package archive: {member.name}")
+            path = PurePosixPath(member.name)
+            if path.is_absolute() or ".." in path.parts:
+                raise ValueError(f"Unsafe path in package archive: {member.name}")
+
+            source = SourceFile(member.name, tar.extractfile(member).read(), entry["mode"])
+            if source.digest != entry["digest"]:
+                raise ValueError(f"Digest mismatch in package archive: {member.name}")
+            files.append(source)
+
+    if len(files) != len(entries):
+        raise ValueError(f"Package archive is incomplete: {len(files)} of {len(entries)} files")
+    return SourceTree(files)
+
+
+def main(argv: list = None):
+    """Build an archive: python -m acf.core.archive DATA_DIR ARCHIVE."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m acf.core.archive DATA_DIR ARCHIVE", file=sys.stderr)
+        return 2
+    count = build_archive(Path(argv[0]), Path(argv[1]))
+    print(f"Packed {count} files into {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
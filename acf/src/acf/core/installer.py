@@ -1,18 +1,45 @@
 """ACF installation logic."""
 
+import os
 import shutil
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from importlib import resources
 import click
 
+from .manifest import MANIFEST_NAME, Manifest, file_digest, write_atomic
+from .source import SourceTree, write_file
+
+# importlib.resources, the archive reader (tarfile/gzip), the link and copy
+# helpers, tempfile and the thread pool are imported where they are used, so
+# that commands which never resolve package data (status) don't pay for them
+# at startup.
+
+
 class ACFInstaller:
     """Handles ACF configuration installation."""
     
-    def __init__(self, target_dir: Path = None):
-        """Initialize installer with target directory."""
+    def __init__(self, target_dir: Path = None, copy_workers: int = None):
+        """Initialize installer with target directory.
+        
+        Args:
+            target_dir: Directory to install into (default: current directory)
+            copy_workers: Threads used to copy files (default: DEFAULT_COPY_WORKERS)
+        """
         self.target_dir = target_dir or Path.cwd()
         self.claude_dir = self.target_dir / ".claude"
         self.acf_dir = self.target_dir / ".acf"
+        self.copy_workers = copy_workers
+        self.timings = {}
+    
+    @contextmanager
+    def _phase(self, name: str):
+        """Accumulate wall time of an install phase into self.timings."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
     
     def get_package_data_path(self) -> Path:
         """Get path to bundled package data."""
@@ -23,6 +50,7 @@ class ACFInstaller:
             return data_path
         
         # Then try importlib.resources for installed package
+        from importlib import resources
         try:
             import acf.data
             data_files = resources.files("acf.data")
@@ -35,27 +63,76 @@ class ACFInstaller:
         except Exception as e:
             raise FileNotFoundError(f"Package data not found. Tried:\n1. Development path: {data_path}\n2. Package resources. Error: {e}")
     
-    def install(self) -> bool:
-        """Install ACF configuration to target directory."""
+    def get_package_archive(self):
+        """Get the bundled single-file data archive, or None if the package ships loose files."""
+        from importlib import resources
+        from .archive import ARCHIVE_NAME
         try:
-            click.echo(f"🚀 Installing ACF configuration to: {self.target_dir}")
-            
-            # Get package data
-            data_path = self.get_package_data_path()
+            archive = resources.files("acf").joinpath(ARCHIVE_NAME)
+            return archive if archive.is_file() else None
+        except Exception:
+            return None
+    
+    def get_source_tree(self, verbose: bool = True) -> SourceTree:
+        """Get all packaged files: read into memory from the archive when one is bundled, else from disk on demand."""
+        archive = self.get_package_archive()
+        if archive is not None:
+            from .archive import read_archive
+            if verbose:
+                click.echo(f"📦 Using package archive: {archive}")
+            with archive.open("rb") as f:
+                return read_archive(f)
+        
+        data_path = self.get_package_data_path()
+        if verbose:
             click.echo(f"📦 Using package data from: {data_path}")
+        return SourceTree.from_directory(data_path)
+    
+    def plan_install(self, tree: SourceTree = None) -> dict:
+        """Compute what a forced install would change, without writing anything.
+        
+        Args:
+            tree: Packaged files, read from package data if not given
             
-            # Create target directories
-            self._create_directories()
+        Returns:
+            Plan from acf.core.plan.plan_install plus "installed", whether the
+            target already has a configuration (a plain install would skip it)
+        """
+        from .plan import plan_install
+        
+        tree = tree or self.get_source_tree(verbose=False)
+        plan = plan_install(tree, self.target_dir)
+        plan["installed"] = self.claude_dir.exists() or self.acf_dir.exists()
+        return plan
+    
+    def install(self, link_mode: str = "copy") -> bool:
+        """Install ACF configuration to target directory.
+        
+        Args:
+            link_mode: "copy", or "hardlink", "reflink" or "symlink" to share
+                packaged files instead of copying them (falls back to copying
+                where unsupported)
+        """
+        try:
+            click.echo(f"🚀 Installing ACF configuration to: {self.target_dir}")
             
-            # Install Claude Code files
-            self._install_claude_files(data_path)
+            self.timings = {}
+            with self._phase("resolve"):
+                if link_mode != "copy" and self.get_package_archive() is not None:
+                    click.echo(f"  • Package data is archived, --link-mode {link_mode} falls back to copying")
+                tree = self.get_source_tree()
             
-            # Install ACF files
-            self._install_acf_files(data_path)
+            result = self.install_tree(tree, force=True, link_mode=link_mode)
+            if result["status"] != "installed":
+                raise RuntimeError(result["error"])
             
-            # Install CLAUDE.md
-            self._install_claude_md(data_path)
+            for directory, name in tree.top_level_items():
+                click.echo(f"  • Installed: {directory}/{name}")
+            methods = ", ".join(f"{count} {method}" for method, count in sorted(result["methods"].items()))
+            click.echo(f"  • Installed {result['files']} files ({result['bytes'] / 1024:.1f} KB; {methods})")
             
+            timings = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.timings.items())
+            click.echo(f"⏱️  Timing: {timings}")
             click.echo("✅ Installation completed successfully!")
             return True
             
@@ -63,65 +140,238 @@ class ACFInstaller:
             click.echo(f"❌ Installation failed: {e}", err=True)
             return False
     
-    def _create_directories(self):
-        """Create target directories."""
-        click.echo("📁 Creating directories...")
-        self.claude_dir.mkdir(exist_ok=True)
-        self.acf_dir.mkdir(exist_ok=True)
-        click.echo(f"  • Created: {self.claude_dir}")
-        click.echo(f"  • Created: {self.acf_dir}")
-    
-    def _install_claude_files(self, data_path: Path):
-        """Install Claude Code recognized files to .claude/"""
-        click.echo("🤖 Installing Claude Code files...")
-        claude_source = data_path / "claude"
-        
-        if not claude_source.exists():
-            raise FileNotFoundError(f"Claude source not found: {claude_source}")
-        
-        # Copy all files from claude/ to .claude/
-        for item in claude_source.iterdir():
-            target = self.claude_dir / item.name
-            if item.is_dir():
-                if target.exists():
-                    shutil.rmtree(target)
-                shutil.copytree(item, target)
-                click.echo(f"  • Copied directory: {item.name}")
-            else:
-                shutil.copy2(item, target)
-                click.echo(f"  • Copied file: {item.name}")
-    
-    def _install_acf_files(self, data_path: Path):
-        """Install ACF-managed files to .acf/"""
-        click.echo("🔧 Installing ACF files...")
-        acf_source = data_path / "acf"
-        
-        if not acf_source.exists():
-            raise FileNotFoundError(f"ACF source not found: {acf_source}")
-        
-        # Copy all files from acf/ to .acf/
-        for item in acf_source.iterdir():
-            target = self.acf_dir / item.name
-            if item.is_dir():
-                if target.exists():
-                    shutil.rmtree(target)
-                shutil.copytree(item, target)
-                click.echo(f"  • Copied directory: {item.name}")
+    def install_tree(self, tree: SourceTree, force: bool = False, link_mode: str = "copy") -> dict:
+        """Install from an in-memory source tree without printing per-file output.
+        
+        Used for bulk installs, where one SourceTree is shared by many targets.
+        Replaces the same top-level items as install() and writes the manifest.
+        
+        Args:
+            tree: Packaged files read once by the caller
+            force: Overwrite an existing installation
+            link_mode: One of LINK_MODES; files without an on-disk source are copied
+            
+        Returns:
+            Summary dict with target, status ("installed", "skipped" or "failed"),
+            files, bytes, methods (count per placement method), duration_ms and error
+        """
+        start = time.perf_counter()
+        summary = {"target": str(self.target_dir), "status": "failed", "files": 0, "bytes": 0, "methods": {}, "error": None}
+        try:
+            if not self.target_dir.is_dir():
+                raise FileNotFoundError(f"Target directory does not exist: {self.target_dir}")
+            if not force and (self.claude_dir.exists() or self.acf_dir.exists()):
+                summary["status"] = "skipped"
+                summary["error"] = "ACF configuration already exists (use --force to overwrite)"
+                return summary
+            if not any(f.rel_path == "CLAUDE.md" for f in tree.files):
+                raise FileNotFoundError("CLAUDE.md not found in package data")
+            
+            summary["methods"] = self._stage_and_swap(tree.files, link_mode)
+            
+            with self._phase("manifest"):
+                manifest = Manifest()
+                for source in tree.files:
+                    # Linked files are never read, so they are recorded by stat only
+                    digest = None if link_mode != "copy" and source.path is not None else source.digest
+                    manifest.record(source.rel_path, self.target_dir / source.rel_path, digest)
+                    summary["files"] += 1
+                    summary["bytes"] += source.size
+                manifest.save(self.acf_dir / MANIFEST_NAME)
+            
+            summary["status"] = "installed"
+        except Exception as e:
+            summary["error"] = str(e)
+        finally:
+            summary["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return summary
+    
+    def _stage_and_swap(self, files: list, link_mode: str = "copy") -> dict:
+        """Install files by staging them and then swapping each top-level item into place.
+        
+        This is the one install engine. Files are placed in a staging directory
+        next to .claude and .acf, in parallel. Only once everything is staged
+        are the top-level items (e.g. .claude/agents, CLAUDE.md) renamed into
+        place, so a failure or interruption while placing files leaves the
+        existing installation untouched. A failed rename rolls back the items
+        already swapped. Staging left behind by a crashed run is removed first.
+        
+        Args:
+            files: SourceFile objects with paths relative to the target directory
+            link_mode: One of LINK_MODES; files without an on-disk source are written
+            
+        Returns:
+            Count per placement method actually used
+        """
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        from . import copier
+        from .linking import place_file
+        
+        self._remove_stale_staging()
+        
+        def place(source):
+            staged = staging / source.rel_path
+            if link_mode != "copy" and source.path is not None:
+                return place_file(source.path, staged, link_mode)
+            if source.path is not None:
+                # Kernel copy straight from the package; keeps the packaged mtime,
+                # which lets plan_install() skip hashing untouched files
+                copier.copy_file(source.path, staged)
             else:
-                shutil.copy2(item, target)
-                click.echo(f"  • Copied file: {item.name}")
+                # Archived files have no meaningful mtime (archives are built with
+                # mtime 0), so they get the install time and plans compare digests
+                write_file(staged, source.content, source.mode)
+            return "copy"
+        
+        # Top-level items as in SourceTree.top_level_items(), plus root files such as CLAUDE.md
+        items = sorted({"/".join(f.rel_path.split("/")[:2]) for f in files})
+        staging = Path(tempfile.mkdtemp(prefix=".acf-staging-", dir=self.target_dir))
+        replaced = Path(tempfile.mkdtemp(prefix=".acf-replaced-", dir=self.target_dir))
+        try:
+            with self._phase("copy"):
+                for directory in sorted({(staging / f.rel_path).parent for f in files}):
+                    directory.mkdir(parents=True, exist_ok=True)
+                workers = self.copy_workers or copier.DEFAULT_COPY_WORKERS
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # list() propagates the first placement error
+                    placed = list(executor.map(place, files))
+            
+            with self._phase("swap"):
+                swapped = []
+                try:
+                    for item in items:
+                        target = self.target_dir / item
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        had_target = target.exists() or target.is_symlink()
+                        if had_target:
+                            (replaced / item).parent.mkdir(parents=True, exist_ok=True)
+                            os.rename(target, replaced / item)
+                        os.rename(staging / item, target)
+                        swapped.append((item, had_target))
+                except BaseException:
+                    for item, had_target in reversed(swapped):
+                        os.rename(self.target_dir / item, staging / item)
+                        if had_target:
+                            os.rename(replaced / item, self.target_dir / item)
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(replaced, ignore_errors=True)
+        
+        methods = {}
+        for method in placed:
+            methods[method] = methods.get(method, 0) + 1
+        return methods
+    
+    def _remove_stale_staging(self):
+        """Remove staging directories left by an interrupted install.
+        
+        Older versions staged inside .claude and .acf themselves, so look there too.
+        """
+        for directory in (self.target_dir, self.claude_dir, self.acf_dir):
+            for pattern in (".acf-staging-*", ".acf-replaced-*"):
+                for stale in directory.glob(pattern):
+                    shutil.rmtree(stale, ignore_errors=True)
+    
+    def sync(self) -> dict:
+        """Incrementally sync ACF configuration into the target directory.
+        
+        Files are compared by content digest and only added or changed files
+        are rewritten, each atomically. Files that a previous install recorded
+        in the manifest but that are no longer shipped are removed; files ACF
+        did not install are never touched.
+        
+        Returns:
+            Counts of added, changed, removed and unchanged files, or None on failure
+        """
+        try:
+            click.echo(f"🔄 Syncing ACF configuration to: {self.target_dir}")
+            
+            tree = self.get_source_tree()
+            
+            manifest_path = self.acf_dir / MANIFEST_NAME
+            old_manifest = Manifest.load(manifest_path)
+            new_manifest = Manifest()
+            counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+            
+            for source in tree.files:
+                rel_path, digest = source.rel_path, source.digest
+                target = self.target_dir / rel_path
+                
+                if not target.exists():
+                    action = "added"
+                elif self._is_unchanged(old_manifest, rel_path, target, digest):
+                    action = "unchanged"
+                else:
+                    action = "changed"
+                
+                if action != "unchanged":
+                    write_atomic(target, source.content, source.mode)
+                    click.echo(f"  • {action.capitalize()}: {rel_path}")
+                counts[action] += 1
+                new_manifest.record(rel_path, target, digest)
+            
+            for rel_path, entry in old_manifest.files.items():
+                if rel_path in new_manifest.files:
+                    continue
+                if self._remove_installed_file(rel_path, entry):
+                    counts["removed"] += 1
+            
+            new_manifest.save(manifest_path)
+            
+            click.echo(
+                f"✅ Sync completed: {counts['added']} added, {counts['changed']} changed, "
+                f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+            )
+            return counts
+            
+        except Exception as e:
+            click.echo(f"❌ Sync failed: {e}", err=True)
+            return None
+    
+    def _is_unchanged(self, manifest: Manifest, rel_path: str, target: Path, digest: str) -> bool:
+        """Check whether an existing target already has the source content."""
+        entry = manifest.files.get(rel_path)
+        if entry and entry.get("digest") == digest and manifest.matches_stat(rel_path, target):
+            # Untouched since the last sync, no need to read it again
+            return True
+        return target.is_file() and file_digest(target) == digest
     
-    def _install_claude_md(self, data_path: Path):
-        """Install CLAUDE.md to project root."""
-        click.echo("📄 Installing CLAUDE.md...")
-        claude_md_source = data_path / "CLAUDE.md"
+    def _remove_installed_file(self, rel_path: str, entry: dict) -> bool:
+        """Remove a file recorded in the manifest unless it was modified locally."""
+        if Path(rel_path).is_absolute() or ".." in Path(rel_path).parts:
+            return False
+        target = self.target_dir / rel_path
+        if not target.is_file():
+            return False
+        if file_digest(target) != entry.get("digest"):
+            click.echo(f"  • Kept locally modified file: {rel_path}")
+            return False
         
-        if not claude_md_source.exists():
-            raise FileNotFoundError(f"CLAUDE.md not found: {claude_md_source}")
+        target.unlink()
+        click.echo(f"  • Removed: {rel_path}")
+        
+        # Prune directories left empty, staying inside .claude/ and .acf/
+        parent = target.parent
+        while parent not in (self.target_dir, self.claude_dir, self.acf_dir) and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+        return True
+    
+    def verify_installation(self, full: bool = False) -> dict:
+        """Verify installed files against the manifest.
         
-        claude_md_target = self.target_dir / "CLAUDE.md"
-        shutil.copy2(claude_md_source, claude_md_target)
-        click.echo(f"  • Installed: CLAUDE.md")
+        Args:
+            full: Recompute content digests instead of comparing size and mtime
+            
+        Returns:
+            Verification result from Manifest.verify, or None if there is no manifest
+        """
+        manifest = Manifest.read(self.acf_dir / MANIFEST_NAME)
+        if manifest is None:
+            return None
+        return manifest.verify(self.target_dir, full=full)
     
     def get_installation_status(self) -> dict:
         """Get current installation status."""
@@ -147,4 +397,34 @@ class ACFInstaller:
                 if f.is_file() or f.is_dir()
             ]
         
-        return status
\ No newline at end of file
+        return status
+
+
+def install_targets(targets: list, force: bool = False, max_workers: int = None, link_mode: str = "copy") -> list:
+    """Install ACF configuration into many target directories at once.
+    
+    Package data (archive or loose files) is read into memory a single time, then written
+    to all targets concurrently by a thread pool.
+    
+    Args:
+        targets: Target directories
+        force: Overwrite existing installations
+        max_workers: Thread pool size (default: min(8, number of targets))
+        link_mode: One of LINK_MODES
+        
+    Returns:
+        One install_tree() summary per target, in input order
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from .copier import DEFAULT_COPY_WORKERS
+    
+    tree = ACFInstaller().get_source_tree()
+    
+    max_workers = max_workers or min(8, len(targets)) or 1
+    # Each target also copies in parallel; share the copy threads between targets
+    copy_workers = max(2, DEFAULT_COPY_WORKERS // max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda target: ACFInstaller(Path(target), copy_workers).install_tree(tree, force=force, link_mode=link_mode),
+            targets
+        ))
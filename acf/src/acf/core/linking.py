@@ -0,0 +1,95 @@
+"""Placing packaged files into a target by copy, hardlink, reflink or symlink."""
+
+import errno
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LINK_MODES = ("copy", "hardlink", "reflink", "symlink")
+
+# Hardlinks and symlinks share the file itself with the installed package, so an
+# in-place edit in one target changes the package and every other linked target
+SHARED_LINK_MODES = ("hardlink", "symlink")
+
+SHARED_LINK_MODE_WARNING = (
+    "Hardlinked and symlinked files are the packaged files themselves: editing "
+    ".claude/settings.json, CLAUDE.md or any other installed file in place also "
+    "changes site-packages and every other target linked to it, and sync and "
+    "verify then report those files as unchanged. Use copy or reflink if you "
+    "intend to edit the configuration."
+)
+
+# ioctl request number of FICLONE on Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem or platform can't do that", as opposed to real I/O failures
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EPERM, errno.EACCES, errno.EINVAL, errno.ENOTTY,
+    errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.ENOSYS, errno.EMLINK
+}
+
+# What to try, in order, for each requested mode
+_FALLBACKS = {
+    "copy": ("copy",),
+    "hardlink": ("hardlink", "reflink", "copy"),
+    "reflink": ("reflink", "copy"),
+    "symlink": ("symlink", "copy"),
+}
+
+
+def reflink(source: Path, target: Path):
+    """Clone source into target sharing data blocks (copy-on-write).
+
+    Raises:
+        OSError: If the platform or filesystem does not support reflinks
+    """
+    if fcntl is None or not hasattr(fcntl, "ioctl"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(target)
+            raise
+    shutil.copystat(source, target)
+
+
+def place_file(source: Path, target: Path, link_mode: str = "copy") -> str:
+    """Place source at target, falling back to the next method when one is unsupported.
+
+    Hardlinks fall back to reflinks and then copies; reflinks and symlinks fall
+    back to copies. Any existing target is replaced.
+
+    Args:
+        source: Packaged file on disk
+        target: Destination path
+        link_mode: One of LINK_MODES
+
+    Returns:
+        The method actually used
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists() or target.is_symlink():
+        target.unlink()
+
+    for method in _FALLBACKS[link_mode][:-1]:
+        try:
+            if method == "hardlink":
+                os.link(source, target)
+            elif method == "reflink":
+                reflink(source, target)
+            else:
+                os.symlink(os.path.abspath(source), target)
+            return method
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+
+    shutil.copy2(source, target)
+    return "copy"
@@ -0,0 +1,165 @@
+"""Manifest of files installed by ACF."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Manifest location inside the .acf/ directory
+MANIFEST_NAME = "manifest.json"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def package_version() -> str:
+    """Return the installed ai-code-forge version."""
+    from importlib import metadata
+    
+    try:
+        return metadata.version("ai-code-forge")
+    except metadata.PackageNotFoundError:
+        from .. import __version__
+        return __version__
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_atomic(target: Path, content: bytes, mode: int):
+    """Write content to target through a temporary file renamed into place.
+
+    Readers never observe a partially written target.
+    """
+    import tempfile
+    
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class Manifest:
+    """Files installed by ACF, keyed by path relative to the target directory."""
+
+    def __init__(self, files: dict = None, version: str = None):
+        """Initialize manifest.
+
+        Args:
+            files: Entries of the form {path: {digest, size, mtime_ns}}; digest
+                is None for files installed by a link mode without reading them
+            version: Package version that installed the files
+        """
+        self.files = files or {}
+        self.version = version or package_version()
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        """Load a manifest, returning an empty one if it is missing or unreadable."""
+        manifest = cls.read(path)
+        return manifest if manifest is not None else cls()
+
+    @classmethod
+    def read(cls, path: Path) -> "Manifest":
+        """Load a manifest, returning None if it is missing or unreadable."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return cls(dict(data["files"]), data.get("version") or "unknown")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(self, path: Path):
+        """Write the manifest atomically."""
+        import tempfile
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps({"version": self.version, "files": self.files}, indent=2, sort_keys=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def record(self, rel_path: str, path: Path, digest: str):
+        """Record an installed file with its digest and current stat."""
+        stat = path.stat()
+        self.files[rel_path] = {"digest": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def matches_stat(self, rel_path: str, path: Path) -> bool:
+        """Check whether a file still has the size and mtime recorded for it."""
+        entry = self.files.get(rel_path)
+        if entry is None:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+    def verify(self, target_dir: Path, full: bool = False, max_workers: int = None) -> dict:
+        """Check installed files against the manifest.
+
+        The default stat-only mode compares size and mtime and reads no file
+        contents. Full mode recomputes every digest in a thread pool.
+
+        Args:
+            target_dir: Directory the manifest paths are relative to
+            full: Compare content digests instead of stat results
+            max_workers: Thread pool size for full mode
+
+        Returns:
+            Dict with version, mode, file count and sorted missing/modified paths
+        """
+        missing = []
+        modified = []
+        present = []
+        for rel_path, entry in self.files.items():
+            path = target_dir / rel_path
+            try:
+                stat = path.stat()
+            except OSError:
+                missing.append(rel_path)
+                continue
+            if full:
+                present.append((rel_path, path, entry))
+            elif stat.st_size != entry.get("size") or stat.st_mtime_ns != entry.get("mtime_ns"):
+                modified.append(rel_path)
+
+        if full:
+            from concurrent.futures import ThreadPoolExecutor
+            
+            def is_modified(item):
+                rel_path, path, entry = item
+                if entry.get("digest") is None:
+                    # Linked files are recorded by stat only
+                    stat = path.stat()
+                    return stat.st_size != entry.get("size") or stat.st_mtime_ns != entry.get("mtime_ns")
+                return file_digest(path) != entry.get("digest")
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                flags = list(executor.map(is_modified, present))
+            modified = [item[0] for item, flag in zip(present, flags) if flag]
+
+        return {
+            "version": self.version,
+            "mode": "full" if full else "stat",
+            "files": len(self.files),
+            "missing": sorted(missing),
+            "modified": sorted(modified)
+        }
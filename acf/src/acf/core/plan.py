@@ -0,0 +1,82 @@
+"""Dry-run planning: what an install would change in a target, without writing anything."""
+
+import os
+from pathlib import Path
+
+from .manifest import file_digest
+from .source import SourceTree
+
+PLAN_ACTIONS = ("create", "overwrite", "unchanged", "delete")
+
+
+def _walk_files(root: Path, rel_root: str):
+    """Yield (relative path, path) of every file under root, streaming with os.scandir."""
+    stack = [(str(root), rel_root)]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = f"{rel_dir}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, rel_path))
+                    else:
+                        yield rel_path, Path(entry.path)
+        except NotADirectoryError:
+            yield rel_dir, Path(directory)
+
+
+def _compare(source, target: Path) -> str:
+    """Classify one packaged file against the target: size, then mtime, then digest."""
+    try:
+        target_stat = target.stat()
+    except FileNotFoundError:
+        return "create"
+    if target_stat.st_size != source.size:
+        return "overwrite"
+    if source.path is not None:
+        # Only loose package files are copied with their mtime; archived files are
+        # written with the install time, so for them only the digest is conclusive
+        try:
+            if source.path.stat().st_mtime_ns == target_stat.st_mtime_ns:
+                # Same size and the packaged mtime means an untouched copy
+                return "unchanged"
+        except OSError:
+            pass
+    return "unchanged" if file_digest(target) == source.digest else "overwrite"
+
+
+def plan_install(tree: SourceTree, target_dir: Path) -> dict:
+    """Compute what installing tree into target_dir would do.
+
+    Mirrors install(): every packaged file is created or overwritten, and each
+    packaged top-level item (e.g. .claude/agents) is replaced as a whole, so
+    files inside it that are no longer shipped are deleted. Nothing is written.
+
+    Args:
+        tree: Packaged files
+        target_dir: Target directory
+
+    Returns:
+        Dict with target, summary (count per action) and files, a list of
+        {"path", "action"} sorted by path
+    """
+    actions = {source.rel_path: _compare(source, target_dir / source.rel_path) for source in tree.files}
+
+    for directory, name in tree.top_level_items():
+        root = target_dir / directory / name
+        if not (root.exists() or root.is_symlink()):
+            continue
+        for rel_path, _ in _walk_files(root, f"{directory}/{name}"):
+            if rel_path not in actions:
+                actions[rel_path] = "delete"
+
+    summary = {action: 0 for action in PLAN_ACTIONS}
+    for action in actions.values():
+        summary[action] += 1
+
+    return {
+        "target": str(target_dir),
+        "summary": summary,
+        "files": [{"path": path, "action": actions[path]} for path in sorted(actions)]
+    }
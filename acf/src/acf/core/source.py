@@ -0,0 +1,112 @@
+"""Packaged ACF source files, walked from disk or held in memory."""
+
+import hashlib
+import os
+from pathlib import Path
+
+from .manifest import MANIFEST_NAME, file_digest
+
+# Package data directories and where they are installed in a target
+SOURCE_DIRS = [("claude", ".claude"), ("acf", ".acf")]
+
+
+def iter_source_files(data_path: Path):
+    """Yield (path relative to target directory, source path) for every packaged file."""
+    for source_name, target_name in SOURCE_DIRS:
+        source_root = data_path / source_name
+        if not source_root.exists():
+            raise FileNotFoundError(f"{source_name.upper()} source not found: {source_root}")
+        for source in sorted(source_root.rglob("*")):
+            if source.is_file():
+                rel_path = f"{target_name}/{source.relative_to(source_root).as_posix()}"
+                if rel_path != f".acf/{MANIFEST_NAME}":
+                    yield rel_path, source
+
+    claude_md_source = data_path / "CLAUDE.md"
+    if claude_md_source.exists():
+        yield "CLAUDE.md", claude_md_source
+
+
+class SourceFile:
+    """One packaged file, held in memory (archives) or read from disk on demand (loose files)."""
+
+    __slots__ = ("rel_path", "_content", "mode", "_digest", "size", "path")
+
+    def __init__(self, rel_path: str, content: bytes, mode: int = 0o644, path: Path = None):
+        """Initialize source file.
+
+        Args:
+            rel_path: Path relative to the target directory
+            content: File content
+            mode: Permission bits
+            path: Packaged file on disk, if any; needed for link install modes
+        """
+        self.rel_path = rel_path
+        self._content = content
+        self.mode = mode
+        self._digest = hashlib.sha256(content).hexdigest()
+        self.size = len(content)
+        self.path = path
+    
+    @classmethod
+    def from_stat(cls, rel_path: str, path: Path) -> "SourceFile":
+        """Describe a packaged file on disk by its stat; content and digest are read on first use."""
+        stat = path.stat()
+        source = cls.__new__(cls)
+        source.rel_path = rel_path
+        source._content = None
+        source.mode = stat.st_mode & 0o7777
+        source._digest = None
+        source.size = stat.st_size
+        source.path = path
+        return source
+    
+    @property
+    def content(self) -> bytes:
+        """File content, read from disk on each access for loose files."""
+        if self._content is None:
+            return self.path.read_bytes()
+        return self._content
+    
+    @property
+    def digest(self) -> str:
+        """SHA-256 hex digest of the content, computed once."""
+        if self._digest is None:
+            # Streamed, so loose files are never held in memory
+            self._digest = file_digest(self.path)
+        return self._digest
+
+
+class SourceTree:
+    """The complete set of packaged files, read once and reusable for any number of targets."""
+
+    def __init__(self, files: list):
+        """Initialize source tree from SourceFile objects."""
+        self.files = files
+
+    @classmethod
+    def from_directory(cls, data_path: Path) -> "SourceTree":
+        """Describe every packaged file under data_path; nothing is read until needed."""
+        return cls([SourceFile.from_stat(rel_path, source) for rel_path, source in iter_source_files(data_path)])
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of all files in bytes."""
+        return sum(f.size for f in self.files)
+
+    def top_level_items(self) -> list:
+        """Return the (directory, name) pairs an install replaces, e.g. (".claude", "agents")."""
+        items = set()
+        for f in self.files:
+            parts = f.rel_path.split("/")
+            if len(parts) > 1:
+                items.add((parts[0], parts[1]))
+        return sorted(items)
+
+
+def write_file(target: Path, content: bytes, mode: int):
+    """Write content to target with the given permission bits."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(content)
+    os.chmod(target, mode)
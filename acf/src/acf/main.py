@@ -1,8 +1,14 @@
 """Main CLI entry point."""
 
+import os
+import sys
 import click
 from pathlib import Path
-from .core.installer import ACFInstaller
+from .core.linking import LINK_MODES, SHARED_LINK_MODE_WARNING, SHARED_LINK_MODES
+
+# acf.core.installer is imported inside the commands that use it, so that
+# argument parsing and --help stay fast.
+
 
 @click.group()
 @click.version_option(version="0.2.0", package_name="ai-code-forge")
@@ -13,15 +19,46 @@ def main():
 @main.command()
 @click.option("--target", "-t", type=click.Path(), help="Target directory (default: current directory)")
 @click.option("--force", "-f", is_flag=True, help="Overwrite existing files")
-def install(target, force):
+@click.option("--targets-from", type=click.File("r"), help="Install into every directory listed in FILE (one per line, '-' for stdin)")
+@click.option("--targets", "target_globs", multiple=True, help="Install into every directory matching a glob (repeatable)")
+@click.option("--jobs", "-j", type=click.IntRange(min=1), help="Parallel workers for bulk installs (default: up to 8)")
+@click.option("--link-mode", type=click.Choice(LINK_MODES), default="copy", show_default=True,
+              help="Share packaged files instead of copying them; falls back to copy where unsupported. "
+                   "hardlink and symlink share the files themselves: editing an installed file in place "
+                   "changes the installed package and every other linked target, and sync/verify "
+                   "cannot detect it. reflink shares data copy-on-write and is safe to edit")
+@click.option("--dry-run", is_flag=True, help="Show what would be created, overwritten or deleted without writing")
+@click.option("--json", "as_json", is_flag=True, help="With --dry-run, print the plan as JSON")
+def install(target, force, targets_from, target_globs, jobs, link_mode, dry_run, as_json):
     """Install AI Code Forge configuration."""
+    if as_json and not dry_run:
+        raise click.UsageError("--json requires --dry-run")
+    
+    if link_mode in SHARED_LINK_MODES and not dry_run:
+        click.echo(f"⚠️  --link-mode {link_mode}: {SHARED_LINK_MODE_WARNING}", err=True)
+    
+    if targets_from or target_globs:
+        if target:
+            raise click.UsageError("--target cannot be combined with --targets-from or --targets")
+        if dry_run:
+            _dry_run(_collect_targets(targets_from, target_globs), force, as_json, bulk=True)
+            return
+        _install_bulk(_collect_targets(targets_from, target_globs), force, jobs, link_mode)
+        return
+    
     target_dir = Path(target) if target else Path.cwd()
     
     if not target_dir.exists():
         click.echo(f"❌ Target directory does not exist: {target_dir}", err=True)
         return
     
+    if dry_run:
+        _dry_run([target_dir], force, as_json)
+        return
+    
     # Check if already installed
+    from .core.installer import ACFInstaller
+    
     installer = ACFInstaller(target_dir)
     status = installer.get_installation_status()
     
@@ -35,7 +72,7 @@ def install(target, force):
         click.echo("🔄 Force installation - overwriting existing files")
     
     # Perform installation
-    success = installer.install()
+    success = installer.install(link_mode=link_mode)
     if success:
         click.echo("")
         click.echo("🎉 Ready to use! Your directory now includes:")
@@ -43,12 +80,115 @@ def install(target, force):
         click.echo("  • .acf/ - ACF tools and templates")  
         click.echo("  • CLAUDE.md - Core operational rules")
 
+def _dry_run(targets: list, force: bool, as_json: bool, bulk: bool = False):
+    """Print the install plan for each target without writing anything."""
+    from .core.installer import ACFInstaller
+    
+    try:
+        tree = ACFInstaller().get_source_tree(verbose=False)
+        plans = [ACFInstaller(Path(t)).plan_install(tree) for t in targets]
+    except Exception as e:
+        click.echo(f"❌ Planning failed: {e}", err=True)
+        sys.exit(1)
+    
+    if as_json:
+        import json
+        click.echo(json.dumps(plans if bulk else plans[0], indent=2))
+        return
+    
+    markers = {"create": "+", "overwrite": "~", "delete": "-"}
+    for plan in plans:
+        summary = plan["summary"]
+        click.echo(f"📋 Install plan for: {plan['target']}")
+        click.echo(
+            f"  {summary['create']} create, {summary['overwrite']} overwrite, "
+            f"{summary['unchanged']} unchanged, {summary['delete']} delete"
+        )
+        if plan["installed"] and not force:
+            click.echo("  ⚠️  Already installed - nothing is written without --force")
+        for entry in plan["files"]:
+            if entry["action"] in markers:
+                click.echo(f"  {markers[entry['action']]} {entry['path']}")
+        click.echo("")
+
+def _collect_targets(targets_from, target_globs) -> list:
+    """Read target directories from a file and glob patterns, without duplicates."""
+    targets = []
+    if targets_from:
+        for line in targets_from:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                targets.append(line)
+    import glob
+    
+    for pattern in target_globs:
+        targets.extend(sorted(p for p in glob.glob(os.path.expanduser(pattern)) if os.path.isdir(p)))
+    
+    seen = set()
+    unique = []
+    for t in targets:
+        key = os.path.abspath(t)
+        if key not in seen:
+            seen.add(key)
+            unique.append(t)
+    return unique
+
+def _install_bulk(targets: list, force: bool, jobs: int, link_mode: str):
+    """Install into many targets and exit non-zero if any of them failed."""
+    if not targets:
+        click.echo("❌ No target directories found", err=True)
+        sys.exit(1)
+    
+    from .core.installer import install_targets
+    
+    click.echo(f"🚀 Installing ACF configuration into {len(targets)} targets...")
+    try:
+        results = install_targets(targets, force=force, max_workers=jobs, link_mode=link_mode)
+    except Exception as e:
+        click.echo(f"❌ Installation failed: {e}", err=True)
+        sys.exit(1)
+    
+    for result in results:
+        if result["status"] == "installed":
+            methods = ", ".join(f"{count} {method}" for method, count in sorted(result["methods"].items()))
+            click.echo(f"  ✅ {result['target']}: {result['files']} files ({methods}), {result['bytes'] / 1024:.1f} KB in {result['duration_ms']:.0f} ms")
+        elif result["status"] == "skipped":
+            click.echo(f"  ⏭️  {result['target']}: {result['error']}")
+        else:
+            click.echo(f"  ❌ {result['target']}: {result['error']}", err=True)
+    
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("installed", "skipped", "failed")}
+    click.echo("")
+    click.echo(f"📊 {counts['installed']} installed, {counts['skipped']} skipped, {counts['failed']} failed")
+    if counts["failed"]:
+        sys.exit(1)
+
 @main.command()
 @click.option("--target", "-t", type=click.Path(), help="Target directory (default: current directory)")
-def status(target):
+def sync(target):
+    """Update AI Code Forge configuration, rewriting only changed files."""
+    target_dir = Path(target) if target else Path.cwd()
+    
+    if not target_dir.exists():
+        click.echo(f"❌ Target directory does not exist: {target_dir}", err=True)
+        sys.exit(1)
+    
+    from .core.installer import ACFInstaller
+    
+    installer = ACFInstaller(target_dir)
+    counts = installer.sync()
+    if counts is None:
+        sys.exit(1)
+
+@main.command()
+@click.option("--target", "-t", type=click.Path(), help="Target directory (default: current directory)")
+@click.option("--verify", is_flag=True, help="Verify content digests of all installed files (slower)")
+def status(target, verify):
     """Show installation status."""
     target_dir = Path(target) if target else Path.cwd()
     
+    from .core.installer import ACFInstaller
+    
     installer = ACFInstaller(target_dir)
     status = installer.get_installation_status()
     
@@ -83,6 +223,10 @@ def status(target):
     
     click.echo("")
     
+    # Manifest verification
+    if status["acf_dir_exists"]:
+        _echo_verification(installer.verify_installation(full=verify))
+    
     # Overall status
     if all([status["claude_dir_exists"], status["acf_dir_exists"], status["claude_md_exists"]]):
         click.echo("🎉 Complete ACF installation detected!")
@@ -91,5 +235,25 @@ def status(target):
     else:
         click.echo("❌ No ACF installation found - run 'ai-code-forge install' to set up")
 
+def _echo_verification(result, limit: int = 10):
+    """Print the result of verifying an installation against its manifest."""
+    if not isinstance(result, dict):
+        click.echo("ℹ️  No manifest found - run 'ai-code-forge sync' to create one")
+        click.echo("")
+        return
+    
+    problems = [("missing", path) for path in result["missing"]] + [("modified", path) for path in result["modified"]]
+    check = "content digests" if result["mode"] == "full" else "size and mtime"
+    if problems:
+        click.echo(f"⚠️  {len(problems)} of {result['files']} installed files differ from the manifest ({check})")
+        for kind, path in problems[:limit]:
+            click.echo(f"  • {kind}: {path}")
+        if len(problems) > limit:
+            click.echo(f"  • ... and {len(problems) - limit} more")
+        click.echo("Run 'ai-code-forge sync' to restore them")
+    else:
+        click.echo(f"✅ All {result['files']} installed files match the manifest ({check}, v{result['version']})")
+    click.echo("")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
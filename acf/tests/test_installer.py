@@ -1,12 +1,21 @@
 """Tests for ACF installer functionality."""
 
+import errno
+import io
+import json
+import os
+import tarfile
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from acf.core.installer import ACFInstaller
+from acf.core.installer import ACFInstaller, install_targets
+from acf.core.archive import ARCHIVE_NAME, build_archive, read_archive
+from acf.core.copier import copy_file
+from acf.core.linking import place_file
+from acf.core.source import SourceTree
 
 
 class TestACFInstaller:
@@ -106,52 +115,71 @@ class TestACFInstaller:
         # Cleanup
         shutil.rmtree(mock_data_dir)
     
-    def test_create_directories(self):
+    def _write_package_data(self, data_dir: Path):
+        """Write the minimal package data every install needs."""
+        (data_dir / "claude").mkdir(parents=True, exist_ok=True)
+        (data_dir / "acf").mkdir(exist_ok=True)
+        if not (data_dir / "CLAUDE.md").exists():
+            (data_dir / "CLAUDE.md").write_text('# Rules')
+    
+    def test_install_tree_creates_directories(self):
         """Test directory creation."""
+        mock_data_dir = Path(tempfile.mkdtemp())
+        self._write_package_data(mock_data_dir)
+        (mock_data_dir / "claude" / "settings.json").write_text('{}')
+        (mock_data_dir / "acf" / "README.md").write_text('# ACF Tool')
         assert not self.installer.claude_dir.exists()
         assert not self.installer.acf_dir.exists()
         
-        self.installer._create_directories()
+        result = self.installer.install_tree(SourceTree.from_directory(mock_data_dir))
         
-        assert self.installer.claude_dir.exists()
-        assert self.installer.acf_dir.exists()
+        assert result["status"] == "installed"
+        assert self.installer.claude_dir.is_dir()
+        assert self.installer.acf_dir.is_dir()
+        
+        # Cleanup
+        shutil.rmtree(mock_data_dir)
     
+    @patch.object(ACFInstaller, 'get_package_archive', return_value=None)
     @patch.object(ACFInstaller, 'get_package_data_path')
-    def test_install_claude_files(self, mock_get_path):
+    def test_install_claude_files(self, mock_get_path, mock_archive):
         """Test Claude Code files installation."""
         # Setup mock data
         mock_data_dir = Path(tempfile.mkdtemp())
         mock_get_path.return_value = mock_data_dir
+        self._write_package_data(mock_data_dir)
         
         claude_dir = mock_data_dir / "claude"
-        claude_dir.mkdir(parents=True)
         (claude_dir / "settings.json").write_text('{}')
         
         agents_dir = claude_dir / "agents"
         agents_dir.mkdir()
         (agents_dir / "test-agent.md").write_text('# Test Agent')
         
-        # Create target directory
+        # Existing user files next to the installed items are kept
         self.installer.claude_dir.mkdir()
+        (self.installer.claude_dir / "settings.local.json").write_text('{}')
         
         # Test installation
-        self.installer._install_claude_files(mock_data_dir)
+        assert self.installer.install() is True
         
         assert (self.installer.claude_dir / "settings.json").exists()
         assert (self.installer.claude_dir / "agents" / "test-agent.md").exists()
+        assert (self.installer.claude_dir / "settings.local.json").exists()
         
         # Cleanup
         shutil.rmtree(mock_data_dir)
     
-    @patch.object(ACFInstaller, 'get_package_data_path')  
-    def test_install_acf_files(self, mock_get_path):
+    @patch.object(ACFInstaller, 'get_package_archive', return_value=None)
+    @patch.object(ACFInstaller, 'get_package_data_path')
+    def test_install_acf_files(self, mock_get_path, mock_archive):
         """Test ACF files installation."""
         # Setup mock data
         mock_data_dir = Path(tempfile.mkdtemp())
         mock_get_path.return_value = mock_data_dir
+        self._write_package_data(mock_data_dir)
         
         acf_dir = mock_data_dir / "acf"
-        acf_dir.mkdir(parents=True)
         (acf_dir / "README.md").write_text('# ACF Tool')
         (acf_dir / "CHANGELOG.md").write_text('# Changes')
         
@@ -159,11 +187,8 @@ class TestACFInstaller:
         templates_dir.mkdir()
         (templates_dir / "test-template.md").write_text('# Template')
         
-        # Create target directory
-        self.installer.acf_dir.mkdir()
-        
         # Test installation
-        self.installer._install_acf_files(mock_data_dir)
+        assert self.installer.install() is True
         
         assert (self.installer.acf_dir / "README.md").exists()
         assert (self.installer.acf_dir / "CHANGELOG.md").exists()
@@ -172,17 +197,18 @@ class TestACFInstaller:
         # Cleanup
         shutil.rmtree(mock_data_dir)
     
+    @patch.object(ACFInstaller, 'get_package_archive', return_value=None)
     @patch.object(ACFInstaller, 'get_package_data_path')
-    def test_install_claude_md(self, mock_get_path):
+    def test_install_claude_md(self, mock_get_path, mock_archive):
         """Test CLAUDE.md installation."""
         # Setup mock data
         mock_data_dir = Path(tempfile.mkdtemp())
         mock_get_path.return_value = mock_data_dir
-        
         (mock_data_dir / "CLAUDE.md").write_text('# Operational Rules')
+        self._write_package_data(mock_data_dir)
         
         # Test installation
-        self.installer._install_claude_md(mock_data_dir)
+        assert self.installer.install() is True
         
         claude_md_path = self.temp_dir / "CLAUDE.md"
         assert claude_md_path.exists()
@@ -198,7 +224,7 @@ class TestACFInstaller:
         assert path.exists()
         assert (path / "claude").exists() or "Package data" in str(path)
     
-    @patch('acf.core.installer.resources.files')
+    @patch('importlib.resources.files')
     def test_get_package_data_path_installed_package(self, mock_resources):
         """Test package data path for installed package."""
         # Mock the case where development path doesn't exist
@@ -211,4 +237,556 @@ class TestACFInstaller:
             mock_resources.return_value = mock_traversable
             
             path = installer.get_package_data_path()
-            assert str(path) == "/mock/path"
\ No newline at end of file
+            assert str(path) == "/mock/path"
+
+class TestACFInstallerSync:
+    """Test cases for incremental sync."""
+    
+    def setup_method(self):
+        """Setup target and package data directories."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = Path(tempfile.mkdtemp())
+        self.installer = ACFInstaller(self.temp_dir)
+        
+        (self.data_dir / "claude" / "agents").mkdir(parents=True)
+        (self.data_dir / "acf" / "templates").mkdir(parents=True)
+        (self.data_dir / "claude" / "settings.json").write_text('{}')
+        (self.data_dir / "claude" / "agents" / "agent.md").write_text('# Agent')
+        (self.data_dir / "acf" / "README.md").write_text('# ACF Tool')
+        (self.data_dir / "acf" / "templates" / "old.md").write_text('# Old')
+        (self.data_dir / "CLAUDE.md").write_text('# Rules')
+        
+        self.patchers = [
+            patch.object(ACFInstaller, 'get_package_data_path', return_value=self.data_dir),
+            patch.object(ACFInstaller, 'get_package_archive', return_value=None)
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.temp_dir)
+        shutil.rmtree(self.data_dir)
+    
+    def test_sync_fresh_target(self):
+        """Test that a first sync adds every file and writes the manifest."""
+        counts = self.installer.sync()
+        
+        assert counts == {"added": 5, "changed": 0, "removed": 0, "unchanged": 0}
+        assert (self.temp_dir / ".claude" / "agents" / "agent.md").read_text() == '# Agent'
+        assert (self.temp_dir / "CLAUDE.md").read_text() == '# Rules'
+        manifest = json.loads((self.temp_dir / ".acf" / "manifest.json").read_text())
+        assert ".acf/templates/old.md" in manifest["files"]
+    
+    def test_sync_rewrites_only_changed_files(self):
+        """Test that unchanged files are left untouched."""
+        self.installer.sync()
+        settings = self.temp_dir / ".claude" / "settings.json"
+        inode = settings.stat().st_ino
+        (self.data_dir / "acf" / "README.md").write_text('# ACF Tool v2')
+        
+        counts = self.installer.sync()
+        
+        assert counts == {"added": 0, "changed": 1, "removed": 0, "unchanged": 4}
+        assert settings.stat().st_ino == inode
+        assert (self.temp_dir / ".acf" / "README.md").read_text() == '# ACF Tool v2'
+    
+    def test_sync_restores_locally_modified_file(self):
+        """Test that content is compared, not just the manifest."""
+        self.installer.sync()
+        (self.temp_dir / ".claude" / "settings.json").write_text('{"edited": true}')
+        
+        counts = self.installer.sync()
+        
+        assert counts["changed"] == 1
+        assert (self.temp_dir / ".claude" / "settings.json").read_text() == '{}'
+    
+    def test_sync_removes_only_acf_installed_files(self):
+        """Test that files dropped from the package are removed, user files are kept."""
+        self.installer.sync()
+        user_file = self.temp_dir / ".claude" / "my-agent.md"
+        user_file.write_text('# Mine')
+        (self.data_dir / "acf" / "templates" / "old.md").unlink()
+        
+        counts = self.installer.sync()
+        
+        assert counts["removed"] == 1
+        assert not (self.temp_dir / ".acf" / "templates").exists()
+        assert user_file.exists()
+    
+    def test_sync_keeps_modified_file_dropped_from_package(self):
+        """Test that a locally edited file is not deleted."""
+        self.installer.sync()
+        old = self.temp_dir / ".acf" / "templates" / "old.md"
+        old.write_text('# Edited')
+        (self.data_dir / "acf" / "templates" / "old.md").unlink()
+        
+        counts = self.installer.sync()
+        
+        assert counts["removed"] == 0
+        assert old.read_text() == '# Edited'
+    
+    def test_sync_missing_source_data(self):
+        """Test sync failure with missing package data."""
+        shutil.rmtree(self.data_dir / "claude")
+        
+        assert self.installer.sync() is None
+    
+    def test_install_writes_manifest(self):
+        """Test that install records every installed file with the package version."""
+        assert self.installer.install() is True
+        
+        manifest = json.loads((self.temp_dir / ".acf" / "manifest.json").read_text())
+        assert manifest["version"]
+        assert sorted(manifest["files"]) == [
+            ".acf/README.md", ".acf/templates/old.md", ".claude/agents/agent.md",
+            ".claude/settings.json", "CLAUDE.md"
+        ]
+        entry = manifest["files"]["CLAUDE.md"]
+        assert entry["size"] == len('# Rules')
+        assert len(entry["digest"]) == 64
+        
+        counts = self.installer.sync()
+        assert counts["unchanged"] == 5
+    
+    def test_verify_installation_without_manifest(self):
+        """Test verification when nothing was recorded."""
+        assert self.installer.verify_installation() is None
+    
+    def test_verify_installation_intact(self):
+        """Test stat-only and full verification of an intact install."""
+        self.installer.install()
+        
+        for full in (False, True):
+            result = self.installer.verify_installation(full=full)
+            assert result["files"] == 5
+            assert result["missing"] == []
+            assert result["modified"] == []
+            assert result["mode"] == ("full" if full else "stat")
+    
+    def test_verify_installation_detects_damage(self):
+        """Test that missing and modified files are reported."""
+        self.installer.install()
+        (self.temp_dir / "CLAUDE.md").unlink()
+        (self.temp_dir / ".claude" / "settings.json").write_text('{"x": 1}')
+        
+        stat_result = self.installer.verify_installation()
+        full_result = self.installer.verify_installation(full=True)
+        
+        assert stat_result["missing"] == full_result["missing"] == ["CLAUDE.md"]
+        assert stat_result["modified"] == full_result["modified"] == [".claude/settings.json"]
+    
+    def test_verify_full_ignores_touched_but_identical_file(self):
+        """Test that full verification compares content, not mtime."""
+        self.installer.install()
+        settings = self.temp_dir / ".claude" / "settings.json"
+        os.utime(settings, ns=(0, 0))
+        
+        assert self.installer.verify_installation()["modified"] == [".claude/settings.json"]
+        assert self.installer.verify_installation(full=True)["modified"] == []
+    
+    def test_install_targets_reads_source_once(self):
+        """Test bulk install into several targets from one in-memory tree."""
+        targets = [Path(tempfile.mkdtemp(dir=self.temp_dir)) for _ in range(3)]
+        (targets[1] / ".claude").mkdir()
+        missing = self.temp_dir / "missing"
+        
+        with patch.object(SourceTree, 'from_directory', wraps=SourceTree.from_directory) as mock_load:
+            results = install_targets(targets + [missing], max_workers=2)
+        
+        assert mock_load.call_count == 1
+        assert [r["status"] for r in results] == ["installed", "skipped", "installed", "failed"]
+        assert results[0]["files"] == 5
+        assert (targets[2] / ".claude" / "agents" / "agent.md").read_text() == '# Agent'
+        assert ACFInstaller(targets[0]).verify_installation(full=True)["modified"] == []
+    
+    def test_install_tree_force_replaces_stale_files(self):
+        """Test that a forced bulk install replaces packaged directories like install()."""
+        self.installer.install()
+        stale = self.temp_dir / ".claude" / "agents" / "removed.md"
+        stale.write_text('# Stale')
+        
+        result = self.installer.install_tree(SourceTree.from_directory(self.data_dir), force=True)
+        
+        assert result["status"] == "installed"
+        assert not stale.exists()
+
+
+
+class TestPackageArchive:
+    """Test cases for the single-archive package data format."""
+    
+    def setup_method(self):
+        """Build an archive from a small package data tree."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = self.temp_dir / "data"
+        (self.data_dir / "claude" / "commands").mkdir(parents=True)
+        (self.data_dir / "acf" / "scripts").mkdir(parents=True)
+        (self.data_dir / "claude" / "settings.json").write_text('{}')
+        (self.data_dir / "claude" / "commands" / "cmd.md").write_text('# Command')
+        script = self.data_dir / "acf" / "scripts" / "run.sh"
+        script.write_text('#!/bin/sh\n')
+        script.chmod(0o755)
+        (self.data_dir / "CLAUDE.md").write_text('# Rules')
+        
+        self.archive = self.temp_dir / ARCHIVE_NAME
+        assert build_archive(self.data_dir, self.archive) == 4
+        self.target = self.temp_dir / "target"
+        self.target.mkdir()
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_archive_round_trip(self):
+        """Test that the archive holds the index first and every file with its mode."""
+        with tarfile.open(self.archive) as tar:
+            assert tar.getnames()[0] == "index.json"
+        
+        with open(self.archive, "rb") as f:
+            tree = read_archive(f)
+        
+        files = {f.rel_path: f for f in tree.files}
+        assert sorted(files) == [".acf/scripts/run.sh", ".claude/commands/cmd.md", ".claude/settings.json", "CLAUDE.md"]
+        assert files[".acf/scripts/run.sh"].mode == 0o755
+        assert files["CLAUDE.md"].content == b'# Rules'
+    
+    def test_archive_is_deterministic(self):
+        """Test that rebuilding from the same data gives identical bytes."""
+        again = self.temp_dir / "again.tar.gz"
+        build_archive(self.data_dir, again)
+        assert again.read_bytes() == self.archive.read_bytes()
+    
+    def test_read_archive_rejects_tampered_content(self):
+        """Test that members must match the digests in the index."""
+        tampered = self.temp_dir / "tampered.tar.gz"
+        with tarfile.open(self.archive) as src, tarfile.open(tampered, "w:gz") as dst:
+            for member in src.getmembers():
+                content = src.extractfile(member).read()
+                if member.name == "CLAUDE.md":
+                    content = b'# Evil!'
+                member.size = len(content)
+                dst.addfile(member, io.BytesIO(content))
+        
+        with open(tampered, "rb") as f, pytest.raises(ValueError, match="Digest mismatch"):
+            read_archive(f)
+    
+    def test_install_and_sync_from_archive(self):
+        """Test that install and sync use the archive without resolving loose package data."""
+        installer = ACFInstaller(self.target)
+        with patch.object(ACFInstaller, 'get_package_archive', return_value=self.archive), \
+             patch.object(ACFInstaller, 'get_package_data_path', side_effect=AssertionError("not used")):
+            assert installer.install() is True
+            assert installer.sync() == {"added": 0, "changed": 0, "removed": 0, "unchanged": 4}
+        
+        assert (self.target / ".acf" / "scripts" / "run.sh").stat().st_mode & 0o777 == 0o755
+        assert installer.verify_installation(full=True)["modified"] == []
+    
+    def test_plan_after_archive_install_compares_digests(self):
+        """Test archived files, installed with the install-time mtime, plan as unchanged by digest."""
+        installer = ACFInstaller(self.target)
+        with patch.object(ACFInstaller, 'get_package_archive', return_value=self.archive):
+            assert installer.install() is True
+            plan = installer.plan_install()
+        
+        assert plan["summary"]["unchanged"] == 4
+        assert plan["summary"]["overwrite"] == 0
+
+
+class TestLinkModes:
+    """Test cases for link install modes."""
+    
+    def setup_method(self):
+        """Setup source file and target directory."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.source = self.temp_dir / "source.md"
+        self.source.write_text('# Shared')
+        self.target = self.temp_dir / "out" / "target.md"
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_hardlink_shares_inode(self):
+        """Test that hardlink mode links to the packaged file."""
+        assert place_file(self.source, self.target, "hardlink") == "hardlink"
+        assert self.target.stat().st_ino == self.source.stat().st_ino
+    
+    def test_symlink_points_at_source(self):
+        """Test that symlink mode creates an absolute symlink."""
+        assert place_file(self.source, self.target, "symlink") == "symlink"
+        assert self.target.is_symlink()
+        assert self.target.read_text() == '# Shared'
+    
+    def test_hardlink_falls_back_across_filesystems(self):
+        """Test the hardlink -> reflink -> copy fallback chain."""
+        with patch('acf.core.linking.os.link', side_effect=OSError(errno.EXDEV, "cross-device")), \
+             patch('acf.core.linking.reflink', side_effect=OSError(errno.EOPNOTSUPP, "no reflink")):
+            assert place_file(self.source, self.target, "hardlink") == "copy"
+        assert self.target.read_text() == '# Shared'
+        assert self.target.stat().st_ino != self.source.stat().st_ino
+    
+    def test_reflink_fallback_or_clone(self):
+        """Test that reflink mode clones where supported and copies elsewhere."""
+        method = place_file(self.source, self.target, "reflink")
+        assert method in ("reflink", "copy")
+        assert self.target.read_text() == '# Shared'
+    
+    def test_real_errors_are_not_swallowed(self):
+        """Test that errors other than 'unsupported' propagate."""
+        with patch('acf.core.linking.os.link', side_effect=OSError(errno.ENOSPC, "disk full")):
+            with pytest.raises(OSError):
+                place_file(self.source, self.target, "hardlink")
+    
+    @patch.object(ACFInstaller, 'get_package_archive', return_value=None)
+    def test_install_with_hardlinks(self, mock_archive):
+        """Test a hardlinked install records a verifiable manifest."""
+        data_dir = self.temp_dir / "data"
+        (data_dir / "claude").mkdir(parents=True)
+        (data_dir / "acf").mkdir()
+        (data_dir / "claude" / "settings.json").write_text('{}')
+        (data_dir / "acf" / "README.md").write_text('# ACF Tool')
+        (data_dir / "CLAUDE.md").write_text('# Rules')
+        target_dir = self.temp_dir / "project"
+        target_dir.mkdir()
+        installer = ACFInstaller(target_dir)
+        
+        with patch.object(ACFInstaller, 'get_package_data_path', return_value=data_dir):
+            assert installer.install(link_mode="hardlink") is True
+        
+        assert (target_dir / "CLAUDE.md").stat().st_ino == (data_dir / "CLAUDE.md").stat().st_ino
+        assert installer.verify_installation()["modified"] == []
+    
+    @patch.object(ACFInstaller, 'get_package_archive', return_value=None)
+    def test_link_install_does_not_read_package_files(self, mock_archive):
+        """Test link modes build the source tree from stat alone and record a stat-only manifest."""
+        data_dir = self.temp_dir / "data"
+        (data_dir / "claude").mkdir(parents=True)
+        (data_dir / "acf").mkdir()
+        (data_dir / "claude" / "settings.json").write_text('{}')
+        (data_dir / "acf" / "README.md").write_text('# ACF Tool')
+        (data_dir / "CLAUDE.md").write_text('# Rules')
+        target_dir = self.temp_dir / "project"
+        target_dir.mkdir()
+        installer = ACFInstaller(target_dir)
+        
+        with patch.object(ACFInstaller, 'get_package_data_path', return_value=data_dir), \
+             patch('pathlib.Path.read_bytes', side_effect=AssertionError("package file read")):
+            assert installer.install(link_mode="symlink") is True
+        
+        assert (target_dir / ".claude" / "settings.json").is_symlink()
+        assert installer.verify_installation(full=True)["modified"] == []
+
+
+class TestInstallPlan:
+    """Test cases for dry-run install plans."""
+    
+    def setup_method(self):
+        """Setup installed target and package data."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = self.temp_dir / "data"
+        (self.data_dir / "claude" / "agents").mkdir(parents=True)
+        (self.data_dir / "acf").mkdir()
+        (self.data_dir / "claude" / "settings.json").write_text('{}')
+        (self.data_dir / "claude" / "agents" / "agent.md").write_text('# Agent')
+        (self.data_dir / "acf" / "README.md").write_text('# ACF Tool')
+        (self.data_dir / "CLAUDE.md").write_text('# Rules')
+        self.target = self.temp_dir / "target"
+        self.target.mkdir()
+        self.installer = ACFInstaller(self.target)
+        self.patchers = [
+            patch.object(ACFInstaller, 'get_package_data_path', return_value=self.data_dir),
+            patch.object(ACFInstaller, 'get_package_archive', return_value=None)
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _actions(self, plan):
+        return {entry["path"]: entry["action"] for entry in plan["files"]}
+    
+    def test_plan_for_empty_target(self):
+        """Test that everything is created in a fresh target."""
+        plan = self.installer.plan_install()
+        
+        assert plan["summary"] == {"create": 4, "overwrite": 0, "unchanged": 0, "delete": 0}
+        assert plan["installed"] is False
+        assert list(self.target.iterdir()) == []
+    
+    def test_plan_after_changes(self):
+        """Test create, overwrite, unchanged and delete against an existing install."""
+        self.installer.install()
+        (self.target / ".claude" / "agents" / "mine.md").write_text('# Mine')
+        (self.target / ".claude" / "settings.local.json").write_text('{}')
+        same_size = self.target / ".acf" / "README.md"
+        same_size.write_text('# ACF Tooo')
+        (self.data_dir / "claude" / "agents" / "new.md").write_text('# New')
+        
+        plan = self.installer.plan_install()
+        actions = self._actions(plan)
+        
+        assert actions[".claude/agents/new.md"] == "create"
+        assert actions[".acf/README.md"] == "overwrite"
+        assert actions[".claude/settings.json"] == "unchanged"
+        assert actions[".claude/agents/mine.md"] == "delete"
+        assert ".claude/settings.local.json" not in actions
+        assert plan["installed"] is True
+        assert not (self.target / ".claude" / "agents" / "new.md").exists()
+    
+    def test_plan_hashes_when_mtime_differs(self):
+        """Test that a touched but identical file is unchanged."""
+        self.installer.install()
+        os.utime(self.target / "CLAUDE.md", ns=(0, 0))
+        
+        assert self._actions(self.installer.plan_install())["CLAUDE.md"] == "unchanged"
+
+
+class TestParallelCopy:
+    """Test cases for the staged parallel copy engine."""
+    
+    def setup_method(self):
+        """Setup package data and an installed target."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = self.temp_dir / "data"
+        self.source = self.data_dir / "claude"
+        for i in range(20):
+            path = self.source / "agents" / f"group-{i % 3}" / f"agent-{i}.md"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"# Agent {i}\n" * (i + 1))
+        (self.source / "settings.json").write_text('{}')
+        (self.data_dir / "acf").mkdir()
+        (self.data_dir / "acf" / "README.md").write_text('# ACF Tool')
+        (self.data_dir / "CLAUDE.md").write_text('# Rules')
+        self.project = self.temp_dir / "project"
+        self.dest = self.project / ".claude"
+        self.dest.mkdir(parents=True)
+        self.installer = ACFInstaller(self.project, copy_workers=4)
+    
+    def install(self) -> dict:
+        """Force-install the package data into the project."""
+        return self.installer.install_tree(SourceTree.from_directory(self.data_dir), force=True)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_copy_file_preserves_content_and_metadata(self):
+        """Test the kernel fast path keeps content, mode and mtime like copy2."""
+        source = self.source / "settings.json"
+        source.write_bytes(os.urandom(300000))
+        source.chmod(0o750)
+        os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+        target = self.temp_dir / "copy.json"
+        
+        copy_file(source, target)
+        
+        assert target.read_bytes() == source.read_bytes()
+        assert target.stat().st_mode & 0o777 == 0o750
+        assert target.stat().st_mtime_ns == 1_000_000_000
+    
+    def test_copy_file_falls_back_when_kernel_copies_nothing(self):
+        """Test a fast path returning 0 at once falls back to a plain copy instead of truncating."""
+        source = self.source / "settings.json"
+        source.write_bytes(os.urandom(100000))
+        target = self.temp_dir / "copy.json"
+        
+        with patch('os.copy_file_range', return_value=0, create=True), \
+                patch('os.sendfile', return_value=0, create=True):
+            copy_file(source, target)
+        
+        assert target.read_bytes() == source.read_bytes()
+    
+    def test_copy_file_raises_on_short_copy(self):
+        """Test a fast path stopping part way raises rather than installing a truncated file."""
+        source = self.source / "settings.json"
+        source.write_bytes(os.urandom(100000))
+        
+        with patch('os.copy_file_range', side_effect=[4096, 0], create=True):
+            with pytest.raises(OSError, match="stopped after 4096"):
+                copy_file(source, self.temp_dir / "copy.json")
+    
+    def test_install_replaces_items_and_cleans_staging(self):
+        """Test items are swapped into place and no staging directories remain."""
+        (self.dest / "agents").mkdir()
+        (self.dest / "agents" / "stale.md").write_text('# Stale')
+        (self.dest / "settings.local.json").write_text('{}')
+        
+        assert self.install()["status"] == "installed"
+        
+        assert sorted(p.name for p in self.dest.iterdir()) == ["agents", "settings.json", "settings.local.json"]
+        assert not (self.dest / "agents" / "stale.md").exists()
+        assert (self.dest / "agents" / "group-1" / "agent-19.md").read_text() == "# Agent 19\n" * 20
+        assert set(self.installer.timings) == {"copy", "swap", "manifest"}
+        assert not list(self.project.glob(".acf-*"))
+    
+    def test_failed_copy_leaves_installation_untouched(self):
+        """Test that a copy failure does not modify the destination."""
+        (self.dest / "agents").mkdir()
+        (self.dest / "agents" / "existing.md").write_text('# Existing')
+        
+        with patch('acf.core.copier.copy_file', side_effect=OSError("disk full")):
+            result = self.install()
+        
+        assert result["status"] == "failed"
+        assert sorted(p.name for p in self.dest.iterdir()) == ["agents"]
+        assert (self.dest / "agents" / "existing.md").read_text() == '# Existing'
+    
+    def test_copy_install_does_not_buffer_loose_files(self):
+        """Test loose package files are copied from disk and hashed in a stream, never read whole."""
+        with patch('pathlib.Path.read_bytes', side_effect=AssertionError("package file read")):
+            result = self.install()
+        
+        assert result["status"] == "installed"
+        assert (self.dest / "agents" / "group-1" / "agent-19.md").read_text() == "# Agent 19\n" * 20
+        assert self.installer.verify_installation(full=True)["modified"] == []
+    
+    def test_staging_is_created_next_to_target(self):
+        """Test staging happens beside .claude, so a crash never leaves it inside the configuration."""
+        staging_dirs = []
+        real_rename = os.rename
+        
+        def recording_rename(src, dst):
+            staging_dirs.append(Path(src).parent)
+            return real_rename(src, dst)
+        
+        with patch('acf.core.installer.os.rename', side_effect=recording_rename):
+            self.install()
+        
+        assert staging_dirs
+        assert all(self.dest not in path.parents and path != self.dest for path in staging_dirs)
+        assert not list(self.project.glob(".acf-*"))
+    
+    def test_stale_staging_is_removed(self):
+        """Test staging left behind by an interrupted install is cleaned up on the next run."""
+        for stale in (self.project / ".acf-staging-old", self.dest / ".acf-staging-old", self.dest / ".acf-replaced-old"):
+            (stale / "agents").mkdir(parents=True)
+        
+        self.install()
+        
+        assert sorted(p.name for p in self.dest.iterdir()) == ["agents", "settings.json"]
+        assert not list(self.project.glob(".acf-*"))
+    
+    def test_failed_swap_rolls_back(self):
+        """Test that a rename failure restores items already swapped."""
+        (self.dest / "agents").mkdir()
+        (self.dest / "agents" / "existing.md").write_text('# Existing')
+        real_rename = os.rename
+        
+        def flaky_rename(src, dst):
+            if Path(dst).name == "settings.json" and Path(dst).parent == self.dest:
+                raise OSError("rename failed")
+            return real_rename(src, dst)
+        
+        with patch('acf.core.installer.os.rename', side_effect=flaky_rename):
+            result = self.install()
+        
+        assert result["status"] == "failed"
+        assert sorted(p.name for p in self.dest.iterdir()) == ["agents"]
+        assert (self.dest / "agents" / "existing.md").read_text() == '# Existing'
@@ -1,5 +1,9 @@
 """Tests for ACF CLI main module."""
 
+import json
+import os
+import subprocess
+import sys
 import pytest
 import tempfile
 import shutil
@@ -7,6 +11,7 @@ from pathlib import Path
 from click.testing import CliRunner
 from unittest.mock import patch, MagicMock
 
+import acf
 from acf.main import main, install, status
 
 
@@ -48,7 +53,7 @@ class TestMainCLI:
         assert result.exit_code == 0
         assert "Target directory does not exist" in result.output
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_install_already_exists(self, mock_installer_class):
         """Test install when configuration already exists."""
         # Mock installer
@@ -65,7 +70,7 @@ class TestMainCLI:
             assert "already exists" in result.output
             assert "--force" in result.output
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_install_success(self, mock_installer_class):
         """Test successful install."""
         # Mock installer
@@ -83,7 +88,7 @@ class TestMainCLI:
             assert "Ready to use!" in result.output
             mock_installer.install.assert_called_once()
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_install_force(self, mock_installer_class):
         """Test force install."""
         # Mock installer
@@ -101,7 +106,7 @@ class TestMainCLI:
             assert "Force installation" in result.output
             mock_installer.install.assert_called_once()
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_install_failure(self, mock_installer_class):
         """Test install failure."""
         # Mock installer
@@ -119,7 +124,7 @@ class TestMainCLI:
             # Should not show success message when install fails
             assert "Ready to use!" not in result.output
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_status_complete_installation(self, mock_installer_class):
         """Test status with complete installation."""
         # Mock installer
@@ -140,7 +145,7 @@ class TestMainCLI:
             assert "agents" in result.output
             assert "README.md" in result.output
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_status_no_installation(self, mock_installer_class):
         """Test status with no installation."""
         # Mock installer
@@ -160,7 +165,7 @@ class TestMainCLI:
             assert "No ACF installation found" in result.output
             assert "run 'ai-code-forge install'" in result.output
     
-    @patch('acf.main.ACFInstaller')
+    @patch('acf.core.installer.ACFInstaller')
     def test_status_partial_installation(self, mock_installer_class):
         """Test status with partial installation."""
         # Mock installer
@@ -185,4 +190,207 @@ class TestMainCLI:
         with self.runner.isolated_filesystem():
             result = self.runner.invoke(main, ["status", "--target", "."])
             assert result.exit_code == 0
-            assert "Installation Status for:" in result.output
\ No newline at end of file
+            assert "Installation Status for:" in result.output
+    
+    @patch('acf.core.installer.ACFInstaller')
+    def test_sync_success(self, mock_installer_class):
+        """Test sync command."""
+        mock_installer = MagicMock()
+        mock_installer.sync.return_value = {"added": 1, "changed": 0, "removed": 0, "unchanged": 3}
+        mock_installer_class.return_value = mock_installer
+        
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(main, ["sync"])
+            assert result.exit_code == 0
+            mock_installer.sync.assert_called_once()
+    
+    @patch('acf.core.installer.ACFInstaller')
+    def test_sync_failure(self, mock_installer_class):
+        """Test sync command exits non-zero on failure."""
+        mock_installer = MagicMock()
+        mock_installer.sync.return_value = None
+        mock_installer_class.return_value = mock_installer
+        
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(main, ["sync"])
+            assert result.exit_code == 1
+    
+    @patch('acf.core.installer.ACFInstaller')
+    def test_status_reports_manifest_differences(self, mock_installer_class):
+        """Test status prints manifest verification and passes --verify through."""
+        mock_installer = MagicMock()
+        mock_installer.get_installation_status.return_value = {
+            "claude_dir_exists": True,
+            "acf_dir_exists": True,
+            "claude_md_exists": True,
+            "claude_files": ["settings.json"],
+            "acf_files": ["README.md"]
+        }
+        mock_installer.verify_installation.return_value = {
+            "version": "0.2.0",
+            "mode": "full",
+            "files": 3,
+            "missing": ["CLAUDE.md"],
+            "modified": [".claude/settings.json"]
+        }
+        mock_installer_class.return_value = mock_installer
+        
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(main, ["status", "--verify"])
+            assert result.exit_code == 0
+            assert "2 of 3 installed files differ" in result.output
+            assert "modified: .claude/settings.json" in result.output
+            mock_installer.verify_installation.assert_called_once_with(full=True)
+    
+    @patch('acf.core.installer.install_targets')
+    def test_install_targets_from_file(self, mock_install_targets):
+        """Test bulk install reports per target and exits non-zero on failure."""
+        mock_install_targets.return_value = [
+            {"target": "a", "status": "installed", "files": 5, "bytes": 2048, "methods": {"copy": 5}, "duration_ms": 3.0, "error": None},
+            {"target": "b", "status": "failed", "files": 0, "bytes": 0, "duration_ms": 0.1, "error": "boom"}
+        ]
+        
+        with self.runner.isolated_filesystem():
+            Path("targets.txt").write_text("a\n# comment\n\nb\na\n")
+            result = self.runner.invoke(main, ["install", "--targets-from", "targets.txt", "-j", "2"])
+            assert result.exit_code == 1
+            assert "a: 5 files (5 copy), 2.0 KB" in result.output
+            assert "1 installed, 0 skipped, 1 failed" in result.output
+            mock_install_targets.assert_called_once_with(["a", "b"], force=False, max_workers=2, link_mode="copy")
+    
+    @patch('acf.core.installer.install_targets')
+    def test_install_targets_glob(self, mock_install_targets):
+        """Test bulk install expands globs to directories."""
+        mock_install_targets.return_value = []
+        
+        with self.runner.isolated_filesystem():
+            for name in ("wt-1", "wt-2"):
+                Path(name).mkdir()
+            Path("wt-file").write_text("")
+            self.runner.invoke(main, ["install", "--targets", "wt-*", "--force"])
+            mock_install_targets.assert_called_once_with(["wt-1", "wt-2"], force=True, max_workers=None, link_mode="copy")
+    
+    @patch('acf.core.installer.install_targets')
+    def test_install_warns_about_shared_link_modes(self, mock_install_targets):
+        """Test hardlink and symlink modes warn that edits reach the package."""
+        mock_install_targets.return_value = []
+        
+        with self.runner.isolated_filesystem():
+            Path("wt-1").mkdir()
+            result = self.runner.invoke(main, ["install", "--targets", "wt-*", "--link-mode", "hardlink"])
+        
+        assert "--link-mode hardlink" in result.output
+        assert "site-packages" in result.output
+    
+    def test_install_targets_rejects_target(self):
+        """Test that --target and bulk options are exclusive."""
+        result = self.runner.invoke(main, ["install", "--target", ".", "--targets", "*"])
+        assert result.exit_code == 2
+
+
+class TestStartupCost:
+    """Keep CLI startup cheap for shell prompts and git hooks."""
+    
+    # Import time budget for acf.main on top of click itself, in microseconds
+    IMPORT_BUDGET_US = 30000
+    
+    HEAVY_MODULES = ["acf.core.archive", "tarfile", "gzip", "concurrent.futures", "importlib.metadata"]
+    
+    def _run_python(self, *args):
+        """Run a fresh interpreter that imports acf from this checkout."""
+        env = dict(os.environ, PYTHONPATH=str(Path(acf.__file__).parent.parent))
+        return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+    
+    def test_import_time_budget(self):
+        """Test the python -X importtime cost of acf.main excluding click."""
+        result = self._run_python("-X", "importtime", "-c", "import acf.main")
+        
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, us, name = line.split("|")
+                if us.strip().isdigit():
+                    cumulative[name.strip()] = int(us)
+        
+        assert "acf.core.installer" not in cumulative
+        assert cumulative["acf.main"] - cumulative.get("click", 0) < self.IMPORT_BUDGET_US
+    
+    def test_status_skips_heavy_imports(self, tmp_path):
+        """Test that status does not load archive, thread pool or metadata machinery."""
+        code = (
+            "import sys\n"
+            "from acf.main import main\n"
+            f"main(['status', '--target', {str(tmp_path)!r}], standalone_mode=False)\n"
+            f"print('loaded:', [m for m in {self.HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        result = self._run_python("-c", code)
+        
+        assert "loaded: []" in result.stdout
+    
+    def test_status_never_resolves_package_data(self, tmp_path):
+        """Test that status works without touching package data."""
+        from acf.core.installer import ACFInstaller
+        
+        (tmp_path / ".acf").mkdir()
+        with patch.object(ACFInstaller, 'get_package_data_path', side_effect=AssertionError("resolved")), \
+             patch.object(ACFInstaller, 'get_package_archive', side_effect=AssertionError("resolved")):
+            result = CliRunner().invoke(main, ["status", "--target", str(tmp_path)])
+        
+        assert result.exit_code == 0
+        assert "No manifest found" in result.output
+
+
+class TestDryRun:
+    """Test cases for install --dry-run."""
+    
+    PLAN = {
+        "target": "/project",
+        "summary": {"create": 1, "overwrite": 1, "unchanged": 5, "delete": 1},
+        "files": [
+            {"path": ".acf/README.md", "action": "overwrite"},
+            {"path": ".claude/agents/new.md", "action": "create"},
+            {"path": ".claude/agents/old.md", "action": "delete"},
+            {"path": "CLAUDE.md", "action": "unchanged"}
+        ],
+        "installed": True
+    }
+    
+    def setup_method(self):
+        """Setup test runner."""
+        self.runner = CliRunner()
+    
+    @patch('acf.core.installer.ACFInstaller')
+    def test_dry_run_summary(self, mock_installer_class):
+        """Test the compact plan output does not install."""
+        mock_installer = MagicMock()
+        mock_installer.plan_install.return_value = self.PLAN
+        mock_installer_class.return_value = mock_installer
+        
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(main, ["install", "--dry-run"])
+        
+        assert result.exit_code == 0
+        assert "1 create, 1 overwrite, 5 unchanged, 1 delete" in result.output
+        assert "  - .claude/agents/old.md" in result.output
+        assert "  ~ .acf/README.md" in result.output
+        assert "CLAUDE.md" not in result.output
+        assert "nothing is written without --force" in result.output
+        mock_installer.install.assert_not_called()
+    
+    @patch('acf.core.installer.ACFInstaller')
+    def test_dry_run_json(self, mock_installer_class):
+        """Test the JSON plan."""
+        mock_installer = MagicMock()
+        mock_installer.plan_install.return_value = self.PLAN
+        mock_installer_class.return_value = mock_installer
+        
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(main, ["install", "--dry-run", "--json", "--force"])
+        
+        assert result.exit_code == 0
+        assert json.loads(result.output) == self.PLAN
+    
+    def test_json_requires_dry_run(self):
+        """Test that --json is only valid with --dry-run."""
+        result = self.runner.invoke(main, ["install", "--json"])
+        assert result.exit_code == 2
@@ -0,0 +1,276 @@
+"""OpenAI Batch API support: JSONL request files, result parsing and a local job store."""
+
+import json
+import os
+import re
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+from .schemas import get_compiled_schema, validate_structured_data
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Batch statuses after which the job no longer changes
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+_JOB_ID_PATTERN = re.compile(r"^job_[0-9a-f]{16}$")
+
+
+def build_batch_requests(
+    prompts: List[str],
+    schema_name: str,
+    model: str,
+    system_message: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None
+) -> bytes:
+    """
+    Build a JSONL batch input file with one structured completion request per prompt.
+
+    Args:
+        prompts: User prompts, one request each
+        schema_name: Name of the schema from SCHEMA_REGISTRY
+        model: OpenAI model to use
+        system_message: Optional system message shared by all requests
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens per response
+
+    Returns:
+        JSONL file contents
+
+    Raises:
+        KeyError: If schema_name is not found in registry
+    """
+    response_format = get_compiled_schema(schema_name).response_format
+
+    lines = []
+    for index, prompt in enumerate(prompts):
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+
+        body = {"model": model, "messages": messages, "response_format": response_format}
+        if temperature is not None:
+            body["temperature"] = temperature
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+
+        request = {"custom_id": f"item-{index}", "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+        lines.append(json.dumps(request, separators=(",", ":")))
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def parse_batch_result(line: Dict[str, Any], schema_name: str) -> Dict[str, Any]:
+    """
+    Parse and validate one line of a batch output or error file.
+
+    Args:
+        line: Decoded JSONL line
+        schema_name: Schema the batch was submitted with
+
+    Returns:
+        Result dictionary with custom_id, index and either data or error details
+    """
+    custom_id = line.get("custom_id") or ""
+    suffix = custom_id.rsplit("-", 1)[-1]
+    result: Dict[str, Any] = {"custom_id": custom_id, "index": int(suffix) if suffix.isdigit() else None}
+
+    response = line.get("response") or {}
+    error = line.get("error")
+    if error or response.get("status_code", 200) >= 400:
+        message = (error or {}).get("message") or (response.get("body") or {}).get("error", {}).get("message") or "Request failed"
+        result.update({"success": False, "error": message, "error_type": "api_error", "status_code": response.get("status_code")})
+        return result
+
+    body = response.get("body") or {}
+    choices = body.get("choices") or []
+    content = choices[0].get("message", {}).get("content") if choices else None
+    if not content:
+        result.update({"success": False, "error": "Empty response content", "error_type": "empty_response"})
+        return result
+
+    try:
+        structured_data = json.loads(content)
+    except json.JSONDecodeError as e:
+        result.update({"success": False, "error": f"Invalid JSON response: {e}", "error_type": "json_parse_error", "raw_content": content})
+        return result
+
+    validation_result = validate_structured_data(structured_data, schema_name)
+    if isinstance(validation_result, list):
+        result.update({
+            "success": False,
+            "error": "Response validation failed",
+            "error_type": "validation_error",
+            "validation_errors": [error.model_dump() for error in validation_result],
+            "raw_response": structured_data
+        })
+        return result
+
+    result.update({"success": True, "data": structured_data, "usage": body.get("usage", {})})
+    return result
+
+
+class BatchJobStore:
+    """Local store of batch jobs: one JSON record plus input/result JSONL files per job."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize batch job store.
+
+        Args:
+            directory: Store directory (OPENAI_BATCH_DIR, default ~/.cache/openai-structured-mcp/batches)
+        """
+        directory = directory or os.getenv("OPENAI_BATCH_DIR") or str(Path.home() / ".cache" / "openai-structured-mcp" / "batches")
+        self.directory = Path(directory).expanduser()
+
+    def _record_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def input_path(self, job_id: str) -> Path:
+        """Path of the JSONL input file submitted for a job."""
+        return self.directory / f"{job_id}.input.jsonl"
+
+    def results_path(self, job_id: str) -> Path:
+        """Path of the validated results JSONL file of a job."""
+        return self.directory / f"{job_id}.results.jsonl"
+
+    def _write_atomic(self, path: Path, content: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def create(self, schema_name: str, model: str, request_count: int, input_content: bytes) -> Dict[str, Any]:
+        """
+        Create a job record and persist its input file.
+
+        Args:
+            schema_name: Schema the batch uses
+            model: Model the batch uses
+            request_count: Number of requests in the batch
+            input_content: JSONL input file contents
+
+        Returns:
+            New job record
+        """
+        job_id = f"job_{uuid.uuid4().hex[:16]}"
+        self._write_atomic(self.input_path(job_id), input_content)
+
+        now = datetime.now().isoformat()
+        record = {
+            "job_id": job_id,
+            "schema_name": schema_name,
+            "model": model,
+            "request_count": request_count,
+            "status": "created",
+            "batch_id": None,
+            "input_file_id": None,
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {},
+            "errors": [],
+            "created_at": now,
+            "updated_at": now
+        }
+        self.save(record)
+        logger.debug(f"Created batch job {job_id}: schema={schema_name}, model={model}, requests={request_count}")
+        return record
+
+    def save(self, record: Dict[str, Any]) -> None:
+        """
+        Persist a job record atomically.
+
+        Args:
+            record: Job record to save
+        """
+        record["updated_at"] = datetime.now().isoformat()
+        self._write_atomic(self._record_path(record["job_id"]), json.dumps(record, indent=2).encode("utf-8"))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a job record.
+
+        Args:
+            job_id: Local job identifier
+
+        Returns:
+            Job record, or None if the job does not exist
+        """
+        if not _JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            return json.loads(self._record_path(job_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        List all job records, newest first.
+
+        Returns:
+            Job records
+        """
+        if not self.directory.is_dir():
+            return []
+        records = []
+        for path in self.directory.glob("job_*.json"):
+            try:
+                records.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable batch job record {path}: {e}")
+        return sorted(records, key=lambda record: record.get("created_at", ""), reverse=True)
+
+    def write_results(self, job_id: str, results: List[Dict[str, Any]]) -> Path:
+        """
+        Persist validated results of a job as JSONL.
+
+        Args:
+            job_id: Local job identifier
+            results: Parsed results
+
+        Returns:
+            Path of the results file
+        """
+        with self.results_writer(job_id) as write_result:
+            for result in results:
+                write_result(result)
+        return self.results_path(job_id)
+
+    @contextmanager
+    def results_writer(self, job_id: str) -> Iterator[Callable[[Dict[str, Any]], None]]:
+        """
+        Stream validated results of a job to its JSONL file one at a time.
+
+        The results file is replaced atomically when the block exits without
+        an error, so readers never see a partial file.
+
+        Args:
+            job_id: Local job identifier
+
+        Yields:
+            Function writing one result
+        """
+        path = self.results_path(job_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                yield lambda result: f.write(json.dumps(result) + "\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
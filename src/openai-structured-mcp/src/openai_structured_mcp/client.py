@@ -1,9 +1,12 @@
 """OpenAI API client implementation with structured output support."""
 
+import asyncio
+import inspect
+import json
 import os
 import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from functools import wraps
 
 try:
@@ -11,48 +14,111 @@ try:
 except ImportError:
     raise ImportError("OpenAI library is required. Install with: uv add openai")
 
-from .utils.logging import get_logger, log_api_request, log_api_response, debug_decorator
-from .schemas import get_json_schema, validate_structured_data, SCHEMA_REGISTRY
+from .batch import BatchJobStore, TERMINAL_STATUSES, BATCH_ENDPOINT, build_batch_requests, parse_batch_result
+from .utils.logging import get_logger, log_api_request, log_api_response, debug_decorator, lazy_debug
+from .utils.retry import RetryPolicy, get_status_code
+from .schemas import get_compiled_schema, validate_structured_data, SCHEMA_REGISTRY
 
 logger = get_logger(__name__)
 
+# System messages of the predefined structured tasks
+EXTRACTION_SYSTEM_MESSAGE = """Extract structured data from the provided text.
+        Focus on identifying named entities, key facts, and providing a concise summary.
+        Assign a confidence score based on how clearly extractable the information is.
+        
+        {instructions}"""
+
+CODE_ANALYSIS_SYSTEM_MESSAGE = """Analyze the provided source code for complexity, issues, strengths, and recommendations.
+        Provide a complexity score from 1-10 and count functions/methods and lines of code.{language_instruction}
+        Be specific in your recommendations and focus on actionable improvements."""
+
+CONFIGURATION_TASK_SYSTEM_MESSAGE = """Convert the task description into a structured configuration task.
+        Break it down into specific, actionable steps with clear prerequisites and validation criteria.
+        Assign an appropriate priority level and provide a realistic time estimate."""
+
+SENTIMENT_SYSTEM_MESSAGE = """Analyze the sentiment of the provided text.
+        Provide an overall sentiment classification with confidence score.
+        Identify key phrases that influenced the analysis and break down specific emotions.
+        Include clear reasoning for your sentiment classification."""
+
+# Models assumed to exist when the model list cannot be fetched
+FALLBACK_MODELS = ["gpt-5", "gpt-4o", "gpt-4o-mini"]
+
+# Seconds to wait before fetching the model list again after a failure
+MODELS_RETRY_INTERVAL = 60.0
+
+
+def _format_api_error(e: Exception, func_name: str, duration: float) -> Dict[str, Any]:
+    """Convert an exception raised by an OpenAI API call into an error dictionary."""
+    # Handle different types of OpenAI API errors
+    if hasattr(e, 'response'):
+        status_code = getattr(e.response, 'status_code', 0)
+        response_text = getattr(e.response, 'text', str(e))
+        
+        if status_code == 429:
+            logger.warning(f"Rate limit exceeded - {func_name} - {duration:.2f}ms")
+            return {"error": "Rate limit exceeded. Please try again later.", "error_type": "rate_limit"}
+        elif status_code == 401:
+            logger.error(f"Authentication failed - {func_name} - {duration:.2f}ms")
+            return {"error": "Authentication failed. Check your API key.", "error_type": "authentication"}
+        elif status_code == 400:
+            logger.error(f"Bad request - {func_name} - {duration:.2f}ms: {response_text}")
+            return {"error": f"Bad request: {response_text}", "error_type": "bad_request"}
+        else:
+            logger.error(f"API error ({status_code}) - {func_name} - {duration:.2f}ms: {response_text}")
+            return {"error": f"API error ({status_code}): {response_text}", "error_type": "api_error"}
+    else:
+        logger.error(f"Unexpected error - {func_name} - {duration:.2f}ms: {str(e)}")
+        return {"error": f"Unexpected error: {str(e)}", "error_type": "unexpected"}
+
 
 def handle_api_errors(func):
-    """Enhanced decorator for handling OpenAI API errors with extensive logging."""
+    """
+    Enhanced decorator for handling OpenAI API errors with extensive logging.
+    
+    Retryable failures (429, 5xx, connection errors) are retried according to the
+    client's retry_policy, honoring Retry-After / x-ratelimit-* headers. All attempts
+    together stay within the request timeout; each retry gets the remaining budget
+    as its custom_timeout.
+    """
+    signature = inspect.signature(func)
+    
     @wraps(func)
     async def wrapper(*args, **kwargs):
         func_name = f"{func.__module__}.{func.__name__}"
         logger.debug(f"Starting API call: {func_name}")
         
         start_time = time.time()
+        attempt = 0
         try:
-            result = await func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            client = bound.arguments["self"]
+            policy = client.retry_policy
+            deadline = time.monotonic() + client.get_request_timeout(bound.arguments.get("custom_timeout"))
+            
+            while True:
+                try:
+                    result = await func(*bound.args, **bound.kwargs)
+                    break
+                except Exception as e:
+                    delay = policy.next_delay(e, attempt, deadline)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    logger.warning(f"Retrying {func_name} after {type(e).__name__} (status={get_status_code(e)}) - retry {attempt}/{policy.max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    if "custom_timeout" in bound.arguments:
+                        bound.arguments["custom_timeout"] = deadline - time.monotonic()
+            
             duration = (time.time() - start_time) * 1000
             logger.debug(f"API call completed successfully: {func_name} - {duration:.2f}ms")
             return result
         except Exception as e:
             duration = (time.time() - start_time) * 1000
-            
-            # Handle different types of OpenAI API errors
-            if hasattr(e, 'response'):
-                status_code = getattr(e.response, 'status_code', 0)
-                response_text = getattr(e.response, 'text', str(e))
-                
-                if status_code == 429:
-                    logger.warning(f"Rate limit exceeded - {func_name} - {duration:.2f}ms")
-                    return {"error": "Rate limit exceeded. Please try again later.", "error_type": "rate_limit"}
-                elif status_code == 401:
-                    logger.error(f"Authentication failed - {func_name} - {duration:.2f}ms")
-                    return {"error": "Authentication failed. Check your API key.", "error_type": "authentication"}
-                elif status_code == 400:
-                    logger.error(f"Bad request - {func_name} - {duration:.2f}ms: {response_text}")
-                    return {"error": f"Bad request: {response_text}", "error_type": "bad_request"}
-                else:
-                    logger.error(f"API error ({status_code}) - {func_name} - {duration:.2f}ms: {response_text}")
-                    return {"error": f"API error ({status_code}): {response_text}", "error_type": "api_error"}
-            else:
-                logger.error(f"Unexpected error - {func_name} - {duration:.2f}ms: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}", "error_type": "unexpected"}
+            result = _format_api_error(e, func_name, duration)
+            result["attempts"] = attempt + 1
+            return result
     return wrapper
 
 
@@ -76,36 +142,130 @@ class OpenAIStructuredClient:
         # Log API key presence (no actual key data)
         logger.debug("API key loaded successfully")
         
-        # Initialize async client
-        self.client = AsyncOpenAI(api_key=self.api_key)
-        
         # Configuration
         self.default_model = os.getenv("OPENAI_DEFAULT_MODEL", "gpt-5")
         self.default_temperature = float(os.getenv("OPENAI_DEFAULT_TEMPERATURE", "0.7"))
         self.default_max_tokens = int(os.getenv("OPENAI_DEFAULT_MAX_TOKENS", "1000"))
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", "60.0"))
+        self.base_url = os.getenv("OPENAI_BASE_URL") or None
+        
+        # Retries are handled by handle_api_errors, so the SDK's own retries are disabled
+        self.retry_policy = RetryPolicy()
+        
+        # Initialize async client
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0)
+        
+        # Model list cache (refreshed in the background once stale)
+        self.models_cache_ttl = float(os.getenv("OPENAI_MODELS_CACHE_TTL", "3600"))
+        self._models: List[str] = []
+        self._model_set: frozenset = frozenset()
+        self._models_fetched_at: Optional[float] = None
+        self._models_failed_at: Optional[float] = None
+        self._models_lock = asyncio.Lock()
+        self._models_refresh: Optional[asyncio.Task] = None
         
-        logger.debug(f"Client configuration: model={self.default_model}, temperature={self.default_temperature}, max_tokens={self.default_max_tokens}")
+        # Maximum concurrent requests of multi-document tools
+        self.max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+        
+        # Batch API jobs are tracked in a local store
+        self.batch_store = BatchJobStore()
+        self.batch_poll_interval = float(os.getenv("OPENAI_BATCH_POLL_INTERVAL", "30.0"))
+        self.batch_completion_window = os.getenv("OPENAI_BATCH_COMPLETION_WINDOW", "24h")
+        
+        logger.debug(f"Client configuration: model={self.default_model}, temperature={self.default_temperature}, max_tokens={self.default_max_tokens}, timeout={self.timeout}s")
+        logger.debug(f"Retry policy: max_retries={self.retry_policy.max_retries}, base_delay={self.retry_policy.base_delay}s, max_delay={self.retry_policy.max_delay}s")
         logger.info("OpenAI structured client initialized successfully")
     
-    async def get_available_models(self) -> List[str]:
+    def get_request_timeout(self, custom_timeout: Optional[float] = None) -> float:
         """
-        Fetch available models from OpenAI API dynamically.
+        Get the timeout budget for a request, including any retries.
         
+        Args:
+            custom_timeout: Explicit timeout overriding the default
+            
         Returns:
-            List of available model names
+            Timeout in seconds
+        """
+        return custom_timeout if custom_timeout is not None else self.timeout
+    
+    async def _refresh_models(self) -> bool:
+        """
+        Fetch the model list from the OpenAI API and store it in the cache.
+        
+        Returns:
+            True if the cache was refreshed, False if the API call failed
         """
         try:
             logger.debug("Fetching available models from OpenAI API...")
             models_response = await self.client.models.list()
             models = [model.id for model in models_response.data]
             logger.debug(f"Fetched {len(models)} models from OpenAI API")
-            return models
         except Exception as e:
             logger.error(f"Failed to fetch models from OpenAI API: {e}")
-            # Fallback to a minimal set if API fails
-            fallback_models = ["gpt-5", "gpt-4o", "gpt-4o-mini"]
-            logger.warning(f"Using fallback models: {fallback_models}")
-            return fallback_models
+            self._models_failed_at = time.monotonic()
+            return False
+        
+        self._models = models
+        self._model_set = frozenset(models)
+        self._models_fetched_at = time.monotonic()
+        self._models_failed_at = None
+        return True
+    
+    def _schedule_models_refresh(self) -> None:
+        """Start a background model list refresh unless one is already running."""
+        if self._models_refresh is None or self._models_refresh.done():
+            logger.debug("Model list cache is stale, refreshing in the background")
+            self._models_refresh = asyncio.ensure_future(self._refresh_models())
+    
+    async def get_available_models(self) -> List[str]:
+        """
+        Get available models, served from a TTL cache.
+        
+        The first call fetches the list from the OpenAI API. Once the cache is older
+        than OPENAI_MODELS_CACHE_TTL the stale list is returned immediately while a
+        background refresh runs (stale-while-revalidate).
+        
+        Returns:
+            List of available model names (a fallback list if the API is unreachable)
+        """
+        now = time.monotonic()
+        recently_failed = self._models_failed_at is not None and now - self._models_failed_at < MODELS_RETRY_INTERVAL
+        
+        if self._models_fetched_at is not None:
+            if now - self._models_fetched_at >= self.models_cache_ttl and not recently_failed:
+                self._schedule_models_refresh()
+            return list(self._models)
+        
+        if not recently_failed:
+            async with self._models_lock:
+                if self._models_fetched_at is None:
+                    await self._refresh_models()
+            if self._models_fetched_at is not None:
+                return list(self._models)
+        
+        logger.warning(f"Using fallback models: {FALLBACK_MODELS}")
+        return list(FALLBACK_MODELS)
+    
+    async def is_model_available(self, model: str) -> bool:
+        """
+        Check whether a model is available using the cached model set.
+        
+        Args:
+            model: Model name
+            
+        Returns:
+            True if the model is known to the API (or in the fallback list)
+        """
+        models = await self.get_available_models()
+        if self._models_fetched_at is not None:
+            return model in self._model_set
+        return model in models
+    
+    async def warm_up(self) -> None:
+        """Populate the model list cache ahead of the first request."""
+        start_time = time.time()
+        await self.get_available_models()
+        logger.info(f"Model list cache warmed up - models: {len(self._models)}, duration: {(time.time() - start_time) * 1000:.2f}ms")
     
     @handle_api_errors
     async def structured_completion(
@@ -116,7 +276,8 @@ class OpenAIStructuredClient:
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        validate_response: bool = True
+        validate_response: bool = True,
+        custom_timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Generate structured completion using OpenAI's JSON Schema validation.
@@ -129,13 +290,14 @@ class OpenAIStructuredClient:
             temperature: Sampling temperature (defaults to configured default)
             max_tokens: Maximum tokens in response (defaults to configured default)
             validate_response: Whether to validate response against schema
+            custom_timeout: Custom timeout for this request (overrides OPENAI_TIMEOUT)
             
         Returns:
             API response dictionary with structured data
         """
-        # Get schema
+        # Get precompiled schema
         try:
-            json_schema = get_json_schema(schema_name)
+            compiled_schema = get_compiled_schema(schema_name)
         except KeyError as e:
             logger.error(f"Invalid schema name: {schema_name}")
             return {
@@ -149,9 +311,8 @@ class OpenAIStructuredClient:
         temperature = temperature if temperature is not None else self.default_temperature
         max_tokens = max_tokens or self.default_max_tokens
         
-        # Validate model against OpenAI API
-        available_models = await self.get_available_models()
-        if model not in available_models:
+        # Validate model against the cached model list
+        if not await self.is_model_available(model):
             logger.warning(f"Unknown model '{model}', using '{self.default_model}' instead")
             model = self.default_model
         
@@ -165,14 +326,7 @@ class OpenAIStructuredClient:
         request_data = {
             "model": model,
             "messages": messages,
-            "response_format": {
-                "type": "json_schema",
-                "json_schema": {
-                    "name": schema_name,
-                    "strict": True,
-                    "schema": json_schema
-                }
-            },
+            "response_format": compiled_schema.response_format,
             "temperature": temperature,
             "max_tokens": max_tokens
         }
@@ -185,15 +339,17 @@ class OpenAIStructuredClient:
             request_data
         )
         
-        logger.debug(f"Making structured completion request: schema={schema_name}, model={model}, request_id={request_id}")
+        lazy_debug(logger, lambda: f"Making structured completion request: schema={schema_name}, model={model}, request_id={request_id}")
         
         start_time = time.time()
         try:
             # Make API call
-            response = await self.client.chat.completions.create(**request_data)
+            response = await self.client.chat.completions.create(
+                **request_data, timeout=self.get_request_timeout(custom_timeout)
+            )
             duration = (time.time() - start_time) * 1000
             
-            logger.debug(f"OpenAI response received: duration={duration:.2f}ms")
+            lazy_debug(logger, lambda: f"OpenAI response received: duration={duration:.2f}ms")
             
             # Convert response to dict
             response_dict = response.model_dump()
@@ -265,6 +421,187 @@ class OpenAIStructuredClient:
             
             raise
     
+    def get_system_message(self, schema_name: str, custom_instructions: Optional[str] = None) -> str:
+        """
+        Get the default system message for a schema.
+        
+        Args:
+            schema_name: Name of the schema from SCHEMA_REGISTRY
+            custom_instructions: Optional additional instructions
+            
+        Returns:
+            System message text
+        """
+        if schema_name == "data_extraction":
+            return EXTRACTION_SYSTEM_MESSAGE.format(instructions=custom_instructions or 'Use your best judgment for extraction.')
+        
+        templates = {
+            "code_analysis": CODE_ANALYSIS_SYSTEM_MESSAGE.format(language_instruction=""),
+            "configuration_task": CONFIGURATION_TASK_SYSTEM_MESSAGE,
+            "sentiment_analysis": SENTIMENT_SYSTEM_MESSAGE
+        }
+        system_message = templates.get(schema_name, f"Respond with data that matches the '{schema_name}' schema.")
+        if custom_instructions:
+            system_message += f"\n\n{custom_instructions}"
+        return system_message
+    
+    async def submit_batch(
+        self,
+        prompts: List[str],
+        schema_name: str,
+        system_message: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Submit structured completions for many prompts as one OpenAI Batch API job.
+        
+        The JSONL input file and the job record are kept in the local batch store,
+        so the job can be tracked across server restarts.
+        
+        Args:
+            prompts: User prompts, one request each
+            schema_name: Name of the schema to use from SCHEMA_REGISTRY
+            system_message: Optional system message (defaults to the schema's system message)
+            model: OpenAI model to use (defaults to configured default)
+            temperature: Sampling temperature (defaults to configured default)
+            max_tokens: Maximum tokens per response (defaults to configured default)
+            
+        Returns:
+            Job record, or an error dictionary for invalid input
+            
+        Raises:
+            openai.APIError: If uploading the file or creating the batch fails
+        """
+        if schema_name not in SCHEMA_REGISTRY:
+            return {
+                "error": f"Schema '{schema_name}' not found",
+                "error_type": "invalid_schema",
+                "available_schemas": list(SCHEMA_REGISTRY.keys())
+            }
+        if not prompts:
+            return {"error": "No prompts provided", "error_type": "empty_batch"}
+        
+        model = model or self.default_model
+        if not await self.is_model_available(model):
+            logger.warning(f"Unknown model '{model}', using '{self.default_model}' instead")
+            model = self.default_model
+        
+        content = build_batch_requests(
+            prompts,
+            schema_name,
+            model,
+            system_message=system_message or self.get_system_message(schema_name),
+            temperature=temperature if temperature is not None else self.default_temperature,
+            max_tokens=max_tokens or self.default_max_tokens
+        )
+        record = self.batch_store.create(schema_name, model, len(prompts), content)
+        job_id = record["job_id"]
+        
+        start_time = time.time()
+        try:
+            input_file = await self.client.files.create(file=(f"{job_id}.jsonl", content), purpose="batch")
+            record["input_file_id"] = input_file.id
+            
+            batch = await self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=self.batch_completion_window,
+                metadata={"job_id": job_id, "schema_name": schema_name}
+            )
+        except Exception as e:
+            logger.error(f"Batch submission failed for {job_id}: {type(e).__name__}: {str(e)}")
+            record["status"] = "submit_failed"
+            record["errors"] = [str(e)]
+            self.batch_store.save(record)
+            raise
+        
+        record["batch_id"] = batch.id
+        self._update_batch_record(record, batch)
+        
+        duration = (time.time() - start_time) * 1000
+        logger.info(f"Batch submitted: job={job_id}, batch={batch.id}, schema={schema_name}, requests={len(prompts)}, input_bytes={len(content)}, duration={duration:.2f}ms")
+        return record
+    
+    def _update_batch_record(self, record: Dict[str, Any], batch: Any) -> None:
+        """Copy the state of an OpenAI batch object into a job record and persist it."""
+        record["status"] = batch.status
+        record["output_file_id"] = batch.output_file_id
+        record["error_file_id"] = batch.error_file_id
+        if batch.request_counts is not None:
+            record["request_counts"] = batch.request_counts.model_dump()
+        if batch.errors is not None and batch.errors.data:
+            record["errors"] = [error.message for error in batch.errors.data]
+        self.batch_store.save(record)
+    
+    async def get_batch_status(self, job_id: str) -> Dict[str, Any]:
+        """
+        Get a batch job record, refreshing it from the API unless the job has finished.
+        
+        Args:
+            job_id: Local job identifier returned by submit_batch
+            
+        Returns:
+            Job record
+            
+        Raises:
+            KeyError: If the job is not in the local store
+        """
+        record = self.batch_store.get(job_id)
+        if record is None:
+            raise KeyError(f"Batch job '{job_id}' not found")
+        
+        if record.get("batch_id") and record["status"] not in TERMINAL_STATUSES:
+            batch = await self.client.batches.retrieve(record["batch_id"])
+            if batch.status != record["status"]:
+                logger.info(f"Batch {job_id} status: {record['status']} -> {batch.status}")
+            self._update_batch_record(record, batch)
+        return record
+    
+    async def iter_batch_results(
+        self,
+        job_id: str,
+        wait: bool = True,
+        poll_interval: Optional[float] = None,
+        record: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield validated results of a batch job.
+        
+        Results are read line by line from the streamed output and error files, and
+        each structured response is validated against the job's schema.
+        
+        Args:
+            job_id: Local job identifier returned by submit_batch
+            wait: Poll until the job finishes; otherwise yield nothing for unfinished jobs
+            poll_interval: Seconds between status polls (defaults to OPENAI_BATCH_POLL_INTERVAL)
+            record: Job record the caller already fetched with get_batch_status, reused
+                instead of fetching it again and updated in place while polling
+            
+        Yields:
+            Result dictionaries with custom_id, index and either data or error details
+            
+        Raises:
+            KeyError: If the job is not in the local store
+        """
+        poll_interval = poll_interval if poll_interval is not None else self.batch_poll_interval
+        if record is None:
+            record = await self.get_batch_status(job_id)
+        while record["status"] not in TERMINAL_STATUSES:
+            if not wait or not record.get("batch_id"):
+                return
+            await asyncio.sleep(poll_interval)
+            record.update(await self.get_batch_status(job_id))
+        
+        for file_id in (record.get("output_file_id"), record.get("error_file_id")):
+            if not file_id:
+                continue
+            async with self.client.files.with_streaming_response.content(file_id) as response:
+                async for line in response.iter_lines():
+                    if line.strip():
+                        yield parse_batch_result(json.loads(line), record["schema_name"])
+    
     @debug_decorator
     async def extract_data(self, text: str, custom_instructions: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -277,11 +614,7 @@ class OpenAIStructuredClient:
         Returns:
             Structured data extraction results
         """
-        system_message = f"""Extract structured data from the provided text.
-        Focus on identifying named entities, key facts, and providing a concise summary.
-        Assign a confidence score based on how clearly extractable the information is.
-        
-        {custom_instructions or 'Use your best judgment for extraction.'}"""
+        system_message = self.get_system_message("data_extraction", custom_instructions)
         
         return await self.structured_completion(
             prompt=text,
@@ -289,6 +622,94 @@ class OpenAIStructuredClient:
             system_message=system_message
         )
     
+    @debug_decorator
+    async def extract_data_many(
+        self,
+        texts: List[str],
+        custom_instructions: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract structured data from many texts concurrently.
+        
+        Requests share one system message, model and compiled schema and run under a
+        semaphore, so wall-clock time follows the slowest item rather than the sum.
+        Every response is validated against the data_extraction schema; failures are
+        reported per item.
+        
+        Args:
+            texts: Texts to analyze
+            custom_instructions: Optional custom instructions for extraction
+            model: OpenAI model to use (defaults to configured default)
+            temperature: Sampling temperature (defaults to configured default)
+            max_concurrency: Maximum requests in flight (defaults to OPENAI_MAX_CONCURRENCY)
+            
+        Returns:
+            Combined results with per-item data or errors, per-item timing and a summary
+        """
+        system_message = self.get_system_message("data_extraction", custom_instructions)
+        model = model or self.default_model
+        if not await self.is_model_available(model):
+            logger.warning(f"Unknown model '{model}', using '{self.default_model}' instead")
+            model = self.default_model
+        
+        concurrency = max(1, max_concurrency or self.max_concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def extract(index: int, text: str) -> Dict[str, Any]:
+            async with semaphore:
+                start_time = time.perf_counter()
+                try:
+                    result = await self.structured_completion(
+                        prompt=text,
+                        schema_name="data_extraction",
+                        system_message=system_message,
+                        model=model,
+                        temperature=temperature
+                    )
+                except Exception as e:
+                    result = {"error": str(e), "error_type": type(e).__name__}
+                duration = (time.perf_counter() - start_time) * 1000
+            
+            item = {"index": index, "success": "error" not in result, "duration_ms": duration}
+            if item["success"]:
+                item["data"] = result["data"]
+                item["usage"] = result.get("usage", {})
+            else:
+                item["error"] = result["error"]
+                item["error_type"] = result.get("error_type")
+                if "validation_errors" in result:
+                    item["validation_errors"] = result["validation_errors"]
+            return item
+        
+        start_time = time.perf_counter()
+        items = await asyncio.gather(*(extract(index, text) for index, text in enumerate(texts)))
+        wall_time = (time.perf_counter() - start_time) * 1000
+        
+        succeeded = sum(1 for item in items if item["success"])
+        logger.info(f"Multi-document extraction: items={len(items)}, succeeded={succeeded}, concurrency={concurrency}, wall_time={wall_time:.2f}ms")
+        
+        return {
+            "success": succeeded == len(items),
+            "items": list(items),
+            "summary": {
+                "count": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "max_concurrency": concurrency,
+                "wall_time_ms": wall_time,
+                "total_item_time_ms": sum(item["duration_ms"] for item in items),
+                "max_item_time_ms": max((item["duration_ms"] for item in items), default=0.0)
+            },
+            "metadata": {
+                "schema_name": "data_extraction",
+                "model": model
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    
     @debug_decorator
     async def analyze_code(self, code: str, language_hint: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -303,9 +724,7 @@ class OpenAIStructuredClient:
         """
         lang_instruction = f" The code is in {language_hint}." if language_hint else ""
         
-        system_message = f"""Analyze the provided source code for complexity, issues, strengths, and recommendations.
-        Provide a complexity score from 1-10 and count functions/methods and lines of code.{lang_instruction}
-        Be specific in your recommendations and focus on actionable improvements."""
+        system_message = CODE_ANALYSIS_SYSTEM_MESSAGE.format(language_instruction=lang_instruction)
         
         return await self.structured_completion(
             prompt=code,
@@ -324,9 +743,7 @@ class OpenAIStructuredClient:
         Returns:
             Structured configuration task definition
         """
-        system_message = """Convert the task description into a structured configuration task.
-        Break it down into specific, actionable steps with clear prerequisites and validation criteria.
-        Assign an appropriate priority level and provide a realistic time estimate."""
+        system_message = CONFIGURATION_TASK_SYSTEM_MESSAGE
         
         return await self.structured_completion(
             prompt=description,
@@ -345,10 +762,7 @@ class OpenAIStructuredClient:
         Returns:
             Structured sentiment analysis results
         """
-        system_message = """Analyze the sentiment of the provided text.
-        Provide an overall sentiment classification with confidence score.
-        Identify key phrases that influenced the analysis and break down specific emotions.
-        Include clear reasoning for your sentiment classification."""
+        system_message = SENTIMENT_SYSTEM_MESSAGE
         
         return await self.structured_completion(
             prompt=text,
@@ -4,8 +4,9 @@ This module defines the schema models used for structured outputs
 with OpenAI's JSON Schema validation features.
 """
 
-from typing import List, Optional, Union, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
+import copy
+from typing import List, Optional, Union, Dict, Any, Type
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from enum import Enum
 
 
@@ -219,9 +220,73 @@ SCHEMA_REGISTRY = {
 }
 
 
+class CompiledSchema:
+    """Per-schema artifacts generated once and reused by every request.
+    
+    The JSON schema, the ``response_format`` payload and the validator are built
+    on first use. ``json_schema`` and ``response_format`` return deep copies, so
+    callers may modify them without affecting other requests.
+    """
+    
+    def __init__(self, name: str, model: Type[BaseModel]):
+        """Compile a registry entry.
+        
+        Args:
+            name: Name of the schema in SCHEMA_REGISTRY
+            model: Pydantic model class of the schema
+        """
+        self.name = name
+        self.model = model
+        self.adapter = TypeAdapter(model)
+        self._json_schema = model.model_json_schema()
+        self._response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": name,
+                "strict": True,
+                "schema": self._json_schema
+            }
+        }
+    
+    @property
+    def json_schema(self) -> Dict[str, Any]:
+        """JSON schema of the model (a copy of the cached one)."""
+        return copy.deepcopy(self._json_schema)
+    
+    @property
+    def response_format(self) -> Dict[str, Any]:
+        """``response_format`` request payload (a copy of the cached one)."""
+        return copy.deepcopy(self._response_format)
+
+
+_COMPILED_SCHEMAS: Dict[str, CompiledSchema] = {}
+
+
+def get_compiled_schema(schema_name: str) -> CompiledSchema:
+    """Get the precompiled artifacts for a schema, compiling it on first use.
+    
+    Args:
+        schema_name: Name of the schema from SCHEMA_REGISTRY
+        
+    Returns:
+        Shared CompiledSchema instance
+        
+    Raises:
+        KeyError: If schema_name is not found in registry
+    """
+    compiled = _COMPILED_SCHEMAS.get(schema_name)
+    if compiled is None:
+        if schema_name not in SCHEMA_REGISTRY:
+            raise KeyError(f"Schema '{schema_name}' not found. Available: {list(SCHEMA_REGISTRY.keys())}")
+        compiled = _COMPILED_SCHEMAS[schema_name] = CompiledSchema(schema_name, SCHEMA_REGISTRY[schema_name])
+    return compiled
+
+
 def get_json_schema(schema_name: str) -> Dict[str, Any]:
     """Get JSON schema for a given schema name.
     
+    The schema is generated once; each call returns a copy of it.
+    
     Args:
         schema_name: Name of the schema from SCHEMA_REGISTRY
         
@@ -231,10 +296,7 @@ def get_json_schema(schema_name: str) -> Dict[str, Any]:
     Raises:
         KeyError: If schema_name is not found in registry
     """
-    if schema_name not in SCHEMA_REGISTRY:
-        raise KeyError(f"Schema '{schema_name}' not found. Available: {list(SCHEMA_REGISTRY.keys())}")
-    
-    return SCHEMA_REGISTRY[schema_name].model_json_schema()
+    return get_compiled_schema(schema_name).json_schema
 
 
 def validate_structured_data(data: Dict[str, Any], schema_name: str) -> Union[BaseModel, List[ValidationError]]:
@@ -255,10 +317,10 @@ def validate_structured_data(data: Dict[str, Any], schema_name: str) -> Union[Ba
             received_value=schema_name
         )]
     
-    schema_class = SCHEMA_REGISTRY[schema_name]
+    adapter = get_compiled_schema(schema_name).adapter
     
     try:
-        return schema_class.model_validate(data)
+        return adapter.validate_python(data)
     except Exception as e:
         # Convert Pydantic validation errors to our structured format
         errors = []
@@ -1,16 +1,19 @@
 """FastMCP server implementation for OpenAI structured output integration."""
 
+import asyncio
+import json
 import os
+from contextlib import ExitStack, aclosing, asynccontextmanager
 from typing import List, Optional, Dict, Any
 from dotenv import load_dotenv
 
 try:
-    from fastmcp import FastMCP
+    from fastmcp import Context, FastMCP
 except ImportError:
     raise ImportError("FastMCP library is required. Install with: uv add fastmcp")
 
 from .client import OpenAIStructuredClient
-from .utils.logging import setup_logging, get_logger, debug_decorator
+from .utils.logging import setup_logging, get_logger, debug_decorator, shutdown_logging, debug_enabled, lazy_debug
 from .schemas import SCHEMA_REGISTRY
 
 # Load environment variables
@@ -31,15 +34,29 @@ except (ValueError, OSError, PermissionError) as e:
 
 # Log environment configuration
 logger.info("OpenAI Structured MCP server starting")
-logger.debug(f"Environment variables:")
-logger.debug(f"  OPENAI_STRUCTURED_LOG_LEVEL: {os.getenv('OPENAI_STRUCTURED_LOG_LEVEL', 'INFO')}")
-logger.debug(f"  OPENAI_STRUCTURED_LOG_PATH: {os.getenv('OPENAI_STRUCTURED_LOG_PATH') or 'NOT_SET'}")
-logger.debug(f"  OPENAI_API_KEY: {'SET' if os.getenv('OPENAI_API_KEY') else 'NOT_SET'}")
-logger.debug(f"  OPENAI_DEFAULT_MODEL: {os.getenv('OPENAI_DEFAULT_MODEL', 'gpt-5')}")
-logger.debug(f"  OPENAI_DEFAULT_TEMPERATURE: {os.getenv('OPENAI_DEFAULT_TEMPERATURE', '0.7')}")
+if debug_enabled(logger):
+    logger.debug("Environment variables:")
+    logger.debug(f"  OPENAI_STRUCTURED_LOG_LEVEL: {os.getenv('OPENAI_STRUCTURED_LOG_LEVEL', 'INFO')}")
+    logger.debug(f"  OPENAI_STRUCTURED_LOG_PATH: {os.getenv('OPENAI_STRUCTURED_LOG_PATH') or 'NOT_SET'}")
+    logger.debug(f"  OPENAI_API_KEY: {'SET' if os.getenv('OPENAI_API_KEY') else 'NOT_SET'}")
+    logger.debug(f"  OPENAI_DEFAULT_MODEL: {os.getenv('OPENAI_DEFAULT_MODEL', 'gpt-5')}")
+    logger.debug(f"  OPENAI_DEFAULT_TEMPERATURE: {os.getenv('OPENAI_DEFAULT_TEMPERATURE', '0.7')}")
+
+@asynccontextmanager
+async def lifespan(server):
+    """Server lifespan: warm the model list cache in the background on startup."""
+    warm_up = asyncio.ensure_future(openai_client.warm_up())
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+
+
+# Maximum number of texts accepted by extract_data_many
+EXTRACT_MANY_MAX_ITEMS = int(os.getenv("OPENAI_EXTRACT_MANY_MAX_ITEMS", "50"))
 
 # Create FastMCP server instance
-mcp = FastMCP("OpenAI Structured Output Server")
+mcp = FastMCP("OpenAI Structured Output Server", lifespan=lifespan)
 
 # Initialize OpenAI client
 try:
@@ -78,7 +95,7 @@ async def extract_data(
         JSON string with structured data extraction results including entities, facts, and summary
     """
     logger.info(f"Data extraction request: {len(text)} characters")
-    logger.debug(f"Text preview: {text[:100]}...")
+    lazy_debug(logger, lambda: f"Text preview: {text[:100]}...")
     
     try:
         result = await openai_client.extract_data(
@@ -91,7 +108,7 @@ async def extract_data(
             return f"Error extracting data: {result['error']}"
         
         logger.info(f"Data extraction completed successfully")
-        logger.debug(f"Extracted entities count: {len(result['data'].get('entities', []))}")
+        lazy_debug(logger, lambda: f"Extracted entities count: {len(result['data'].get('entities', []))}")
         
         # Return formatted JSON string
         import json
@@ -104,6 +121,64 @@ async def extract_data(
         return error_msg
 
 
+@mcp.tool(
+    annotations={
+        "title": "Extract Structured Data (Multiple Documents)",
+        "description": "Extract structured data from many texts concurrently in a single call",
+        "readOnlyHint": True,
+        "openWorldHint": False
+    }
+)
+@debug_decorator
+async def extract_data_many(
+    texts: List[str],
+    custom_instructions: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_concurrency: Optional[int] = None
+) -> str:
+    """
+    Extract structured data from multiple texts concurrently.
+    
+    The whole call takes roughly as long as the slowest text. Each result is
+    validated against the data_extraction schema and failures are reported per item.
+    
+    Args:
+        texts: The texts to analyze (one extraction per text)
+        custom_instructions: Optional custom instructions applied to every extraction
+        model: OpenAI model to use (defaults to configured model)
+        temperature: Sampling temperature between 0.0-2.0 (defaults to configured temperature)
+        max_concurrency: Maximum requests in flight at once (defaults to OPENAI_MAX_CONCURRENCY)
+    
+    Returns:
+        JSON string with per-item results and timing plus a summary
+    """
+    logger.info(f"Multi-document extraction request: {len(texts)} texts")
+    
+    if not texts:
+        return "Error extracting data: no texts provided"
+    if len(texts) > EXTRACT_MANY_MAX_ITEMS:
+        return f"Error extracting data: too many texts ({len(texts)}, maximum is {EXTRACT_MANY_MAX_ITEMS})"
+    
+    try:
+        result = await openai_client.extract_data_many(
+            texts=texts,
+            custom_instructions=custom_instructions,
+            model=model,
+            temperature=temperature,
+            max_concurrency=max_concurrency
+        )
+        
+        logger.info(f"Multi-document extraction completed: {result['summary']['succeeded']}/{result['summary']['count']} succeeded")
+        return json.dumps(result, indent=2)
+        
+    except Exception as e:
+        error_msg = f"Error during multi-document extraction: {str(e)}"
+        logger.error(error_msg)
+        logger.debug(f"Multi-document extraction exception details", exc_info=True)
+        return error_msg
+
+
 @mcp.tool(
     annotations={
         "title": "Analyze Code Structure",
@@ -132,7 +207,7 @@ async def analyze_code(
         JSON string with structured code analysis including complexity score, issues, and recommendations
     """
     logger.info(f"Code analysis request: {len(code)} characters, language_hint: {language_hint}")
-    logger.debug(f"Code preview: {code[:200]}...")
+    lazy_debug(logger, lambda: f"Code preview: {code[:200]}...")
     
     try:
         result = await openai_client.analyze_code(
@@ -145,7 +220,7 @@ async def analyze_code(
             return f"Error analyzing code: {result['error']}"
         
         logger.info(f"Code analysis completed successfully")
-        logger.debug(f"Complexity score: {result['data'].get('complexity_score')}, Issues: {len(result['data'].get('issues', []))}")
+        lazy_debug(logger, lambda: f"Complexity score: {result['data'].get('complexity_score')}, Issues: {len(result['data'].get('issues', []))}")
         
         # Return formatted JSON string
         import json
@@ -184,7 +259,7 @@ async def create_configuration_task(
         JSON string with structured task definition including steps, priorities, and validation criteria
     """
     logger.info(f"Configuration task creation request: {len(description)} characters")
-    logger.debug(f"Task description: {description}")
+    lazy_debug(logger, lambda: f"Task description: {description}")
     
     try:
         result = await openai_client.create_configuration_task(
@@ -196,7 +271,7 @@ async def create_configuration_task(
             return f"Error creating configuration task: {result['error']}"
         
         logger.info(f"Configuration task created successfully")
-        logger.debug(f"Task name: {result['data'].get('task_name')}, Steps: {len(result['data'].get('steps', []))}")
+        lazy_debug(logger, lambda: f"Task name: {result['data'].get('task_name')}, Steps: {len(result['data'].get('steps', []))}")
         
         # Return formatted JSON string
         import json
@@ -235,7 +310,7 @@ async def analyze_sentiment(
         JSON string with structured sentiment analysis including overall sentiment, emotions, and reasoning
     """
     logger.info(f"Sentiment analysis request: {len(text)} characters")
-    logger.debug(f"Text preview: {text[:100]}...")
+    lazy_debug(logger, lambda: f"Text preview: {text[:100]}...")
     
     try:
         result = await openai_client.analyze_sentiment(
@@ -247,7 +322,7 @@ async def analyze_sentiment(
             return f"Error analyzing sentiment: {result['error']}"
         
         logger.info(f"Sentiment analysis completed successfully")
-        logger.debug(f"Overall sentiment: {result['data'].get('overall_sentiment')}, Confidence: {result['data'].get('confidence')}")
+        lazy_debug(logger, lambda: f"Overall sentiment: {result['data'].get('overall_sentiment')}, Confidence: {result['data'].get('confidence')}")
         
         # Return formatted JSON string
         import json
@@ -292,7 +367,7 @@ async def custom_structured_query(
         JSON string with structured response according to the specified schema
     """
     logger.info(f"Custom structured query: schema={schema_name}, prompt_length={len(prompt)}")
-    logger.debug(f"Available schemas: {list(SCHEMA_REGISTRY.keys())}")
+    lazy_debug(logger, lambda: f"Available schemas: {list(SCHEMA_REGISTRY.keys())}")
     
     try:
         result = await openai_client.structured_completion(
@@ -321,6 +396,181 @@ async def custom_structured_query(
         return error_msg
 
 
+@mcp.tool(
+    annotations={
+        "title": "Submit Batch Job",
+        "description": "Submit many texts for structured processing through the OpenAI Batch API (lower cost, asynchronous)",
+        "readOnlyHint": False,
+        "openWorldHint": False
+    }
+)
+@debug_decorator
+async def submit_batch_job(
+    texts: List[str],
+    schema_name: str = "data_extraction",
+    custom_instructions: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None
+) -> str:
+    """
+    Submit texts for offline structured processing with the OpenAI Batch API.
+    
+    Batch jobs cost less than individual requests and complete asynchronously
+    (within OPENAI_BATCH_COMPLETION_WINDOW). Use get_batch_job_status and
+    get_batch_job_results with the returned job_id.
+    
+    Args:
+        texts: Texts to process, one request each
+        schema_name: Schema for every response (e.g., data_extraction, sentiment_analysis)
+        custom_instructions: Optional instructions added to the schema's system message
+        model: OpenAI model to use (defaults to configured model)
+        temperature: Sampling temperature between 0.0-2.0 (defaults to configured temperature)
+    
+    Returns:
+        JSON string with the batch job record
+    """
+    logger.info(f"Batch job submission: schema={schema_name}, texts={len(texts)}")
+    
+    try:
+        result = await openai_client.submit_batch(
+            prompts=texts,
+            schema_name=schema_name,
+            system_message=openai_client.get_system_message(schema_name, custom_instructions),
+            model=model,
+            temperature=temperature
+        )
+        
+        if "error" in result:
+            logger.error(f"Batch job submission failed: {result['error']}")
+            return f"Error submitting batch job: {result['error']}"
+        
+        logger.info(f"Batch job submitted: {result['job_id']}")
+        return json.dumps(result, indent=2)
+        
+    except Exception as e:
+        error_msg = f"Error during batch job submission: {str(e)}"
+        logger.error(error_msg)
+        logger.debug(f"Batch submission exception details", exc_info=True)
+        return error_msg
+
+
+@mcp.tool(
+    annotations={
+        "title": "Batch Job Status",
+        "description": "Get the status of a submitted batch job",
+        "readOnlyHint": True,
+        "openWorldHint": False
+    }
+)
+@debug_decorator
+async def get_batch_job_status(job_id: Optional[str] = None) -> str:
+    """
+    Get the status of a batch job, or list all known jobs.
+    
+    Args:
+        job_id: Job identifier returned by submit_batch_job (omit to list all jobs)
+    
+    Returns:
+        JSON string with the job record (or all job records)
+    """
+    try:
+        if job_id is None:
+            return json.dumps(openai_client.batch_store.list(), indent=2)
+        
+        record = await openai_client.get_batch_status(job_id)
+        return json.dumps(record, indent=2)
+        
+    except KeyError as e:
+        return f"Error: {e.args[0]}"
+    except Exception as e:
+        error_msg = f"Error getting batch job status: {str(e)}"
+        logger.error(error_msg)
+        logger.debug(f"Batch status exception details", exc_info=True)
+        return error_msg
+
+
+@mcp.tool(
+    annotations={
+        "title": "Batch Job Results",
+        "description": "Retrieve and validate the results of a finished batch job",
+        "readOnlyHint": True,
+        "openWorldHint": False
+    }
+)
+@debug_decorator
+async def get_batch_job_results(
+    job_id: str,
+    ctx: Context,
+    wait: bool = False,
+    max_inline_results: int = 20
+) -> str:
+    """
+    Retrieve the validated results of a batch job.
+    
+    Results are written to a JSONL file in the local batch store as they are
+    streamed, in the order the API returns them; the max_inline_results with
+    the lowest request index are also included in the response. Progress notifications
+    are sent while results are streamed and validated.
+    
+    Args:
+        job_id: Job identifier returned by submit_batch_job
+        ctx: MCP request context used to send progress notifications
+        wait: Wait for an unfinished job to complete (default: False)
+        max_inline_results: Number of results to include in the response (default: 20)
+    
+    Returns:
+        JSON string with job status, success/failure counts, results file path and results
+    """
+    logger.info(f"Batch job results request: {job_id}")
+    
+    def sort_key(result):
+        return (result["index"] is None, result["index"] or 0)
+    
+    try:
+        # One status lookup, reused (and kept current) by the results stream
+        record = await openai_client.get_batch_status(job_id)
+        total = 0
+        succeeded = 0
+        inline = []
+        with ExitStack() as stack:
+            write_result = None
+            async with aclosing(openai_client.iter_batch_results(job_id, wait=wait, record=record)) as stream:
+                async for result in stream:
+                    if write_result is None:
+                        # Opened on the first result, so a job without results keeps its previous file
+                        write_result = stack.enter_context(openai_client.batch_store.results_writer(job_id))
+                    write_result(result)
+                    total += 1
+                    succeeded += bool(result["success"])
+                    # Only the lowest-indexed results are returned inline; don't hold the rest
+                    inline.append(result)
+                    if len(inline) > 2 * max_inline_results:
+                        inline = sorted(inline, key=sort_key)[:max_inline_results]
+                    await ctx.report_progress(progress=total)
+        
+        if not total:
+            return json.dumps({"job_id": job_id, "status": record["status"], "message": "No results available yet"}, indent=2)
+        
+        logger.info(f"Batch job results: {job_id} - succeeded={succeeded}, failed={total - succeeded}")
+        
+        return json.dumps({
+            "job_id": job_id,
+            "status": record["status"],
+            "succeeded": succeeded,
+            "failed": total - succeeded,
+            "results_path": str(openai_client.batch_store.results_path(job_id)),
+            "results": sorted(inline, key=sort_key)[:max_inline_results]
+        }, indent=2)
+        
+    except KeyError as e:
+        return f"Error: {e.args[0]}"
+    except Exception as e:
+        error_msg = f"Error retrieving batch job results: {str(e)}"
+        logger.error(error_msg)
+        logger.debug(f"Batch results exception details", exc_info=True)
+        return error_msg
+
+
 @mcp.tool(
     annotations={
         "title": "List Available Schemas",
@@ -350,7 +600,7 @@ async def list_schemas() -> str:
     result += "• Use 'sentiment_analysis' for detailed emotion and sentiment analysis\n"
     result += "• Use 'custom_structured_query' with any schema for maximum flexibility\n"
     
-    logger.debug(f"Schema list generated, length: {len(result)}")
+    lazy_debug(logger, lambda: f"Schema list generated, length: {len(result)}")
     return result
 
 
@@ -422,8 +672,8 @@ async def health_check() -> str:
 def main():
     """Main entry point for the MCP server with enhanced logging."""
     logger.info("Starting OpenAI Structured MCP server...")
-    logger.debug(f"Server configuration: FastMCP instance={type(mcp).__name__}")
-    logger.debug(f"Available tools: {[tool for tool in dir(mcp) if not tool.startswith('_')]}")
+    lazy_debug(logger, lambda: f"Server configuration: FastMCP instance={type(mcp).__name__}")
+    lazy_debug(logger, lambda: f"Available tools: {[tool for tool in dir(mcp) if not tool.startswith('_')]}")
     
     try:
         logger.debug("Starting FastMCP server with stdio transport")
@@ -437,6 +687,7 @@ def main():
         raise
     finally:
         logger.debug("Server shutdown complete")
+        shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""Tests for Batch API support against a local stand-in OpenAI server."""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from openai_structured_mcp.batch import BatchJobStore, build_batch_requests, parse_batch_result
+from openai_structured_mcp.client import OpenAIStructuredClient
+from openai_structured_mcp.schemas import get_compiled_schema
+
+VALID_EXTRACTION = {
+    "entities": ["OpenAI"],
+    "key_facts": ["Batches are cheaper"],
+    "summary": "A summary of the batch document.",
+    "confidence_score": 0.9
+}
+
+
+class StandInOpenAI:
+    """Minimal stand-in for the OpenAI Files and Batches endpoints."""
+
+    def __init__(self):
+        self.requests = []
+        self.input_lines = []
+        self.retrieve_count = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def batch(self, status, **extra):
+        return {
+            "id": "batch_1", "object": "batch", "endpoint": "/v1/chat/completions",
+            "input_file_id": "file-in", "completion_window": "24h", "created_at": 0,
+            "status": status, "request_counts": {"total": len(self.input_lines), "completed": 0, "failed": 0},
+            **extra
+        }
+
+    def output_file(self):
+        lines = []
+        for request in self.input_lines:
+            index = int(request["custom_id"].split("-")[1])
+            if index == 1:
+                continue  # reported in the error file
+            content = VALID_EXTRACTION if index != 2 else {"entities": []}
+            lines.append({
+                "id": f"resp-{index}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [{"message": {"content": json.dumps(content)}, "finish_reason": "stop"}],
+                        "usage": {"total_tokens": 42}
+                    }
+                },
+                "error": None
+            })
+        return "".join(json.dumps(line) + "\n" for line in lines)
+
+    def error_file(self):
+        return json.dumps({
+            "id": "resp-1", "custom_id": "item-1", "response": None,
+            "error": {"code": "server_error", "message": "Upstream failure"}
+        }) + "\n"
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json"):
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stand_in.requests.append(("POST", self.path))
+                if self.path == "/v1/files":
+                    stand_in.input_lines = [
+                        json.loads(line) for line in body.split(b"\n") if line.startswith(b'{"custom_id"')
+                    ]
+                    self._send(200, {
+                        "id": "file-in", "object": "file", "bytes": len(body), "created_at": 0,
+                        "filename": "input.jsonl", "purpose": "batch", "status": "processed"
+                    })
+                elif self.path == "/v1/batches":
+                    self._send(200, stand_in.batch("validating", metadata=json.loads(body)["metadata"]))
+                else:
+                    self._send(404, {"error": {"message": "not found"}})
+
+            def do_GET(self):
+                stand_in.requests.append(("GET", self.path))
+                if self.path == "/v1/batches/batch_1":
+                    stand_in.retrieve_count += 1
+                    if stand_in.retrieve_count < 2:
+                        self._send(200, stand_in.batch("in_progress"))
+                    else:
+                        self._send(200, stand_in.batch("completed", output_file_id="file-out", error_file_id="file-err"))
+                elif self.path == "/v1/files/file-out/content":
+                    self._send(200, stand_in.output_file().encode(), "application/jsonl")
+                elif self.path == "/v1/files/file-err/content":
+                    self._send(200, stand_in.error_file().encode(), "application/jsonl")
+                elif self.path == "/v1/models":
+                    self._send(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "created": 0, "owned_by": "test"}]})
+                else:
+                    self._send(404, {"error": {"message": "not found"}})
+
+        return Handler
+
+
+@pytest.fixture
+def stand_in_openai():
+    """Run the stand-in OpenAI server for one test."""
+    stand_in = StandInOpenAI()
+    stand_in.thread.start()
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+
+
+@pytest.fixture
+def batch_client(stand_in_openai, tmp_path):
+    """Client pointed at the stand-in server with a temporary job store."""
+    with patch.dict(os.environ, {"OPENAI_BASE_URL": stand_in_openai.base_url, "OPENAI_BATCH_DIR": str(tmp_path)}):
+        yield OpenAIStructuredClient()
+
+
+class TestBatchRequests:
+    """Test JSONL request building and result parsing."""
+
+    def test_build_batch_requests(self):
+        """Test one request line per prompt with the shared response format."""
+        content = build_batch_requests(["first", "second"], "data_extraction", "gpt-4o-mini", system_message="Extract")
+        lines = [json.loads(line) for line in content.decode().splitlines()]
+
+        assert [line["custom_id"] for line in lines] == ["item-0", "item-1"]
+        assert lines[0]["url"] == "/v1/chat/completions"
+        assert lines[1]["body"]["messages"] == [
+            {"role": "system", "content": "Extract"},
+            {"role": "user", "content": "second"}
+        ]
+        assert lines[0]["body"]["response_format"] == get_compiled_schema("data_extraction").response_format
+
+    def test_parse_batch_result_validation_error(self):
+        """Test that schema violations are reported per item."""
+        line = {
+            "custom_id": "item-3",
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "{\"entities\": []}"}}]}}
+        }
+
+        result = parse_batch_result(line, "data_extraction")
+
+        assert result["index"] == 3
+        assert result["success"] is False
+        assert result["error_type"] == "validation_error"
+
+
+class TestBatchJobStore:
+    """Test the local job store."""
+
+    def test_create_get_and_list(self, tmp_path):
+        """Test that job records are persisted with their input file."""
+        store = BatchJobStore(str(tmp_path))
+        record = store.create("data_extraction", "gpt-4o-mini", 2, b"{}\n{}\n")
+
+        assert store.get(record["job_id"])["status"] == "created"
+        assert store.input_path(record["job_id"]).read_bytes() == b"{}\n{}\n"
+        assert [job["job_id"] for job in store.list()] == [record["job_id"]]
+
+    def test_get_rejects_invalid_job_ids(self, tmp_path):
+        """Test that job ids cannot escape the store directory."""
+        store = BatchJobStore(str(tmp_path))
+
+        assert store.get("../../etc/passwd") is None
+        assert store.get("job_0000000000000000") is None
+
+
+class TestBatchClient:
+    """Test batch submission and results against the stand-in server."""
+
+    @pytest.mark.asyncio
+    async def test_submit_and_stream_results(self, batch_client, stand_in_openai):
+        """Test the full submit, poll and validated results flow."""
+        record = await batch_client.submit_batch(["doc 0", "doc 1", "doc 2", "doc 3"], "data_extraction")
+
+        assert record["batch_id"] == "batch_1"
+        assert record["status"] == "validating"
+        assert len(stand_in_openai.input_lines) == 4
+        assert stand_in_openai.input_lines[0]["body"]["model"] == "gpt-4o-mini"
+        assert batch_client.batch_store.get(record["job_id"])["input_file_id"] == "file-in"
+
+        results = [result async for result in batch_client.iter_batch_results(record["job_id"], poll_interval=0)]
+
+        by_index = {result["index"]: result for result in results}
+        assert sorted(by_index) == [0, 1, 2, 3]
+        assert by_index[0]["success"] is True
+        assert by_index[0]["data"] == VALID_EXTRACTION
+        assert by_index[1]["error"] == "Upstream failure"
+        assert by_index[2]["error_type"] == "validation_error"
+        assert batch_client.batch_store.get(record["job_id"])["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_results_reuse_the_callers_status(self, batch_client, stand_in_openai):
+        """Test that a record passed in is not fetched again and is kept current while polling."""
+        submitted = await batch_client.submit_batch(["doc 0", "doc 1", "doc 2", "doc 3"], "data_extraction")
+        record = await batch_client.get_batch_status(submitted["job_id"])
+        retrieved = stand_in_openai.retrieve_count
+
+        results = [result async for result in batch_client.iter_batch_results(submitted["job_id"], poll_interval=0, record=record)]
+
+        assert len(results) == 4
+        assert record["status"] == "completed"
+        assert stand_in_openai.retrieve_count == retrieved + 1
+
+    @pytest.mark.asyncio
+    async def test_results_without_wait_for_unfinished_job(self, batch_client, stand_in_openai):
+        """Test that an unfinished job yields no results when not waiting."""
+        record = await batch_client.submit_batch(["doc 0"], "data_extraction")
+
+        results = [result async for result in batch_client.iter_batch_results(record["job_id"], wait=False)]
+
+        assert results == []
+        assert batch_client.batch_store.get(record["job_id"])["status"] == "in_progress"
+
+    @pytest.mark.asyncio
+    async def test_submit_rejects_unknown_schema(self, batch_client, stand_in_openai):
+        """Test that invalid schemas fail before anything is uploaded."""
+        result = await batch_client.submit_batch(["doc"], "missing_schema")
+
+        assert result["error_type"] == "invalid_schema"
+        assert stand_in_openai.requests == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, batch_client):
+        """Test that unknown jobs raise KeyError."""
+        with pytest.raises(KeyError):
+            await batch_client.get_batch_status("job_ffffffffffffffff")
@@ -391,4 +391,142 @@ class TestOpenAIStructuredClient:
                 models = await client.get_available_models()
                 
                 expected_fallback = ["gpt-5", "gpt-4o", "gpt-4o-mini"]
-                assert models == expected_fallback
\ No newline at end of file
+                assert models == expected_fallback
+    
+    @pytest.mark.asyncio
+    async def test_model_list_is_cached(self, mock_openai_models_response):
+        """Test that the model list is fetched once and validated from the cache."""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            client = OpenAIStructuredClient()
+            
+            with patch.object(client.client.models, 'list', AsyncMock(return_value=mock_openai_models_response)) as mock_list:
+                await client.warm_up()
+                assert await client.is_model_available("gpt-4-turbo")
+                assert not await client.is_model_available("unknown-model")
+                await client.get_available_models()
+            
+            assert mock_list.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_stale_model_list_refreshes_in_background(self, mock_openai_models_response):
+        """Test stale-while-revalidate: the stale list is served while a refresh runs."""
+        from types import SimpleNamespace
+        
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            client = OpenAIStructuredClient()
+            client.models_cache_ttl = 0
+            refreshed = SimpleNamespace(data=[SimpleNamespace(id="gpt-6")])
+            
+            with patch.object(client.client.models, 'list', AsyncMock(side_effect=[mock_openai_models_response, refreshed])) as mock_list:
+                await client.get_available_models()
+                stale = await client.get_available_models()
+                assert "gpt-5" in stale
+                
+                await client._models_refresh
+                assert await client.get_available_models() == ["gpt-6"]
+            
+            assert mock_list.await_count >= 2
+    
+    @pytest.mark.asyncio
+    async def test_model_list_failure_is_not_retried_immediately(self):
+        """Test that a failed fetch falls back without hitting the API on every call."""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            client = OpenAIStructuredClient()
+            
+            with patch.object(client.client.models, 'list', AsyncMock(side_effect=Exception("API Error"))) as mock_list:
+                assert await client.is_model_available("gpt-5")
+                assert not await client.is_model_available("unknown-model")
+            
+            assert mock_list.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_extract_data_many_runs_concurrently(self, mock_openai_response):
+        """Test concurrent extraction with ordered items, per-item timing and validation."""
+        import asyncio
+        
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            client = OpenAIStructuredClient()
+            active = 0
+            peak = 0
+            
+            async def fake_create(**kwargs):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                completion = MagicMock()
+                if kwargs["messages"][-1]["content"] == "invalid":
+                    invalid = dict(mock_openai_response, choices=[{"message": {"content": '{"entities": []}'}, "finish_reason": "stop"}])
+                    completion.model_dump.return_value = invalid
+                else:
+                    completion.model_dump.return_value = mock_openai_response
+                return completion
+            
+            texts = ["doc 0", "invalid", "doc 2", "doc 3", "doc 4"]
+            with patch.object(client, 'is_model_available', AsyncMock(return_value=True)), \
+                 patch.object(client.client.chat.completions, 'create', AsyncMock(side_effect=fake_create)):
+                result = await client.extract_data_many(texts, max_concurrency=2)
+            
+            assert peak == 2
+            assert [item["index"] for item in result["items"]] == [0, 1, 2, 3, 4]
+            assert result["items"][0]["data"]["entities"] == ["OpenAI", "Python", "JSON Schema"]
+            assert result["items"][1]["error_type"] == "validation_error"
+            assert all(item["duration_ms"] > 0 for item in result["items"])
+            assert result["success"] is False
+            assert result["summary"]["succeeded"] == 4
+            assert result["summary"]["failed"] == 1
+            assert result["summary"]["wall_time_ms"] < result["summary"]["total_item_time_ms"]
+    
+    @pytest.mark.asyncio
+    async def test_structured_completion_retries_rate_limit(self, mock_openai_response):
+        """Test that rate limit errors are retried before succeeding."""
+        import httpx
+        from openai import RateLimitError
+        from openai_structured_mcp.utils.retry import RetryPolicy
+        
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            client = OpenAIStructuredClient()
+            client.retry_policy = RetryPolicy(max_retries=2, base_delay=0)
+            
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            rate_limit = RateLimitError(
+                "Rate limit", response=httpx.Response(429, headers={"retry-after": "0"}, request=request), body=None
+            )
+            mock_completion = MagicMock()
+            mock_completion.model_dump.return_value = mock_openai_response
+            
+            with patch.object(client, 'get_available_models', AsyncMock(return_value=[client.default_model])), \
+                 patch.object(client.client.chat.completions, 'create', AsyncMock(side_effect=[rate_limit, mock_completion])) as mock_create:
+                result = await client.structured_completion(
+                    prompt="Extract data from this text",
+                    schema_name="data_extraction"
+                )
+            
+            assert result["success"] is True
+            assert mock_create.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_structured_completion_rate_limit_exhausts_retries(self):
+        """Test that persistent rate limiting returns an error after all retries."""
+        import httpx
+        from openai import RateLimitError
+        from openai_structured_mcp.utils.retry import RetryPolicy
+        
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            client = OpenAIStructuredClient()
+            client.retry_policy = RetryPolicy(max_retries=1, base_delay=0)
+            
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            rate_limit = RateLimitError("Rate limit", response=httpx.Response(429, request=request), body=None)
+            
+            with patch.object(client, 'get_available_models', AsyncMock(return_value=[client.default_model])), \
+                 patch.object(client.client.chat.completions, 'create', AsyncMock(side_effect=rate_limit)) as mock_create:
+                result = await client.structured_completion(
+                    prompt="Extract data from this text",
+                    schema_name="data_extraction"
+                )
+            
+            assert result["error_type"] == "rate_limit"
+            assert result["attempts"] == 2
+            assert mock_create.await_count == 2
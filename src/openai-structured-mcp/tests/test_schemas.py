@@ -14,6 +14,7 @@ from openai_structured_mcp.schemas import (
     ValidationError,
     PriorityLevel,
     Sentiment,
+    get_compiled_schema,
     get_json_schema,
     validate_structured_data,
     SCHEMA_REGISTRY
@@ -250,6 +251,45 @@ class TestSchemaUtilities:
             assert isinstance(schema, dict)
             assert "properties" in schema
 
+    
+    def test_compiled_schema_is_built_once(self):
+        """Test that schema artifacts are generated once and shared."""
+        compiled = get_compiled_schema("code_analysis")
+        
+        assert get_compiled_schema("code_analysis") is compiled
+        assert get_json_schema("code_analysis") == compiled.json_schema
+        assert compiled.response_format["json_schema"]["schema"] == compiled.json_schema
+        assert compiled.response_format["json_schema"]["name"] == "code_analysis"
+        assert compiled.response_format["json_schema"]["strict"] is True
+    
+    def test_compiled_schema_copies_are_independent(self):
+        """Test that mutating a returned schema does not change the cached one."""
+        compiled = get_compiled_schema("code_analysis")
+        
+        get_json_schema("code_analysis")["properties"].clear()
+        compiled.response_format["json_schema"]["schema"]["title"] = "changed"
+        
+        assert get_json_schema("code_analysis")["properties"]
+        assert compiled.response_format["json_schema"]["schema"]["title"] == "CodeAnalysis"
+    
+    def test_compiled_schema_invalid(self):
+        """Test that unknown schemas raise KeyError."""
+        with pytest.raises(KeyError, match="Schema 'missing' not found"):
+            get_compiled_schema("missing")
+    
+    def test_validate_structured_data_uses_compiled_adapter(self):
+        """Test validation returns model instances through the cached adapter."""
+        data = {
+            "overall_sentiment": "positive",
+            "confidence": 0.9,
+            "key_phrases": ["great"],
+            "reasoning": "The text expresses clear satisfaction."
+        }
+        
+        result = validate_structured_data(data, "sentiment_analysis")
+        
+        assert isinstance(result, SentimentAnalysis)
+
 
 class TestSchemaEnums:
     """Test enum value validation."""
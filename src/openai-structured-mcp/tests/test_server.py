@@ -344,6 +344,66 @@ class TestMCPTools:
             result = await server.extract_data(text="Test text")
         
         assert "Error during data extraction: Unexpected error" in result
+    
+    @pytest.mark.asyncio
+    async def test_get_batch_job_results(self, mock_openai_client, tmp_path):
+        """Test that batch results are ordered, counted and written to the store."""
+        from openai_structured_mcp.batch import BatchJobStore
+        
+        async def fake_results(job_id, wait=False, record=None):
+            yield {"custom_id": "item-1", "index": 1, "success": False, "error": "Response validation failed"}
+            yield {"custom_id": "item-0", "index": 0, "success": True, "data": {"entities": []}}
+        
+        mock_openai_client.iter_batch_results = MagicMock(side_effect=fake_results)
+        mock_openai_client.get_batch_status.return_value = {"job_id": "job_1", "status": "completed"}
+        mock_openai_client.batch_store = BatchJobStore(str(tmp_path))
+        ctx = AsyncMock()
+        
+        with patch.object(server, 'openai_client', mock_openai_client):
+            result = json.loads(await server.get_batch_job_results("job_1", ctx))
+        
+        assert result["succeeded"] == 1
+        assert result["failed"] == 1
+        assert [item["index"] for item in result["results"]] == [0, 1]
+        assert (tmp_path / "job_1.results.jsonl").read_text().count("\n") == 2
+        assert ctx.report_progress.await_count == 2
+        mock_openai_client.get_batch_status.assert_awaited_once_with("job_1")
+        assert mock_openai_client.iter_batch_results.call_args.kwargs["record"] == {"job_id": "job_1", "status": "completed"}
+    
+    @pytest.mark.asyncio
+    async def test_get_batch_job_status_unknown(self, mock_openai_client):
+        """Test status lookup of an unknown job."""
+        mock_openai_client.get_batch_status.side_effect = KeyError("Batch job 'job_x' not found")
+        
+        with patch.object(server, 'openai_client', mock_openai_client):
+            result = await server.get_batch_job_status("job_x")
+        
+        assert result == "Error: Batch job 'job_x' not found"
+    
+    @pytest.mark.asyncio
+    async def test_extract_data_many(self, mock_openai_client):
+        """Test multi-document extraction returns the combined JSON document."""
+        mock_openai_client.extract_data_many.return_value = {
+            "success": True,
+            "items": [{"index": 0, "success": True, "duration_ms": 12.5, "data": {"entities": []}}],
+            "summary": {"count": 1, "succeeded": 1, "failed": 0}
+        }
+        
+        with patch.object(server, 'openai_client', mock_openai_client):
+            result = json.loads(await server.extract_data_many(["text"], max_concurrency=4))
+        
+        assert result["items"][0]["duration_ms"] == 12.5
+        assert mock_openai_client.extract_data_many.call_args.kwargs["max_concurrency"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_extract_data_many_limits(self, mock_openai_client):
+        """Test empty and oversized requests are rejected without API calls."""
+        with patch.object(server, 'openai_client', mock_openai_client), \
+             patch.object(server, 'EXTRACT_MANY_MAX_ITEMS', 2):
+            assert "no texts" in await server.extract_data_many([])
+            assert "too many texts" in await server.extract_data_many(["a", "b", "c"])
+        
+        mock_openai_client.extract_data_many.assert_not_called()
 
 
 class TestServerInitialization:
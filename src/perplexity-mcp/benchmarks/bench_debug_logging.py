@@ -0,0 +1,71 @@
+"""Micro-benchmark: per-request logging overhead at INFO, DEBUG and with logging off.
+
+Runs the logging a search request does (parameter dump, API request and
+response events, response structure) through the real logging setup.
+"eager" builds the same messages with plain logger.debug(f"...") calls for
+comparison. With logging off everything is skipped; at INFO the DEBUG-only
+messages are skipped but API events are still written, as the API log
+records every request whenever logging is enabled.
+
+Run from the package directory:
+
+    PYTHONPATH=src python benchmarks/bench_debug_logging.py
+"""
+
+import os
+import tempfile
+import timeit
+
+from perplexity_mcp.utils.logging import lazy_debug, log_api_request, log_api_response, setup_logging, shutdown_logging
+
+URL = "https://api.perplexity.ai/chat/completions"
+HEADERS = {"Authorization": "Bearer pplx-secret", "Content-Type": "application/json"}
+QUERY = "How do queue-based log handlers keep asyncio event loops responsive? " * 8
+REQUEST = {
+    "model": "sonar",
+    "messages": [{"role": "system", "content": "Be precise."}, {"role": "user", "content": QUERY}],
+    "max_tokens": 1024,
+    "temperature": 0.2,
+    "search_domain_filter": ["docs.python.org", "github.com"],
+    "return_citations": True
+}
+RESULT = {
+    "id": "resp_1",
+    "model": "sonar",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Answer " * 400}, "finish_reason": "stop"}],
+    "citations": [f"https://example.com/source/{i}" for i in range(20)],
+    "usage": {"prompt_tokens": 120, "completion_tokens": 800, "total_tokens": 920}
+}
+
+
+def lazy_request(logger) -> None:
+    lazy_debug(logger, lambda: f"Full research parameters: query_length={len(QUERY)}, model={REQUEST['model']}, max_tokens={REQUEST['max_tokens']}, temperature={REQUEST['temperature']}, search_domain_filter={REQUEST['search_domain_filter']}")
+    request_id = log_api_request("POST", URL, HEADERS, REQUEST)
+    lazy_debug(logger, lambda: f"Response structure: {list(RESULT.keys())}")
+    log_api_response(request_id, 200, RESULT, 250.0)
+    lazy_debug(logger, lambda: f"Full usage details: {RESULT['usage']}")
+
+
+def eager_request(logger) -> None:
+    logger.debug(f"Full research parameters: query_length={len(QUERY)}, model={REQUEST['model']}, max_tokens={REQUEST['max_tokens']}, temperature={REQUEST['temperature']}, search_domain_filter={REQUEST['search_domain_filter']}")
+    request_id = log_api_request("POST", URL, HEADERS, REQUEST)
+    logger.debug(f"Response structure: {list(RESULT.keys())}")
+    log_api_response(request_id, 200, RESULT, 250.0)
+    logger.debug(f"Full usage details: {RESULT['usage']}")
+
+
+def main() -> None:
+    number = 5000
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.environ["PERPLEXITY_LOG_PATH"] = log_dir
+        for level in ("none", "INFO", "DEBUG"):
+            os.environ["PERPLEXITY_LOG_LEVEL"] = level
+            logger = setup_logging()
+            for label, request in (("lazy", lazy_request), ("eager", eager_request)):
+                best = min(timeit.repeat(lambda: request(logger), number=number, repeat=5)) / number
+                print(f"{level:>5} {label:>5}: {best * 1e6:8.2f} us/request")
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
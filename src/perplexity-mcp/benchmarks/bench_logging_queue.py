@@ -0,0 +1,97 @@
+"""Benchmark: event-loop stalls caused by file logging, with and without the log queue.
+
+A ticker coroutine measures how late the event loop wakes it up while other
+coroutines write DEBUG lines to the API log. With PERPLEXITY_LOG_ASYNC the
+loop only enqueues records and a background thread writes them.
+
+On a fast local disk both modes are bound by record creation; the queue
+pays off when writes block. Simulate slow storage (e.g. a network mount)
+with a per-flush delay:
+
+    PYTHONPATH=src python benchmarks/bench_logging_queue.py
+    PYTHONPATH=src python benchmarks/bench_logging_queue.py --flush-latency-ms 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from perplexity_mcp.utils.logging import setup_api_logging, shutdown_logging
+
+TICK_INTERVAL = 0.001
+WRITERS = 8
+LINES_PER_WRITER = 5000
+PAYLOAD = "x" * 400
+
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    """Record how late each wake-up is compared with the requested interval."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append(time.perf_counter() - start - TICK_INTERVAL)
+
+
+async def writer(logger, index: int) -> None:
+    """Log lines in small bursts, yielding to the loop between bursts."""
+    for i in range(LINES_PER_WRITER):
+        logger.debug(f"writer={index} line={i} payload={PAYLOAD}")
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+
+
+async def run(async_logging: bool) -> Dict[str, float]:
+    os.environ["PERPLEXITY_LOG_ASYNC"] = "true" if async_logging else "false"
+    with tempfile.TemporaryDirectory() as log_dir:
+        logger = setup_api_logging(log_dir)
+        lags: List[float] = []
+        stop = asyncio.Event()
+        tick = asyncio.create_task(ticker(lags, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(writer(logger, i) for i in range(WRITERS)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await tick
+        shutdown_logging()
+        logger.handlers.clear()
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "p99": lags[int(len(lags) * 0.99)] if lags else 0.0,
+        "max": lags[-1] if lags else 0.0
+    }
+
+
+def simulate_flush_latency(latency: float) -> None:
+    """Make every stream flush (one write to the log file) take at least latency seconds."""
+    flush = logging.StreamHandler.flush
+
+    def slow_flush(self):
+        time.sleep(latency)
+        flush(self)
+
+    logging.StreamHandler.flush = slow_flush
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flush-latency-ms", type=float, default=0.0, help="Simulated latency of each log file write")
+    args = parser.parse_args()
+    if args.flush_latency_ms:
+        simulate_flush_latency(args.flush_latency_ms / 1e3)
+
+    for label, async_logging in (("direct", False), ("queued", True)):
+        result = asyncio.run(run(async_logging))
+        print(
+            f"{label:>7}: {WRITERS * LINES_PER_WRITER / result['elapsed']:10.0f} lines/s on the loop, "
+            f"tick lag p99 {result['p99'] * 1e3:6.2f} ms, max {result['max'] * 1e3:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
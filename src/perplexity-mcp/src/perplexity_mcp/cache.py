@@ -0,0 +1,459 @@
+"""Response caches for Perplexity API queries (in-memory and persistent on-disk)."""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def make_cache_key(data: Dict[str, Any]) -> str:
+    """
+    Build a stable cache key from a request payload.
+
+    The payload is serialized with sorted keys and compact separators so that
+    equivalent requests map to the same key regardless of dict ordering.
+
+    Args:
+        data: Request payload as sent to the API
+
+    Returns:
+        Hex digest identifying the request
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """TTL + LRU cache for successful API responses keyed on the request payload."""
+
+    # Recency filters whose results go stale quickly
+    SHORT_LIVED_RECENCY_FILTERS = ("hour", "day")
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        recent_ttl: Optional[float] = None,
+        deep_research_ttl: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum number of cached responses (PERPLEXITY_CACHE_MAX_ENTRIES)
+            default_ttl: Default time-to-live in seconds (PERPLEXITY_CACHE_TTL)
+            recent_ttl: TTL for "hour"/"day" recency-filtered queries (PERPLEXITY_CACHE_TTL_RECENT)
+            deep_research_ttl: TTL for sonar-deep-research queries (PERPLEXITY_CACHE_TTL_DEEP_RESEARCH)
+            enabled: Whether caching is enabled (PERPLEXITY_CACHE_ENABLED)
+        """
+        self.enabled = enabled if enabled is not None else (
+            os.getenv("PERPLEXITY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("PERPLEXITY_CACHE_MAX_ENTRIES", "256"))
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("PERPLEXITY_CACHE_TTL", "3600"))
+        self.recent_ttl = recent_ttl if recent_ttl is not None else float(os.getenv("PERPLEXITY_CACHE_TTL_RECENT", "300"))
+        self.deep_research_ttl = deep_research_ttl if deep_research_ttl is not None else (
+            float(os.getenv("PERPLEXITY_CACHE_TTL_DEEP_RESEARCH", "86400"))
+        )
+        self.model_ttls = {"sonar-deep-research": self.deep_research_ttl}
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        logger.debug(f"Response cache configuration: enabled={self.enabled}, max_entries={self.max_entries}, default_ttl={self.default_ttl}s, recent_ttl={self.recent_ttl}s, deep_research_ttl={self.deep_research_ttl}s")
+
+    def ttl_for(self, data: Dict[str, Any]) -> float:
+        """
+        Determine the time-to-live for a request payload.
+
+        Args:
+            data: Request payload
+
+        Returns:
+            TTL in seconds
+        """
+        if data.get("search_recency_filter") in self.SHORT_LIVED_RECENCY_FILTERS:
+            return self.recent_ttl
+        return self.model_ttls.get(data.get("model"), self.default_ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Copy of the cached response, or None on miss or expiry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, response = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(response)
+
+    def set(self, key: str, response: Dict[str, Any], ttl: float) -> None:
+        """
+        Store a response, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key from make_cache_key()
+            response: Successful API response
+            ttl: Time-to-live in seconds
+        """
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(response))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hit/miss counters and current size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries
+        }
+
+
+class DiskCache:
+    """
+    Persistent SQLite-backed response cache that survives server restarts.
+
+    Writes run in WAL mode inside transactions, so a crash never leaves a
+    partially written entry behind. Lookups go through the primary key index
+    with SQLite memory-mapped I/O enabled. Total payload size is bounded;
+    expired and least recently used entries are evicted first.
+
+    The async aget()/aset()/astats()/aclose() methods run SQLite on a dedicated
+    worker thread so the cache never blocks the event loop. Closing releases
+    the connection and the worker thread; the next lookup reopens both.
+    """
+
+    DB_FILENAME = "perplexity_cache.sqlite3"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        mmap_bytes: Optional[int] = None,
+        models: Optional[List[str]] = None
+    ):
+        """
+        Initialize disk cache. The cache is disabled when no directory is configured.
+
+        Args:
+            cache_dir: Directory for the cache database (PERPLEXITY_CACHE_DIR)
+            max_bytes: Maximum total size of cached responses (PERPLEXITY_DISK_CACHE_MAX_BYTES)
+            mmap_bytes: SQLite memory-map size for lookups (PERPLEXITY_DISK_CACHE_MMAP_BYTES)
+            models: Models whose responses are persisted (PERPLEXITY_DISK_CACHE_MODELS)
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else os.getenv("PERPLEXITY_CACHE_DIR")
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("PERPLEXITY_DISK_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+        self.mmap_bytes = mmap_bytes if mmap_bytes is not None else int(os.getenv("PERPLEXITY_DISK_CACHE_MMAP_BYTES", str(64 * 1024 * 1024)))
+        if models is None:
+            models = [m.strip() for m in os.getenv("PERPLEXITY_DISK_CACHE_MODELS", "sonar-deep-research").split(",") if m.strip()]
+        self.models = set(models)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._failed = False
+        # One connection shared by the async worker thread and synchronous callers
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        if self.cache_dir:
+            self._connection()
+
+        logger.debug(f"Disk cache configuration: enabled={self.enabled}, cache_dir={self.cache_dir}, max_bytes={self.max_bytes}, models={sorted(self.models)}")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the disk cache is available."""
+        return bool(self.cache_dir) and not self._failed
+
+    @property
+    def db_path(self) -> Optional[Path]:
+        """Path of the cache database file."""
+        return Path(self.cache_dir).expanduser() / self.DB_FILENAME if self.cache_dir else None
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Return the open connection, (re)opening it if needed; None if the cache is unavailable."""
+        with self._lock:
+            if self._conn is None and self.enabled:
+                try:
+                    self._open()
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"Disk cache disabled - could not open '{self.cache_dir}': {e}")
+                    self._failed = True
+            return self._conn
+
+    def _open(self) -> None:
+        """Open (and create if needed) the cache database."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " response TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn = conn
+
+    def should_store(self, data: Dict[str, Any]) -> bool:
+        """
+        Check whether a request's response belongs in the disk cache.
+
+        Args:
+            data: Request payload
+
+        Returns:
+            True if the disk cache is enabled and the model is persisted
+        """
+        return self.enabled and data.get("model") in self.models
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a persisted response.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Cached response, or None on miss, expiry or database error
+        """
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+
+            now = time.time()
+            try:
+                row = conn.execute(
+                    "SELECT expires_at, response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[0] <= now:
+                    if row is not None:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.misses += 1
+                    return None
+
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[1])
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Disk cache lookup failed: {e}")
+                self.misses += 1
+                return None
+
+    def set(self, key: str, response: Dict[str, Any], ttl: float, model: Optional[str] = None) -> None:
+        """
+        Persist a response atomically and evict entries beyond the size bound.
+
+        Args:
+            key: Cache key from make_cache_key()
+            response: Successful API response
+            ttl: Time-to-live in seconds
+            model: Model that produced the response
+        """
+        if not self.enabled or ttl <= 0:
+            return
+
+        payload = json.dumps(response, separators=(",", ":"), ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.debug(f"Response too large for disk cache: {size} bytes")
+            return
+
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+
+            now = time.time()
+            try:
+                with self._transaction():
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, model, expires_at, last_access, size, response) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, model, now + ttl, now, size, payload)
+                    )
+                    self._evict(now)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache write failed: {e}")
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a persisted response without blocking the event loop.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Cached response, or None on miss, expiry or database error
+        """
+        if not self.enabled:
+            return None
+        return await self._run(self.get, key)
+
+    async def aset(self, key: str, response: Dict[str, Any], ttl: float, model: Optional[str] = None) -> None:
+        """
+        Persist a response without blocking the event loop.
+
+        Args:
+            key: Cache key from make_cache_key()
+            response: Successful API response
+            ttl: Time-to-live in seconds
+            model: Model that produced the response
+        """
+        if not self.enabled or ttl <= 0:
+            return
+        await self._run(self.set, key, response, ttl, model)
+
+    async def _run(self, func, *args):
+        """Run a blocking cache call on the cache's worker thread."""
+        if self._executor is None:
+            # A single worker keeps SQLite access serialized and in order
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="perplexity-disk-cache")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    @contextmanager
+    def _transaction(self):
+        """Wrap statements in a single IMMEDIATE transaction."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _evict(self, now: float) -> None:
+        """Remove expired entries, then least recently used ones until under max_bytes."""
+        self.evictions += self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def close(self) -> None:
+        """Stop the worker thread and close the database connection; both are reopened on next use."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+        self._release()
+
+    async def aclose(self) -> None:
+        """Close the cache without blocking the event loop."""
+        executor = self._executor
+        if executor is None:
+            self._release()
+            return
+        # The close runs after any queued cache work; the worker then exits on its own
+        await self._run(self._release)
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def _release(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get disk cache counters.
+
+        Returns:
+            Dictionary with hit/miss counters, entry count and size on disk
+        """
+        entries, total = 0, 0
+        with self._lock:
+            if self._connection() is not None:
+                try:
+                    entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+                except sqlite3.Error:
+                    pass
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes
+        }
+
+    async def astats(self) -> Dict[str, Any]:
+        """
+        Get disk cache counters without blocking the event loop.
+
+        Returns:
+            Dictionary with hit/miss counters, entry count and size on disk
+        """
+        if not self.enabled:
+            return self.stats()
+        return await self._run(self.stats)
@@ -1,19 +1,137 @@
 """Perplexity API client implementation."""
 
 import httpx
+import copy
+import json
 import os
 import time
-from typing import Dict, Any, List, Optional
-from functools import wraps
+from importlib.util import find_spec
+from typing import AsyncIterator, Dict, Any, List, Optional
+from functools import partial, wraps
 import asyncio
+from contextlib import aclosing
 
-from .utils.logging import get_logger, log_api_request, log_api_response, debug_decorator
+from .cache import DiskCache, ResponseCache, make_cache_key
+from .rate_limit import RateLimiter, RateLimitTimeout, estimate_tokens
+from .utils.logging import get_logger, log_api_request, log_api_response, debug_decorator, lazy_debug
+from .utils.retry import RetryPolicy, get_status_code
 
 logger = get_logger(__name__)
 
 
+def format_api_error(e: Exception, func_name: str, duration: float, attempts: int) -> Dict[str, Any]:
+    """Convert an exception raised by an API call into an error dictionary."""
+    if isinstance(e, httpx.HTTPStatusError):
+        error_details = {
+            "status_code": e.response.status_code,
+            "response_text": e.response.text,
+            "headers": dict(e.response.headers),
+            "duration_ms": duration,
+            "attempts": attempts
+        }
+        
+        if e.response.status_code == 429:
+            logger.warning(f"Rate limit exceeded - {func_name} - {duration:.2f}ms")
+            logger.debug(f"Rate limit details: {error_details}")
+            return {"error": "Rate limit exceeded. Please try again later.", "details": error_details}
+        elif e.response.status_code == 401:
+            logger.error(f"Authentication failed - {func_name} - {duration:.2f}ms")
+            logger.debug(f"Auth error details: {error_details}")
+            return {"error": "Authentication failed. Check your API key.", "details": error_details}
+        elif e.response.status_code == 400:
+            logger.error(f"Bad request - {func_name} - {duration:.2f}ms: {e.response.text}")
+            logger.debug(f"Bad request details: {error_details}")
+            return {"error": f"Bad request: {e.response.text}", "details": error_details}
+        else:
+            logger.error(f"API error ({e.response.status_code}) - {func_name} - {duration:.2f}ms: {e.response.text}")
+            logger.debug(f"General API error details: {error_details}")
+            return {"error": f"API error ({e.response.status_code}): {e.response.text}", "details": error_details}
+    elif isinstance(e, RateLimitTimeout):
+        logger.warning(f"Client-side rate limit - {func_name} - {duration:.2f}ms: {str(e)}")
+        return {"error": f"Rate limit exceeded: {str(e)}", "details": {"type": type(e).__name__, "retry_after_s": e.delay, "duration_ms": duration, "attempts": attempts}}
+    elif isinstance(e, httpx.RequestError):
+        logger.error(f"Network error - {func_name} - {duration:.2f}ms: {str(e)}")
+        logger.debug(f"Network error details: {{'type': '{type(e).__name__}', 'message': '{str(e)}', 'duration_ms': {duration}}}")
+        return {"error": f"Network error: {str(e)}", "details": {"type": type(e).__name__, "duration_ms": duration, "attempts": attempts}}
+    else:
+        logger.exception(f"Unexpected error in API call - {func_name} - {duration:.2f}ms")
+        logger.debug(f"Unexpected error details: {{'type': '{type(e).__name__}', 'message': '{str(e)}', 'duration_ms': {duration}}}")
+        return {"error": f"Unexpected error: {str(e)}", "details": {"type": type(e).__name__, "duration_ms": duration, "attempts": attempts}}
+
+
+def _chunk_content(chunk: Dict[str, Any]) -> str:
+    """Extract the text delta from a streamed chat.completion.chunk."""
+    choices = chunk.get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content") or ""
+
+
+async def _iter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Parse server-sent events into their data payloads.
+    
+    Args:
+        lines: Lines of the event stream
+        
+    Yields:
+        The data of each event (multi-line data joined with newlines)
+    """
+    buffer: List[str] = []
+    async for line in lines:
+        if not line:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer = []
+        elif line.startswith("data:"):
+            value = line[5:]
+            buffer.append(value[1:] if value.startswith(" ") else value)
+    if buffer:
+        yield "\n".join(buffer)
+
+
+def _aggregate_stream_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine streamed chunks into a regular chat completion response.
+    
+    Args:
+        chunks: Parsed chat.completion.chunk dictionaries
+        
+    Returns:
+        Response dictionary shaped like a non-streaming API response
+    """
+    if not chunks:
+        return {"choices": [{"index": 0, "message": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+    
+    result = dict(chunks[-1])
+    finish_reason = None
+    for chunk in chunks:
+        finish_reason = (chunk.get("choices") or [{}])[0].get("finish_reason") or finish_reason
+    
+    result["object"] = "chat.completion"
+    result["choices"] = [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "".join(_chunk_content(chunk) for chunk in chunks)},
+        "finish_reason": finish_reason
+    }]
+    return result
+
+
+class RetriesExhausted(Exception):
+    """Final failure of a call after its retries; carries the last error and the attempt count."""
+    
+    def __init__(self, error: Exception, attempts: int):
+        super().__init__(str(error))
+        self.error = error
+        self.attempts = attempts
+
+
 def handle_api_errors(func):
-    """Enhanced decorator for handling Perplexity API errors with extensive logging."""
+    """
+    Enhanced decorator for handling Perplexity API errors with extensive logging.
+    
+    Exceptions are converted into error dictionaries. Retries happen inside the
+    decorated call (see PerplexityClient._with_retries), so that coalesced
+    requests share them instead of each caller retrying on its own.
+    """
     @wraps(func)
     async def wrapper(*args, **kwargs):
         func_name = f"{func.__module__}.{func.__name__}"
@@ -25,41 +143,12 @@ def handle_api_errors(func):
             duration = (time.time() - start_time) * 1000
             logger.debug(f"API call completed successfully: {func_name} - {duration:.2f}ms")
             return result
-        except httpx.HTTPStatusError as e:
-            duration = (time.time() - start_time) * 1000
-            error_details = {
-                "status_code": e.response.status_code,
-                "response_text": e.response.text,
-                "headers": dict(e.response.headers),
-                "duration_ms": duration
-            }
-            
-            if e.response.status_code == 429:
-                logger.warning(f"Rate limit exceeded - {func_name} - {duration:.2f}ms")
-                logger.debug(f"Rate limit details: {error_details}")
-                return {"error": "Rate limit exceeded. Please try again later.", "details": error_details}
-            elif e.response.status_code == 401:
-                logger.error(f"Authentication failed - {func_name} - {duration:.2f}ms")
-                logger.debug(f"Auth error details: {error_details}")
-                return {"error": "Authentication failed. Check your API key.", "details": error_details}
-            elif e.response.status_code == 400:
-                logger.error(f"Bad request - {func_name} - {duration:.2f}ms: {e.response.text}")
-                logger.debug(f"Bad request details: {error_details}")
-                return {"error": f"Bad request: {e.response.text}", "details": error_details}
-            else:
-                logger.error(f"API error ({e.response.status_code}) - {func_name} - {duration:.2f}ms: {e.response.text}")
-                logger.debug(f"General API error details: {error_details}")
-                return {"error": f"API error ({e.response.status_code}): {e.response.text}", "details": error_details}
-        except httpx.RequestError as e:
+        except RetriesExhausted as e:
             duration = (time.time() - start_time) * 1000
-            logger.error(f"Network error - {func_name} - {duration:.2f}ms: {str(e)}")
-            logger.debug(f"Network error details: {{'type': '{type(e).__name__}', 'message': '{str(e)}', 'duration_ms': {duration}}}")
-            return {"error": f"Network error: {str(e)}", "details": {"type": type(e).__name__, "duration_ms": duration}}
+            return format_api_error(e.error, func_name, duration, e.attempts)
         except Exception as e:
             duration = (time.time() - start_time) * 1000
-            logger.exception(f"Unexpected error in API call - {func_name} - {duration:.2f}ms")
-            logger.debug(f"Unexpected error details: {{'type': '{type(e).__name__}', 'message': '{str(e)}', 'duration_ms': {duration}}}")
-            return {"error": f"Unexpected error: {str(e)}", "details": {"type": type(e).__name__, "duration_ms": duration}}
+            return format_api_error(e, func_name, duration, 1)
     return wrapper
 
 
@@ -94,12 +183,110 @@ class PerplexityClient:
         self.timeout = float(os.getenv("PERPLEXITY_TIMEOUT", "60.0"))
         self.deep_research_timeout = float(os.getenv("PERPLEXITY_DEEP_RESEARCH_TIMEOUT", "300.0"))
         
+        # Connection pool configuration (shared by all requests of this client)
+        # HTTP/2 needs the optional h2 package (pip install 'httpx[http2]'), so it is opt-in
+        self.http2 = os.getenv("PERPLEXITY_HTTP2", "false").lower() in ("1", "true", "yes")
+        self.max_connections = int(os.getenv("PERPLEXITY_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = int(os.getenv("PERPLEXITY_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.keepalive_expiry = float(os.getenv("PERPLEXITY_KEEPALIVE_EXPIRY", "30.0"))
+        self._http_client: Optional[httpx.AsyncClient] = None
+        
+        # Response caches for repeated identical queries (disk cache persists across restarts)
+        self.cache = ResponseCache()
+        self.disk_cache = DiskCache()
+        
+        # Single-flight: concurrent identical requests share one upstream call
+        self.coalesce_requests = os.getenv("PERPLEXITY_COALESCE_REQUESTS", "true").lower() in ("1", "true", "yes")
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self.coalesced_requests = 0
+        
+        # Retry policy for rate limits, server and connection errors
+        self.retry_policy = RetryPolicy()
+        
+        # Client-side per-model rate limiter (queues callers instead of hitting 429s)
+        self.rate_limiter = RateLimiter()
+        
         # Log configuration
         logger.debug(f"Client configuration: base_url={self.base_url}, timeout={self.timeout}s, deep_research_timeout={self.deep_research_timeout}s")
+        logger.debug(f"Retry policy: max_retries={self.retry_policy.max_retries}, base_delay={self.retry_policy.base_delay}s, max_delay={self.retry_policy.max_delay}s")
+        logger.debug(f"Connection pool: http2={self.http2}, max_connections={self.max_connections}, max_keepalive_connections={self.max_keepalive_connections}, keepalive_expiry={self.keepalive_expiry}s")
         logger.info("Perplexity client initialized successfully")
     
-    @handle_api_errors
-    async def query(
+    def get_request_timeout(self, model: Optional[str] = None, custom_timeout: Optional[float] = None) -> float:
+        """
+        Get the timeout budget for a request, including any retries.
+        
+        Args:
+            model: Model the request uses
+            custom_timeout: Explicit timeout overriding the defaults
+            
+        Returns:
+            Timeout in seconds
+        """
+        if custom_timeout is not None:
+            return custom_timeout
+        return self.deep_research_timeout if model == "sonar-deep-research" else self.timeout
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared pooled HTTP client, creating it on first use.
+        
+        Reusing one client keeps connections to the API alive between queries,
+        so only the first request pays for DNS lookup, TCP connect and TLS handshake.
+        
+        Returns:
+            Long-lived httpx.AsyncClient instance
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            http2 = self.http2
+            if http2 and find_spec("h2") is None:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+                http2 = False
+            
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            self._http_client = httpx.AsyncClient(http2=http2, limits=limits, timeout=self.timeout)
+            logger.debug(f"Created pooled HTTP client: http2={http2}, limits={limits}")
+        
+        return self._http_client
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and release pooled connections."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            logger.debug("Closing pooled HTTP client")
+            await self._http_client.aclose()
+        self._http_client = None
+        await self.disk_cache.aclose()
+    
+    async def cache_stats(self) -> Dict[str, Any]:
+        """Get response cache counters (hits, misses, entries) including the disk cache."""
+        stats = self.cache.stats()
+        stats["disk"] = await self.disk_cache.astats()
+        return stats
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Get request coalescing counters (collapsed and currently in-flight requests)."""
+        return {
+            "enabled": self.coalesce_requests,
+            "collapsed": self.coalesced_requests,
+            "in_flight": len(self._inflight)
+        }
+    
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Get client-side rate limiter metrics (queue depth and wait times per model)."""
+        return self.rate_limiter.stats()
+    
+    def _headers(self) -> Dict[str, str]:
+        """Build the request headers."""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    def _build_payload(
         self,
         prompt: str,
         model: str = "sonar",
@@ -115,42 +302,19 @@ class PerplexityClient:
         return_related_questions: bool = False,
         search_domain_filter: Optional[List[str]] = None,
         search_filter: Optional[str] = None,
-        stream: bool = False,
-        custom_timeout: Optional[float] = None
+        search_recency_filter: Optional[str] = None,
+        stream: bool = False
     ) -> Dict[str, Any]:
         """
-        Query the Perplexity API.
+        Build the chat completions payload (see query for the parameters).
         
-        Args:
-            prompt: The user query
-            model: Model to use (sonar, sonar-pro, sonar-reasoning, sonar-deep-research)
-            system_message: Optional system message to customize behavior
-            max_tokens: Maximum tokens in response
-            temperature: Sampling temperature (0.0 to 2.0)
-            top_p: Nucleus sampling parameter (0.0 to 1.0)
-            top_k: Number of top search results to consider (integer)
-            presence_penalty: Penalty for token presence (-2.0 to 2.0)
-            frequency_penalty: Penalty for token frequency (-2.0 to 2.0)
-            return_citations: Whether to include citations
-            return_images: Whether to include images in results
-            return_related_questions: Whether to return related questions
-            search_domain_filter: List of domains to search within
-            search_filter: Search filter (e.g., "academic" for academic sources)
-            stream: Whether to stream the response
-            custom_timeout: Custom timeout for this request (overrides default)
-            
         Returns:
-            API response dictionary or error dictionary
+            Request payload with an unknown model replaced by 'sonar'
         """
         if model not in self.AVAILABLE_MODELS:
             logger.warning(f"Unknown model '{model}', using 'sonar' instead")
             model = "sonar"
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         messages = []
         if system_message:
             messages.append({"role": "system", "content": system_message})
@@ -176,36 +340,206 @@ class PerplexityClient:
             data["search_domain_filter"] = search_domain_filter
         if search_filter:
             data["search_filter"] = search_filter
+        if search_recency_filter:
+            data["search_recency_filter"] = search_recency_filter
         
-        # Determine timeout to use
-        timeout_to_use = custom_timeout if custom_timeout is not None else (
-            self.deep_research_timeout if model == "sonar-deep-research" else self.timeout
+        return data
+    
+    @handle_api_errors
+    async def query(
+        self,
+        prompt: str,
+        model: str = "sonar",
+        system_message: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        top_k: int = 0,
+        presence_penalty: float = 0.0,
+        frequency_penalty: float = 0.0,
+        return_citations: bool = True,
+        return_images: bool = False,
+        return_related_questions: bool = False,
+        search_domain_filter: Optional[List[str]] = None,
+        search_filter: Optional[str] = None,
+        search_recency_filter: Optional[str] = None,
+        stream: bool = False,
+        custom_timeout: Optional[float] = None,
+        bypass_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Query the Perplexity API.
+        
+        Args:
+            prompt: The user query
+            model: Model to use (sonar, sonar-pro, sonar-reasoning, sonar-deep-research)
+            system_message: Optional system message to customize behavior
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0.0 to 2.0)
+            top_p: Nucleus sampling parameter (0.0 to 1.0)
+            top_k: Number of top search results to consider (integer)
+            presence_penalty: Penalty for token presence (-2.0 to 2.0)
+            frequency_penalty: Penalty for token frequency (-2.0 to 2.0)
+            return_citations: Whether to include citations
+            return_images: Whether to include images in results
+            return_related_questions: Whether to return related questions
+            search_domain_filter: List of domains to search within
+            search_filter: Search filter (e.g., "academic" for academic sources)
+            search_recency_filter: Time period filter for search results (e.g., "month", "week", "day")
+            stream: Whether to stream the response
+            custom_timeout: Custom timeout for this request (overrides default)
+            bypass_cache: Skip the response cache lookup and always query the API
+            
+        Returns:
+            API response dictionary or error dictionary
+        """
+        headers = self._headers()
+        data = self._build_payload(
+            prompt, model, system_message, max_tokens, temperature, top_p, top_k,
+            presence_penalty, frequency_penalty, return_citations, return_images,
+            return_related_questions, search_domain_filter, search_filter,
+            search_recency_filter, stream
         )
+        model = data["model"]
+        messages = data["messages"]
+        
+        # Serve repeated identical queries from the response caches; the memory
+        # cache (PERPLEXITY_CACHE_ENABLED) and the disk cache (PERPLEXITY_CACHE_DIR)
+        # are configured independently
+        use_cache = self.cache.enabled and not stream
+        use_disk_cache = not stream and self.disk_cache.should_store(data)
+        cache_key = make_cache_key(data) if use_cache or use_disk_cache else None
+        if not bypass_cache:
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Response cache hit - model: {model}")
+                    return cached
+            if use_disk_cache:
+                cached = await self.disk_cache.aget(cache_key)
+                if cached is not None:
+                    logger.info(f"Disk cache hit - model: {model}")
+                    if use_cache:
+                        self.cache.set(cache_key, cached, self.cache.ttl_for(data))
+                    return cached
+        
+        # Determine timeout to use
+        timeout_to_use = self.get_request_timeout(model, custom_timeout)
+        
+        async def attempt(timeout: float) -> Dict[str, Any]:
+            # Time spent queued for the rate limiter counts against the request timeout
+            waited = await self.rate_limiter.acquire(model, estimate_tokens(messages, max_tokens), timeout)
+            return await self._send_request(headers, data, timeout - waited)
+        
+        async def fetch() -> Dict[str, Any]:
+            result = await self._with_retries(attempt, timeout_to_use)
+            if isinstance(result, dict):
+                ttl = self.cache.ttl_for(data)
+                if use_cache:
+                    self.cache.set(cache_key, result, ttl)
+                if use_disk_cache:
+                    await self.disk_cache.aset(cache_key, result, ttl, model=model)
+            return result
+        
+        if stream or not self.coalesce_requests:
+            return await fetch()
+        
+        # Collapse concurrent identical requests onto a single upstream call
+        flight_key = cache_key or make_cache_key(data)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[flight_key] = task
+            task.add_done_callback(partial(self._finish_flight, flight_key))
+            return await asyncio.shield(task)
+        
+        self.coalesced_requests += 1
+        logger.info(f"Coalesced identical in-flight request - model: {model}, total collapsed: {self.coalesced_requests}")
+        return copy.deepcopy(await asyncio.shield(task))
+    
+    async def _with_retries(self, call, timeout: float) -> Dict[str, Any]:
+        """
+        Run an API call, retrying retryable failures according to retry_policy.
+        
+        All attempts together stay within the timeout; each retry gets the
+        remaining budget.
+        
+        Args:
+            call: Coroutine function performing one attempt with the given timeout
+            timeout: Total timeout in seconds
+            
+        Returns:
+            Result of the first successful attempt
+            
+        Raises:
+            RetriesExhausted: If the last attempt failed and no retry is left
+        """
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            try:
+                return await call(timeout if attempt == 0 else deadline - time.monotonic())
+            except Exception as e:
+                delay = self.retry_policy.next_delay(e, attempt, deadline)
+                if delay is None:
+                    raise RetriesExhausted(e, attempt + 1) from e
+                attempt += 1
+                logger.warning(f"Retrying request after {type(e).__name__} (status={get_status_code(e)}) - retry {attempt}/{self.retry_policy.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
+    def _finish_flight(self, flight_key: str, task: "asyncio.Future") -> None:
+        """Forget a completed in-flight request and mark its outcome as retrieved."""
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        if not task.cancelled():
+            task.exception()
+    
+    async def _send_request(self, headers: Dict[str, str], data: Dict[str, Any], timeout_to_use: float) -> Dict[str, Any]:
+        """
+        Send a single request to the API.
+        
+        Args:
+            headers: Request headers
+            data: Request payload
+            timeout_to_use: Request timeout in seconds
+            
+        Returns:
+            Parsed API response
+            
+        Raises:
+            httpx.HTTPStatusError: If the API returns an error status
+            httpx.RequestError: If the request fails at the network level
+        """
+        model = data["model"]
+        
+        if data.get("stream"):
+            chunks = [chunk async for chunk in self._stream_request(headers, data, timeout_to_use)]
+            return _aggregate_stream_chunks(chunks)
         
         # Log API request details
         request_id = log_api_request("POST", self.base_url, headers, data)
-        logger.debug(f"Making API request with model: {model}, timeout: {timeout_to_use}s, request_id: {request_id}")
+        lazy_debug(logger, lambda: f"Making API request with model: {model}, timeout: {timeout_to_use}s, request_id: {request_id}")
         
         start_time = time.time()
         try:
-            async with httpx.AsyncClient(timeout=timeout_to_use) as client:
-                logger.debug(f"Sending HTTP POST to {self.base_url} with timeout {timeout_to_use}s")
-                response = await client.post(self.base_url, headers=headers, json=data)
-                duration = (time.time() - start_time) * 1000
-                
-                logger.debug(f"HTTP response received: status={response.status_code}, duration={duration:.2f}ms")
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                # Log successful response
-                log_api_response(request_id, response.status_code, result, duration)
-                
-                tokens_used = result.get('usage', {}).get('total_tokens', 'unknown')
-                logger.info(f"API request successful - tokens: {tokens_used}, duration: {duration:.2f}ms")
-                logger.debug(f"Response structure: {list(result.keys()) if isinstance(result, dict) else type(result).__name__}")
-                
-                return result
+            client = self._get_http_client()
+            lazy_debug(logger, lambda: f"Sending HTTP POST to {self.base_url} with timeout {timeout_to_use}s")
+            response = await client.post(self.base_url, headers=headers, json=data, timeout=timeout_to_use)
+            duration = (time.time() - start_time) * 1000
+            
+            lazy_debug(logger, lambda: f"HTTP response received: status={response.status_code}, http_version={response.http_version}, duration={duration:.2f}ms")
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            # Log successful response
+            log_api_response(request_id, response.status_code, result, duration)
+            
+            tokens_used = result.get('usage', {}).get('total_tokens', 'unknown')
+            logger.info(f"API request successful - tokens: {tokens_used}, duration: {duration:.2f}ms")
+            lazy_debug(logger, lambda: f"Response structure: {list(result.keys()) if isinstance(result, dict) else type(result).__name__}")
+            
+            return result
         except Exception as e:
             duration = (time.time() - start_time) * 1000
             logger.error(f"API request failed after {duration:.2f}ms: {type(e).__name__}: {str(e)}")
@@ -216,6 +550,118 @@ class PerplexityClient:
             
             raise
     
+    async def _stream_request(self, headers: Dict[str, str], data: Dict[str, Any], timeout_to_use: float) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a single streaming request and yield the parsed server-sent event chunks.
+        
+        Args:
+            headers: Request headers
+            data: Request payload with stream=True
+            timeout_to_use: Read timeout in seconds (maximum gap between chunks)
+            
+        Yields:
+            Parsed chat.completion.chunk dictionaries
+            
+        Raises:
+            httpx.HTTPStatusError: If the API returns an error status
+            httpx.RequestError: If the request fails at the network level
+        """
+        model = data["model"]
+        
+        request_id = log_api_request("POST", self.base_url, headers, data)
+        lazy_debug(logger, lambda: f"Making streaming API request with model: {model}, timeout: {timeout_to_use}s, request_id: {request_id}")
+        
+        start_time = time.time()
+        first_token_time = None
+        chunk_count = 0
+        last_chunk: Dict[str, Any] = {}
+        status_code = 0
+        try:
+            client = self._get_http_client()
+            async with client.stream("POST", self.base_url, headers=headers, json=data, timeout=timeout_to_use) as response:
+                status_code = response.status_code
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                
+                async for payload in _iter_sse_data(response.aiter_lines()):
+                    if payload == "[DONE]":
+                        break
+                    chunk = json.loads(payload)
+                    chunk_count += 1
+                    last_chunk = chunk
+                    
+                    if first_token_time is None and _chunk_content(chunk):
+                        first_token_time = time.time()
+                        logger.info(f"Time to first token: {(first_token_time - start_time) * 1000:.2f}ms - model: {model}")
+                    
+                    yield chunk
+            
+            duration = (time.time() - start_time) * 1000
+            log_api_response(request_id, status_code, last_chunk, duration)
+            
+            tokens_used = last_chunk.get('usage', {}).get('total_tokens', 'unknown')
+            logger.info(f"Streaming API request successful - chunks: {chunk_count}, tokens: {tokens_used}, duration: {duration:.2f}ms")
+        except Exception as e:
+            duration = (time.time() - start_time) * 1000
+            logger.error(f"Streaming API request failed after {duration:.2f}ms: {type(e).__name__}: {str(e)}")
+            log_api_response(request_id, get_status_code(e) or status_code, {}, duration, str(e))
+            raise
+    
+    async def stream_query(
+        self,
+        prompt: str,
+        model: str = "sonar",
+        custom_timeout: Optional[float] = None,
+        **options: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Query the Perplexity API and yield response chunks as they arrive.
+        
+        Failures before the first chunk are retried like query(); once content has
+        been yielded, errors are raised to the caller. Streamed responses bypass the
+        response cache and request coalescing.
+        
+        Args:
+            prompt: The user query
+            model: Model to use (sonar, sonar-pro, sonar-reasoning, sonar-deep-research)
+            custom_timeout: Custom timeout for this request (overrides default)
+            **options: Further query parameters (system_message, max_tokens, search filters, ...)
+            
+        Yields:
+            Parsed chat.completion.chunk dictionaries; the text delta is in
+            chunk["choices"][0]["delta"]["content"]
+            
+        Raises:
+            httpx.HTTPStatusError: If the API returns an error status
+            httpx.RequestError: If the request fails at the network level
+            RateLimitTimeout: If the client-side rate limit would delay the request past its timeout
+        """
+        headers = self._headers()
+        data = self._build_payload(prompt, model, stream=True, **options)
+        model = data["model"]
+        deadline = time.monotonic() + self.get_request_timeout(model, custom_timeout)
+        
+        attempt = 0
+        while True:
+            started = False
+            try:
+                await self.rate_limiter.acquire(
+                    model, estimate_tokens(data["messages"], data["max_tokens"]), deadline - time.monotonic()
+                )
+                async with aclosing(self._stream_request(headers, data, deadline - time.monotonic())) as chunks:
+                    async for chunk in chunks:
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self.retry_policy.next_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Retrying streaming request after {type(e).__name__} (status={get_status_code(e)}) - retry {attempt}/{self.retry_policy.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
     
     @debug_decorator
     async def health_check(self) -> bool:
@@ -229,10 +675,10 @@ class PerplexityClient:
         
         try:
             logger.debug("Sending test query to API")
-            result = await self.query("Health check test query", max_tokens=10)
+            result = await self.query("Health check test query", max_tokens=10, bypass_cache=True)
             
             is_healthy = "error" not in result
-            logger.debug(f"Health check result: healthy={is_healthy}, response_keys={list(result.keys()) if isinstance(result, dict) else 'non-dict'}")
+            lazy_debug(logger, lambda: f"Health check result: healthy={is_healthy}, response_keys={list(result.keys()) if isinstance(result, dict) else 'non-dict'}")
             
             if is_healthy:
                 logger.info("Health check passed - API is accessible")
@@ -0,0 +1,289 @@
+"""Client-side token-bucket rate limiting for Perplexity API requests."""
+
+import asyncio
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimitTimeout(TimeoutError):
+    """The rate limiter would delay a request beyond its remaining time budget."""
+
+    def __init__(self, model: str, delay: float, timeout: float):
+        super().__init__(
+            f"Client-side rate limit for {model} would delay the request by {delay:.2f}s, "
+            f"more than the remaining {max(timeout, 0.0):.2f}s of its timeout"
+        )
+        self.model = model
+        self.delay = delay
+        self.timeout = timeout
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int) -> int:
+    """
+    Estimate the tokens a request may consume.
+
+    Uses the common ~4 characters per token heuristic for the prompt and adds
+    the completion budget.
+
+    Args:
+        messages: Chat messages sent to the API
+        max_tokens: Maximum completion tokens requested
+
+    Returns:
+        Estimated total tokens
+    """
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize token bucket.
+
+        Args:
+            per_minute: Bucket capacity and refill rate per minute (0 disables the limit)
+        """
+        self.capacity = float(per_minute)
+        self.refill_rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        """Whether this bucket imposes no limit."""
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float) -> float:
+        """
+        Seconds until the bucket holds the requested amount.
+
+        Amounts above the capacity are clamped so oversized requests can still run.
+
+        Args:
+            amount: Units needed
+
+        Returns:
+            Seconds to wait (0 if available now)
+        """
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.refill_rate)
+
+    def consume(self, amount: float) -> None:
+        """
+        Take units out of the bucket.
+
+        The level may go negative: that reserves capacity for a caller that is
+        still waiting, so later callers wait behind it.
+
+        Args:
+            amount: Units to consume
+        """
+        if self.unlimited:
+            return
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """
+        Return units reserved by a caller that gave up waiting.
+
+        Args:
+            amount: Units previously consumed
+        """
+        if self.unlimited:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level + min(amount, self.capacity))
+
+
+class ModelRateLimiter:
+    """Request and token buckets for a single model with a fair FIFO queue."""
+
+    def __init__(self, model: str, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Initialize model rate limiter.
+
+        Args:
+            model: Model name
+            requests_per_minute: Request limit (0 disables)
+            tokens_per_minute: Estimated token limit (0 disables)
+        """
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+        self.queue_depth = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    async def acquire(self, tokens: int, timeout: Optional[float] = None) -> float:
+        """
+        Reserve one request and the estimated tokens, waiting until they are available.
+
+        Capacity is reserved up front, before sleeping, so callers are served in
+        arrival order without holding a lock while they wait. A caller that is
+        cancelled while waiting returns its reservation.
+
+        Args:
+            tokens: Estimated tokens for the request
+            timeout: Remaining time budget of the request, or None for no bound
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the wait would exceed timeout; nothing is reserved
+        """
+        delay = max(self.requests.time_until(1), self.tokens.time_until(tokens))
+        if timeout is not None and delay > timeout:
+            self.rejected += 1
+            raise RateLimitTimeout(self.model, delay, timeout)
+
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+        if delay > 0:
+            self.queue_depth += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.requests.refund(1)
+                self.tokens.refund(tokens)
+                raise
+            finally:
+                self.queue_depth -= 1
+
+        self.acquired += 1
+        self.last_wait = delay
+        self.total_wait += delay
+        self.max_wait = max(self.max_wait, delay)
+        if delay > 0.001:
+            self.delayed += 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter metrics.
+
+        Returns:
+            Dictionary with queue depth and wait time statistics
+        """
+        return {
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+            "queue_depth": self.queue_depth,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "total_wait_s": self.total_wait,
+            "avg_wait_s": self.total_wait / self.acquired if self.acquired else 0.0,
+            "max_wait_s": self.max_wait,
+            "last_wait_s": self.last_wait
+        }
+
+
+class RateLimiter:
+    """
+    Per-model client-side rate limiter shared by all Perplexity tools.
+
+    Enabled by default with 50 requests per minute per sonar model and 5 for
+    sonar-deep-research; set PERPLEXITY_RATE_LIMIT_ENABLED=false to turn it off.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        deep_research_requests_per_minute: Optional[float] = None,
+        deep_research_tokens_per_minute: Optional[float] = None
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            enabled: Whether limiting is enabled (PERPLEXITY_RATE_LIMIT_ENABLED)
+            requests_per_minute: Request limit per sonar model (PERPLEXITY_RATE_LIMIT_RPM)
+            tokens_per_minute: Token limit per sonar model, 0 for none (PERPLEXITY_RATE_LIMIT_TPM)
+            deep_research_requests_per_minute: Request limit for sonar-deep-research (PERPLEXITY_DEEP_RESEARCH_RPM)
+            deep_research_tokens_per_minute: Token limit for sonar-deep-research (PERPLEXITY_DEEP_RESEARCH_TPM)
+        """
+        self.enabled = enabled if enabled is not None else (
+            os.getenv("PERPLEXITY_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+        self.requests_per_minute = requests_per_minute if requests_per_minute is not None else float(os.getenv("PERPLEXITY_RATE_LIMIT_RPM", "50"))
+        self.tokens_per_minute = tokens_per_minute if tokens_per_minute is not None else float(os.getenv("PERPLEXITY_RATE_LIMIT_TPM", "0"))
+        self.deep_research_requests_per_minute = deep_research_requests_per_minute if deep_research_requests_per_minute is not None else (
+            float(os.getenv("PERPLEXITY_DEEP_RESEARCH_RPM", "5"))
+        )
+        self.deep_research_tokens_per_minute = deep_research_tokens_per_minute if deep_research_tokens_per_minute is not None else (
+            float(os.getenv("PERPLEXITY_DEEP_RESEARCH_TPM", "0"))
+        )
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+
+        logger.debug(f"Rate limiter configuration: enabled={self.enabled}, rpm={self.requests_per_minute}, tpm={self.tokens_per_minute}, deep_research_rpm={self.deep_research_requests_per_minute}, deep_research_tpm={self.deep_research_tokens_per_minute}")
+
+    def _get_limiter(self, model: str) -> ModelRateLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            if model == "sonar-deep-research":
+                limiter = ModelRateLimiter(model, self.deep_research_requests_per_minute, self.deep_research_tokens_per_minute)
+            else:
+                limiter = ModelRateLimiter(model, self.requests_per_minute, self.tokens_per_minute)
+            self._limiters[model] = limiter
+        return limiter
+
+    async def acquire(self, model: str, tokens: int, timeout: Optional[float] = None) -> float:
+        """
+        Wait for capacity to send one request with the estimated tokens.
+
+        Args:
+            model: Model the request uses
+            tokens: Estimated tokens for the request
+            timeout: Remaining time budget of the request, or None for no bound
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the wait would exceed timeout
+        """
+        if not self.enabled:
+            return 0.0
+
+        limiter = self._get_limiter(model)
+        waited = await limiter.acquire(tokens, timeout)
+        if waited > 0.001:
+            logger.info(f"Rate limiter delayed {model} request by {waited:.2f}s (queue depth: {limiter.queue_depth})")
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-model limiter metrics.
+
+        Returns:
+            Dictionary with enabled flag and metrics keyed by model
+        """
+        return {
+            "enabled": self.enabled,
+            "models": {model: limiter.stats() for model, limiter in self._limiters.items()}
+        }
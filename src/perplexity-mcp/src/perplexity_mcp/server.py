@@ -1,16 +1,19 @@
 """FastMCP server implementation for Perplexity API integration."""
 
+import asyncio
 import os
-from typing import List, Optional
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
 try:
-    from fastmcp import FastMCP
+    from fastmcp import Context, FastMCP
 except ImportError:
     raise ImportError("FastMCP library is required. Install with: uv add fastmcp")
 
-from .client import PerplexityClient
-from .utils.logging import setup_logging, get_logger, debug_decorator
+from .client import PerplexityClient, format_api_error
+from .utils.logging import setup_logging, get_logger, debug_decorator, shutdown_logging, debug_enabled, lazy_debug
 
 # Load environment variables
 load_dotenv()
@@ -30,15 +33,33 @@ except (ValueError, OSError, PermissionError) as e:
 
 # Log environment configuration
 logger.info("Perplexity MCP server starting")
-logger.debug(f"Environment variables:")
-logger.debug(f"  PERPLEXITY_LOG_LEVEL: {os.getenv('PERPLEXITY_LOG_LEVEL', 'INFO')}")
-logger.debug(f"  PERPLEXITY_LOG_PATH: {os.getenv('PERPLEXITY_LOG_PATH') or 'NOT_SET'}")
-logger.debug(f"  PERPLEXITY_TIMEOUT: {os.getenv('PERPLEXITY_TIMEOUT', '60.0')}")
-logger.debug(f"  PERPLEXITY_DEEP_RESEARCH_TIMEOUT: {os.getenv('PERPLEXITY_DEEP_RESEARCH_TIMEOUT', '300.0')}")
-logger.debug(f"  PERPLEXITY_API_KEY: {'SET' if os.getenv('PERPLEXITY_API_KEY') else 'NOT_SET'}")
+if debug_enabled(logger):
+    logger.debug("Environment variables:")
+    logger.debug(f"  PERPLEXITY_LOG_LEVEL: {os.getenv('PERPLEXITY_LOG_LEVEL', 'INFO')}")
+    logger.debug(f"  PERPLEXITY_LOG_PATH: {os.getenv('PERPLEXITY_LOG_PATH') or 'NOT_SET'}")
+    logger.debug(f"  PERPLEXITY_TIMEOUT: {os.getenv('PERPLEXITY_TIMEOUT', '60.0')}")
+    logger.debug(f"  PERPLEXITY_DEEP_RESEARCH_TIMEOUT: {os.getenv('PERPLEXITY_DEEP_RESEARCH_TIMEOUT', '300.0')}")
+    logger.debug(f"  PERPLEXITY_API_KEY: {'SET' if os.getenv('PERPLEXITY_API_KEY') else 'NOT_SET'}")
+
+@asynccontextmanager
+async def lifespan(server):
+    """Server lifespan: release the pooled HTTP client on shutdown."""
+    try:
+        yield
+    finally:
+        logger.debug("Closing Perplexity client connections")
+        await perplexity_client.aclose()
+
 
 # Create FastMCP server instance
-mcp = FastMCP("Perplexity Research Server")
+mcp = FastMCP("Perplexity Research Server", lifespan=lifespan)
+
+# Minimum seconds between progress notifications of streaming tools
+STREAM_PROGRESS_INTERVAL = float(os.getenv("PERPLEXITY_STREAM_PROGRESS_INTERVAL", "0.25"))
+
+# Batch query limits: concurrent API calls per batch and maximum questions per batch
+BATCH_CONCURRENCY = int(os.getenv("PERPLEXITY_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_QUESTIONS = int(os.getenv("PERPLEXITY_BATCH_MAX_QUESTIONS", "50"))
 
 # Initialize Perplexity client
 try:
@@ -68,7 +89,8 @@ async def perplexity_search(
     search_recency_filter: Optional[str] = None,
     top_p: float = 1.0,
     presence_penalty: float = 0.0,
-    frequency_penalty: float = 0.0
+    frequency_penalty: float = 0.0,
+    bypass_cache: bool = False
 ) -> str:
     """
     Research a topic using Perplexity's real-time web search capabilities.
@@ -84,12 +106,13 @@ async def perplexity_search(
         top_p: Nucleus sampling parameter (default: 1.0)
         presence_penalty: Penalty for token presence (default: 0.0)
         frequency_penalty: Penalty for token frequency (default: 0.0)
+        bypass_cache: Skip cached results and always query the API (default: False)
     
     Returns:
         Comprehensive research response with citations and sources
     """
     logger.info(f"Research request: {query[:100]}...")
-    logger.debug(f"Full research parameters: query_length={len(query)}, model={model}, system_prompt_length={len(system_prompt) if system_prompt else 0}, max_tokens={max_tokens}, temperature={temperature}, search_domain_filter={search_domain_filter}, search_recency_filter={search_recency_filter}")
+    lazy_debug(logger, lambda: f"Full research parameters: query_length={len(query)}, model={model}, system_prompt_length={len(system_prompt) if system_prompt else 0}, max_tokens={max_tokens}, temperature={temperature}, search_domain_filter={search_domain_filter}, search_recency_filter={search_recency_filter}")
     
     try:
         # Use provided system prompt or default
@@ -110,12 +133,13 @@ async def perplexity_search(
             search_domain_filter=search_domain_filter,
             search_recency_filter=search_recency_filter,
             return_citations=True,
-            return_related_questions=True
+            return_related_questions=True,
+            bypass_cache=bypass_cache
         )
         
         if "error" in result:
             logger.error(f"API error: {result['error']}")
-            logger.debug(f"Full error result: {result}")
+            lazy_debug(logger, lambda: f"Full error result: {result}")
             return f"Research failed: {result['error']}"
         
         # Extract response content
@@ -133,9 +157,9 @@ async def perplexity_search(
             logger.info(f"Tokens used - Prompt: {usage.get('prompt_tokens', 0)}, "
                        f"Completion: {usage.get('completion_tokens', 0)}, "
                        f"Total: {usage.get('total_tokens', 0)}")
-            logger.debug(f"Full usage details: {usage}")
+            lazy_debug(logger, lambda: f"Full usage details: {usage}")
         
-        logger.debug(f"Research completed successfully, content length: {len(content)}")
+        lazy_debug(logger, lambda: f"Research completed successfully, content length: {len(content)}")
         return content
         
     except Exception as e:
@@ -145,6 +169,99 @@ async def perplexity_search(
         return error_msg
 
 
+@mcp.tool(
+    annotations={
+        "title": "Research with Perplexity (Streaming)",
+        "description": "Research a topic and stream partial answers as progress notifications while they arrive",
+        "readOnlyHint": True,
+        "openWorldHint": False
+    }
+)
+@debug_decorator
+async def perplexity_search_stream(
+    query: str,
+    ctx: Context,
+    model: str = "sonar",
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 1000,
+    temperature: float = 0.7,
+    search_domain_filter: Optional[List[str]] = None,
+    search_recency_filter: Optional[str] = None
+) -> str:
+    """
+    Research a topic, forwarding partial content as MCP progress notifications.
+    
+    Useful for long sonar-reasoning or sonar-deep-research answers: text is sent to
+    the client as it is generated instead of after the full response completes.
+    
+    Args:
+        query: The research question or topic to investigate
+        ctx: MCP request context used to send progress notifications
+        model: Perplexity model to use (sonar, sonar-pro, sonar-reasoning, sonar-deep-research)
+        system_prompt: Optional custom system prompt to customize response style
+        max_tokens: Maximum tokens in response (default: 1000)
+        temperature: Sampling temperature between 0.0-2.0 (default: 0.7)
+        search_domain_filter: List of domains to filter search results (e.g., ["github.com", "stackoverflow.com"])
+        search_recency_filter: Time period filter for search results (e.g., "month", "week", "day")
+    
+    Returns:
+        The complete research response with sources
+    """
+    logger.info(f"Streaming research request: {query[:100]}...")
+    lazy_debug(logger, lambda: f"Streaming research parameters: query_length={len(query)}, model={model}, max_tokens={max_tokens}, temperature={temperature}, search_domain_filter={search_domain_filter}, search_recency_filter={search_recency_filter}")
+    
+    start_time = time.time()
+    selected_model = model if model in PerplexityClient.AVAILABLE_MODELS else "sonar"
+    parts: List[str] = []
+    pending: List[str] = []
+    last_notify = 0.0
+    citations: List[str] = []
+    
+    try:
+        stream = perplexity_client.stream_query(
+            prompt=query,
+            model=selected_model,
+            system_message=system_prompt or "Provide a comprehensive research response with proper citations and sources.",
+            max_tokens=max_tokens,
+            temperature=temperature,
+            search_domain_filter=search_domain_filter,
+            search_recency_filter=search_recency_filter,
+            return_citations=True
+        )
+        async with aclosing(stream) as chunks:
+            async for chunk in chunks:
+                citations = chunk.get("citations") or citations
+                delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content") or ""
+                if not delta:
+                    continue
+                parts.append(delta)
+                pending.append(delta)
+                
+                # Batch deltas so fast streams don't flood the client with notifications
+                now = time.monotonic()
+                if now - last_notify >= STREAM_PROGRESS_INTERVAL:
+                    await ctx.report_progress(progress=sum(map(len, parts)), message="".join(pending))
+                    pending.clear()
+                    last_notify = now
+        
+        if pending:
+            await ctx.report_progress(progress=sum(map(len, parts)), message="".join(pending))
+    except Exception as e:
+        duration = (time.time() - start_time) * 1000
+        error = format_api_error(e, "perplexity_search_stream", duration, 1)["error"]
+        logger.error(f"Streaming research failed: {error}")
+        logger.debug(f"Streaming research exception details", exc_info=True)
+        partial = "".join(parts)
+        return f"Research failed: {error}" + (f"\n\nPartial response:\n{partial}" if partial else "")
+    
+    content = "".join(parts) or "No response generated"
+    if citations:
+        content += "\n\n**Sources:**\n" + "\n".join(f"{i}. {url}" for i, url in enumerate(citations, 1))
+    
+    lazy_debug(logger, lambda: f"Streaming research completed successfully, content length: {len(content)}")
+    return content
+
+
 @mcp.tool(
     annotations={
         "title": "Deep Research Analysis",
@@ -159,7 +276,8 @@ async def perplexity_deep_research(
     search_domain_filter: Optional[List[str]] = None,
     search_filter: Optional[str] = None,
     max_tokens: int = 1500,
-    temperature: float = 0.3
+    temperature: float = 0.3,
+    bypass_cache: bool = False
 ) -> str:
     """
     Conduct deep research analysis on a topic using the sonar-deep-research model.
@@ -170,12 +288,13 @@ async def perplexity_deep_research(
         search_filter: Search filter for specialized results (e.g., "academic" for academic sources)
         max_tokens: Maximum tokens in response (default: 1500)
         temperature: Sampling temperature between 0.0-2.0 (default: 0.3)
+        bypass_cache: Skip cached results and always query the API (default: False)
     
     Returns:
         Detailed research report with comprehensive analysis and citations
     """
     logger.info(f"Deep research request: {topic}")
-    logger.debug(f"Deep research parameters: topic_length={len(topic)}, search_domain_filter={search_domain_filter}, search_filter={search_filter}, max_tokens={max_tokens}, temperature={temperature}")
+    lazy_debug(logger, lambda: f"Deep research parameters: topic_length={len(topic)}, search_domain_filter={search_domain_filter}, search_filter={search_filter}, max_tokens={max_tokens}, temperature={temperature}")
     
     try:
         # Build comprehensive research prompt
@@ -197,12 +316,13 @@ Be thorough, balanced, and evidence-based. Structure your response clearly with
             search_domain_filter=search_domain_filter,
             search_filter=search_filter,
             return_citations=True,
-            return_related_questions=True
+            return_related_questions=True,
+            bypass_cache=bypass_cache
         )
         
         if "error" in result:
             logger.error(f"Deep research API error: {result['error']}")
-            logger.debug(f"Full deep research error result: {result}")
+            lazy_debug(logger, lambda: f"Full deep research error result: {result}")
             return f"Deep research failed: {result['error']}"
         
         # Extract and format response
@@ -221,7 +341,7 @@ Be thorough, balanced, and evidence-based. Structure your response clearly with
                        f"Completion: {usage.get('completion_tokens', 0)}, "
                        f"Total: {usage.get('total_tokens', 0)}")
         
-        logger.debug(f"Deep research completed successfully, content length: {len(content)}")
+        lazy_debug(logger, lambda: f"Deep research completed successfully, content length: {len(content)}")
         return content
         
     except Exception as e:
@@ -244,7 +364,8 @@ async def perplexity_quick_query(
     question: str,
     search_domain_filter: Optional[List[str]] = None,
     search_recency_filter: Optional[str] = None,
-    temperature: float = 0.3
+    temperature: float = 0.3,
+    bypass_cache: bool = False
 ) -> str:
     """
     Ask a quick question and get a fast, concise response.
@@ -254,12 +375,13 @@ async def perplexity_quick_query(
         search_domain_filter: Specific domains to search within (e.g., ["github.com", "docs.python.org"])
         search_recency_filter: How recent results should be (e.g., "month", "week", "day")
         temperature: Sampling temperature between 0.0-2.0 (default: 0.3 for factual responses)
+        bypass_cache: Skip cached results and always query the API (default: False)
     
     Returns:
         Concise answer with key information and sources
     """
     logger.info(f"Quick query: {question[:100]}...")
-    logger.debug(f"Quick query parameters: question_length={len(question)}, search_domain_filter={search_domain_filter}, search_recency_filter={search_recency_filter}, temperature={temperature}")
+    lazy_debug(logger, lambda: f"Quick query parameters: question_length={len(question)}, search_domain_filter={search_domain_filter}, search_recency_filter={search_recency_filter}, temperature={temperature}")
     
     try:
         result = await perplexity_client.query(
@@ -270,16 +392,17 @@ async def perplexity_quick_query(
             temperature=temperature,  # Use provided temperature parameter
             search_domain_filter=search_domain_filter,
             search_recency_filter=search_recency_filter,
-            return_citations=True
+            return_citations=True,
+            bypass_cache=bypass_cache
         )
         
         if "error" in result:
             logger.error(f"Quick query API error: {result['error']}")
-            logger.debug(f"Full quick query error result: {result}")
+            lazy_debug(logger, lambda: f"Full quick query error result: {result}")
             return f"Query failed: {result['error']}"
         
         content = result.get("choices", [{}])[0].get("message", {}).get("content", "No response generated")
-        logger.debug(f"Quick query completed successfully, content length: {len(content)}")
+        lazy_debug(logger, lambda: f"Quick query completed successfully, content length: {len(content)}")
         return content
         
     except Exception as e:
@@ -289,6 +412,93 @@ async def perplexity_quick_query(
         return error_msg
 
 
+@mcp.tool(
+    annotations={
+        "title": "Batch Questions",
+        "description": "Answer many related questions concurrently in a single call",
+        "readOnlyHint": True,
+        "openWorldHint": False
+    }
+)
+@debug_decorator
+async def perplexity_batch_query(
+    questions: List[str],
+    model: str = "sonar",
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.3,
+    search_domain_filter: Optional[List[str]] = None,
+    search_recency_filter: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    bypass_cache: bool = False
+) -> str:
+    """
+    Answer a list of questions concurrently with shared settings and filters.
+    
+    The whole batch takes roughly as long as the slowest question instead of the
+    sum of all of them. Answers are returned in the order of the questions and a
+    failing question does not affect the others.
+    
+    Args:
+        questions: The questions to ask
+        model: Perplexity model to use for every question (default: sonar)
+        system_prompt: Optional custom system prompt applied to every question
+        max_tokens: Maximum tokens per answer (default: 500)
+        temperature: Sampling temperature between 0.0-2.0 (default: 0.3)
+        search_domain_filter: Specific domains to search within for every question
+        search_recency_filter: How recent results should be (e.g., "month", "week", "day")
+        max_concurrency: Maximum questions in flight at once (default: PERPLEXITY_BATCH_CONCURRENCY)
+        bypass_cache: Skip cached results and always query the API (default: False)
+    
+    Returns:
+        Numbered answers, one section per question
+    """
+    logger.info(f"Batch query: {len(questions)} questions")
+    lazy_debug(logger, lambda: f"Batch query parameters: model={model}, max_tokens={max_tokens}, temperature={temperature}, search_domain_filter={search_domain_filter}, search_recency_filter={search_recency_filter}, max_concurrency={max_concurrency}")
+    
+    if not questions:
+        return "No questions provided."
+    if len(questions) > BATCH_MAX_QUESTIONS:
+        return f"Too many questions: {len(questions)} (maximum is {BATCH_MAX_QUESTIONS}, see PERPLEXITY_BATCH_MAX_QUESTIONS)."
+    
+    selected_model = model if model in PerplexityClient.AVAILABLE_MODELS else "sonar"
+    system_message = system_prompt or "Provide a concise, direct answer with key facts. Be brief but comprehensive."
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or BATCH_CONCURRENCY))
+    start_time = time.time()
+    
+    async def answer(question: str) -> Tuple[bool, str]:
+        async with semaphore:
+            try:
+                result = await perplexity_client.query(
+                    prompt=question,
+                    model=selected_model,
+                    system_message=system_message,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    search_domain_filter=search_domain_filter,
+                    search_recency_filter=search_recency_filter,
+                    return_citations=True,
+                    bypass_cache=bypass_cache
+                )
+            except Exception as e:
+                logger.error(f"Batch question failed: {type(e).__name__}: {str(e)}")
+                return False, f"❌ Query failed: {str(e)}"
+        
+        if "error" in result:
+            logger.error(f"Batch question API error: {result['error']}")
+            return False, f"❌ Query failed: {result['error']}"
+        return True, result.get("choices", [{}])[0].get("message", {}).get("content", "No response generated")
+    
+    answers = await asyncio.gather(*(answer(question) for question in questions))
+    
+    failed = sum(1 for ok, _ in answers if not ok)
+    duration = (time.time() - start_time) * 1000
+    logger.info(f"Batch query completed - questions: {len(questions)}, failed: {failed}, duration: {duration:.2f}ms")
+    
+    sections = [f"### {i}. {question}\n\n{text}" for i, (question, (_, text)) in enumerate(zip(questions, answers), 1)]
+    return "\n\n".join(sections)
+
+
 @mcp.tool(
     annotations={
         "title": "List Available Models",
@@ -322,7 +532,7 @@ async def list_models() -> str:
     result += "• Use 'sonar-reasoning' for complex problem-solving\n"
     result += "• Use 'sonar-pro' for enhanced analysis needs\n"
     
-    logger.debug(f"Models list generated, length: {len(result)}")
+    lazy_debug(logger, lambda: f"Models list generated, length: {len(result)}")
     return result
 
 
@@ -358,18 +568,50 @@ async def health_check() -> str:
     else:
         log_status = f"enabled (level={log_level}, path={log_path})"
     
+    status_lines = [f"📁 Logging: {log_status}"]
+    
+    # Check response cache status
+    cache_stats = await perplexity_client.cache_stats()
+    if cache_stats["enabled"]:
+        cache_status = (f"enabled (hits={cache_stats['hits']}, misses={cache_stats['misses']}, "
+                        f"hit_rate={cache_stats['hit_rate']:.1%}, entries={cache_stats['entries']}/{cache_stats['max_entries']})")
+    else:
+        cache_status = "disabled (PERPLEXITY_CACHE_ENABLED=false)"
+    disk_stats = cache_stats.get("disk", {})
+    if disk_stats.get("enabled"):
+        cache_status += (f"; disk (hits={disk_stats['hits']}, misses={disk_stats['misses']}, "
+                         f"entries={disk_stats['entries']}, bytes={disk_stats['bytes']}/{disk_stats['max_bytes']})")
+    status_lines.append(f"🗄️ Cache: {cache_status}")
+    
+    # Check request coalescing status
+    coalescing_stats = perplexity_client.coalescing_stats()
+    if coalescing_stats["enabled"]:
+        status_lines.append(f"🔀 Coalescing: collapsed={coalescing_stats['collapsed']}, in_flight={coalescing_stats['in_flight']}")
+    
+    # Check client-side rate limiter status
+    rate_limit_stats = perplexity_client.rate_limit_stats()
+    if rate_limit_stats["enabled"]:
+        model_status = [
+            f"{model} (queue={stats['queue_depth']}, delayed={stats['delayed']}/{stats['acquired']}, "
+            f"avg_wait={stats['avg_wait_s']:.2f}s, max_wait={stats['max_wait_s']:.2f}s)"
+            for model, stats in rate_limit_stats["models"].items()
+        ]
+        status_lines.append(f"🚦 Rate limiter: {', '.join(model_status) if model_status else 'idle'}")
+    
+    status_details = "\n".join(status_lines)
+    
     try:
         is_healthy = await perplexity_client.health_check()
         
         if is_healthy:
             logger.debug("Health check passed - API is responding correctly")
-            return f"✅ Perplexity API is accessible and working correctly.\n📁 Logging: {log_status}"
+            return f"✅ Perplexity API is accessible and working correctly.\n{status_details}"
         else:
             logger.debug("Health check failed - API is not responding correctly")
-            return f"❌ Perplexity API is not responding correctly. Check your API key and network connection.\n📁 Logging: {log_status}"
+            return f"❌ Perplexity API is not responding correctly. Check your API key and network connection.\n{status_details}"
             
     except Exception as e:
-        error_msg = f"❌ Health check failed: {str(e)}\n📁 Logging: {log_status}"
+        error_msg = f"❌ Health check failed: {str(e)}\n{status_details}"
         logger.error(error_msg)
         logger.debug(f"Health check exception details", exc_info=True)
         return error_msg
@@ -379,8 +621,8 @@ async def health_check() -> str:
 def main():
     """Main entry point for the MCP server with enhanced logging."""
     logger.info("Starting Perplexity MCP server...")
-    logger.debug(f"Server configuration: FastMCP instance={type(mcp).__name__}")
-    logger.debug(f"Available tools: {[tool for tool in dir(mcp) if not tool.startswith('_')]}")
+    lazy_debug(logger, lambda: f"Server configuration: FastMCP instance={type(mcp).__name__}")
+    lazy_debug(logger, lambda: f"Available tools: {[tool for tool in dir(mcp) if not tool.startswith('_')]}")
     
     try:
         logger.debug("Starting FastMCP server with stdio transport")
@@ -394,6 +636,7 @@ def main():
         raise
     finally:
         logger.debug("Server shutdown complete")
+        shutdown_logging()
 
 
 if __name__ == "__main__":
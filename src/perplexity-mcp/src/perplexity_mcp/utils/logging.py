@@ -1,14 +1,651 @@
 """Enhanced logging utilities for Perplexity MCP server with extensive debug capabilities."""
 
+import atexit
+import glob
+import gzip
 import logging
 import os
 import json
+import queue
+import re
+import shutil
+import threading
 import time
+import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List
 from functools import wraps
 
+# Seconds the "block" queue policy waits for space before dropping a record
+QUEUE_BLOCK_TIMEOUT = 5.0
+
+# Maximum records the listener writes before flushing
+QUEUE_BATCH_SIZE = 256
+
+# Session log directories are named perplexity_YYYYmmdd_HHMMSS under the log path
+SESSION_DIR_PREFIX = "perplexity_"
+_SESSION_DIR_PATTERN = re.compile(rf"^{SESSION_DIR_PREFIX}\d{{8}}_\d{{6}}$")
+
+# Sessions written to more recently than this many seconds are never pruned,
+# as another server process may still be using them
+ACTIVE_SESSION_GRACE = 3600.0
+
+# API log formats: "text" lines with a timestamp prefix, or "jsonl" with one JSON object per line
+API_LOG_FORMATS = ("text", "jsonl")
+
+# Compact encoder for API events; default=str keeps unexpected values from failing the request
+_api_event_encoder = json.JSONEncoder(separators=(",", ":"), default=str)
+
+# Format of the API log, set by setup_api_logging
+_api_log_format = "text"
+
+# Sampler for successful API events, set by setup_api_logging when sampling is enabled
+_api_sampler: Optional["ApiEventSampler"] = None
+
+# Queue listeners of the asynchronous pipeline, by logger name
+_listeners: Dict[str, "BatchingQueueListener"] = {}
+_listeners_lock = threading.Lock()
+
+# Single background worker that compresses rotated log segments, created on first rotation
+_compressor: Optional[ThreadPoolExecutor] = None
+_compressor_lock = threading.Lock()
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that leaves flushing to its queue listener, which flushes once per batch."""
+    
+    def flush(self):
+        pass
+    
+    def flush_batch(self):
+        """Flush buffered records to disk."""
+        super().flush()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler for a bounded queue that drops or blocks when the queue is full."""
+    
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop"):
+        """
+        Initialize bounded queue handler.
+        
+        Args:
+            log_queue: Bounded queue shared with the listener
+            policy: "drop" to discard records when full, "block" to wait for space
+        """
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so only merge the arguments and
+        # leave formatting (timestamps, tracebacks) to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=QUEUE_BLOCK_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(QueueListener):
+    """Queue listener that writes records in batches and reports dropped records."""
+    
+    def __init__(self, log_queue: queue.Queue, queue_handler: BoundedQueueHandler, *handlers):
+        """
+        Initialize batching queue listener.
+        
+        Args:
+            log_queue: Queue to drain
+            queue_handler: Producer side, polled for its dropped count
+            handlers: Handlers that write the records
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self._reported_dropped = 0
+    
+    def enqueue_sentinel(self) -> None:
+        # Wait for space so shutdown works even when the queue is full
+        self.queue.put(self._sentinel)
+    
+    def _monitor(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < QUEUE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+            self._report_dropped()
+            for handler in self.handlers:
+                getattr(handler, "flush_batch", handler.flush)()
+            if stop:
+                break
+    
+    def _report_dropped(self) -> None:
+        dropped = self.queue_handler.dropped
+        if dropped > self._reported_dropped:
+            record = logging.LogRecord(
+                "logging", logging.WARNING, __file__, 0,
+                f"Log queue full: dropped {dropped - self._reported_dropped} records ({dropped} total)",
+                None, None
+            )
+            self._reported_dropped = dropped
+            self.handle(record)
+
+
+class RotatingLogFileHandler(BaseRotatingHandler):
+    """
+    File handler that rotates by size and age.
+    
+    The live file is renamed to <file>.<YYYYmmdd-HHMMSS-ffffff> on rollover and
+    gzip-compressed to .gz in a background thread, so logging calls only pay
+    for a rename. Only the newest backup_count compressed segments are kept.
+    """
+    
+    def __init__(self, filename: str, max_bytes: int = 0, max_age: float = 0.0,
+                 backup_count: int = 0, buffered: bool = False):
+        """
+        Initialize rotating log file handler.
+        
+        Args:
+            filename: Live log file path
+            max_bytes: Rotate once the file reaches this size (0 disables)
+            max_age: Rotate once the file is this many seconds old (0 disables)
+            backup_count: Compressed segments to keep (0 keeps all)
+            buffered: Leave flushing to a queue listener, as BufferedFileHandler does
+        """
+        # A fixed encoding lets format() count bytes without asking the stream
+        super().__init__(filename, "a", encoding="utf-8")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.buffered = buffered
+        self.rollover_at = time.time() + max_age if max_age else None
+        self.size = os.path.getsize(self.baseFilename)
+    
+    def format(self, record: logging.LogRecord) -> str:
+        # Count the bytes emit() writes, so size checks need no syscall per record
+        message = super().format(record)
+        self.size += len((message + self.terminator).encode("utf-8", "replace"))
+        return message
+    
+    def flush(self):
+        if not self.buffered:
+            super().flush()
+    
+    def flush_batch(self):
+        """Flush buffered records to disk."""
+        super().flush()
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return bool(self.max_bytes) and self.size >= self.max_bytes
+    
+    def doRollover(self):
+        if self.stream:
+            self.stream.flush()
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            segment = f"{self.baseFilename}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+            os.rename(self.baseFilename, segment)
+            _compress_in_background(segment, self.baseFilename, self.backup_count)
+        self.stream = self._open()
+        self.size = 0
+        if self.max_age:
+            self.rollover_at = time.time() + self.max_age
+
+
+def _compress_in_background(segment: str, base_filename: str, backup_count: int) -> None:
+    """Queue a rotated segment for compression on the background worker."""
+    global _compressor
+    with _compressor_lock:
+        if _compressor is None:
+            _compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+        _compressor.submit(_compress_segment, segment, base_filename, backup_count)
+
+
+def _compress_segment(segment: str, base_filename: str, backup_count: int) -> None:
+    """Gzip a rotated segment, then delete segments beyond backup_count."""
+    try:
+        with open(segment, "rb") as src, gzip.open(f"{segment}.gz.tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(f"{segment}.gz.tmp", f"{segment}.gz")
+        os.remove(segment)
+        
+        if backup_count:
+            segments = sorted(glob.glob(f"{glob.escape(base_filename)}.*.gz"))
+            for old_segment in segments[:-backup_count]:
+                os.remove(old_segment)
+    except OSError as e:
+        logging.getLogger("perplexity_mcp").warning(f"Could not compress rotated log {segment}: {e}")
+
+
+def _rotation_config() -> Dict[str, Any]:
+    """
+    Read the log rotation configuration.
+    
+    Environment Variables:
+        PERPLEXITY_LOG_MAX_BYTES: Rotate log files at this size, 0 to disable (default: 52428800)
+        PERPLEXITY_LOG_ROTATE_HOURS: Rotate log files after this many hours, 0 to disable (default: 24)
+        PERPLEXITY_LOG_BACKUP_COUNT: Compressed segments kept per log file, 0 keeps all (default: 10)
+    
+    Returns:
+        Keyword arguments for RotatingLogFileHandler
+    """
+    return {
+        "max_bytes": int(os.getenv("PERPLEXITY_LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+        "max_age": float(os.getenv("PERPLEXITY_LOG_ROTATE_HOURS", "24")) * 3600,
+        "backup_count": int(os.getenv("PERPLEXITY_LOG_BACKUP_COUNT", "10"))
+    }
+
+
+def prune_log_sessions(base_log_path: str, retention_days: float, max_sessions: int,
+                       current_session: Optional[str] = None) -> int:
+    """
+    Delete old session log directories under base_log_path.
+    
+    Sessions idle for more than retention_days are deleted, then the oldest
+    sessions beyond max_sessions. Sessions written to within
+    ACTIVE_SESSION_GRACE seconds and the current session are always kept.
+    
+    Args:
+        base_log_path: Directory holding the session directories
+        retention_days: Maximum idle age in days (0 disables)
+        max_sessions: Maximum sessions to keep (0 disables)
+        current_session: Path of this process's session directory
+        
+    Returns:
+        Number of session directories deleted
+    """
+    now = time.time()
+    try:
+        with os.scandir(base_log_path) as entries:
+            candidates = [
+                entry for entry in entries
+                if _SESSION_DIR_PATTERN.match(entry.name) and entry.is_dir(follow_symlinks=False)
+                and not (current_session and os.path.abspath(entry.path) == os.path.abspath(current_session))
+            ]
+    except OSError:
+        return 0
+    
+    sessions = []
+    for entry in candidates:
+        try:
+            # Log files are appended to without touching the directory, so use their mtimes too
+            last_write = entry.stat(follow_symlinks=False).st_mtime
+            with os.scandir(entry.path) as files:
+                for f in files:
+                    last_write = max(last_write, f.stat(follow_symlinks=False).st_mtime)
+        except OSError:
+            # Removed or unreadable while scanning (e.g. another process pruning); skip it
+            continue
+        sessions.append((entry.name, entry.path, now - last_write))
+    
+    sessions.sort()
+    expired = set()
+    if retention_days:
+        expired.update(path for _, path, idle in sessions if idle > retention_days * 86400)
+    if max_sessions:
+        remaining = [(path, idle) for _, path, idle in sessions if path not in expired]
+        # The current session counts towards the limit
+        excess = len(remaining) + (1 if current_session else 0) - max_sessions
+        expired.update(path for path, _ in remaining[:max(excess, 0)])
+    
+    removed = 0
+    for _, path, idle in sessions:
+        if path in expired and idle > ACTIVE_SESSION_GRACE:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _start_session_pruning(base_log_path: str, current_session: str) -> None:
+    """
+    Prune old session directories in a background thread, so startup does not wait on it.
+    
+    Pruning is opt-in: existing session logs are never deleted unless a limit is configured.
+    
+    Environment Variables:
+        PERPLEXITY_LOG_RETENTION_DAYS: Delete sessions idle for longer, 0 to disable (default: 0)
+        PERPLEXITY_LOG_MAX_SESSIONS: Keep at most this many sessions, 0 to disable (default: 0)
+    """
+    retention_days = float(os.getenv("PERPLEXITY_LOG_RETENTION_DAYS", "0"))
+    max_sessions = int(os.getenv("PERPLEXITY_LOG_MAX_SESSIONS", "0"))
+    if not (retention_days or max_sessions):
+        return
+    threading.Thread(
+        target=prune_log_sessions,
+        args=(base_log_path, retention_days, max_sessions, current_session),
+        name="log-retention",
+        daemon=True
+    ).start()
+
+
+class ApiEventSampler:
+    """
+    Decides which API request/response pairs are written to the API log.
+    
+    Failed and slow requests and the first keep_first requests are always
+    kept; other requests are kept 1-in-sample_rate and at most max_per_second
+    per second. Requests are held until their response is known, so a kept
+    response always comes with its request; a request that gets no response
+    within max_pending_age seconds is logged unsampled. Once start() is
+    called, kept and dropped counts are reported every summary_interval
+    seconds from a timer thread, whether or not more events arrive.
+    """
+    
+    def __init__(self, sample_rate: int = 1, max_per_second: int = 0, slow_ms: float = 0.0,
+                 keep_first: int = 0, summary_interval: float = 60.0, max_pending: int = 1000,
+                 max_pending_age: float = 600.0):
+        """
+        Initialize API event sampler.
+        
+        Args:
+            sample_rate: Keep one in this many successful requests
+            max_per_second: Maximum successful requests kept per second (0 for no cap)
+            slow_ms: Always keep requests taking at least this long (0 disables)
+            keep_first: Always keep this many first requests
+            summary_interval: Seconds between kept/dropped summaries
+            max_pending: Requests held awaiting a response; beyond this the oldest is logged unsampled
+            max_pending_age: Seconds a request is held awaiting a response before it is logged unsampled
+        """
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self.slow_ms = slow_ms
+        self.keep_first = keep_first
+        self.summary_interval = summary_interval
+        self.max_pending = max_pending
+        self.max_pending_age = max_pending_age
+        # request_id -> (time.monotonic() when held, request); insertion order is age order
+        self.pending: Dict[str, tuple] = {}
+        self.seen = 0
+        self.kept = 0
+        self.dropped = 0
+        # Successful requests subject to sampling; sample_rate applies to these only
+        self._eligible = 0
+        self._second = 0
+        self._second_count = 0
+        self._last_summary = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+    
+    def defer_request(self, request_id: str, request: tuple) -> List[tuple]:
+        """
+        Hold a request until its response is logged.
+        
+        Returns:
+            Arguments of held requests evicted to be logged now: the oldest if
+            too many are held, and any held longer than max_pending_age
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.pending[request_id] = (now, request)
+            evicted = []
+            if len(self.pending) > self.max_pending:
+                oldest_id = next(iter(self.pending))
+                evicted.append((oldest_id,) + self.pending.pop(oldest_id)[1])
+            return evicted + self._expire(now, self.max_pending_age)
+    
+    def pop_request(self, request_id: str) -> Optional[tuple]:
+        """Remove and return a held request, if any."""
+        with self._lock:
+            entry = self.pending.pop(request_id, None)
+        return entry[1] if entry else None
+    
+    def expire_pending(self, max_age: Optional[float] = None) -> List[tuple]:
+        """
+        Remove held requests that have waited too long for a response.
+        
+        Args:
+            max_age: Age in seconds to expire at (default: max_pending_age; 0 for all)
+        
+        Returns:
+            Arguments of the expired requests, oldest first, to be logged now
+        """
+        with self._lock:
+            return self._expire(time.monotonic(), self.max_pending_age if max_age is None else max_age)
+    
+    def _expire(self, now: float, max_age: float) -> List[tuple]:
+        expired = []
+        while self.pending:
+            request_id, (held_at, request) = next(iter(self.pending.items()))
+            if now - held_at < max_age:
+                break
+            del self.pending[request_id]
+            expired.append((request_id,) + request)
+        return expired
+    
+    def start(self, tick: Callable[[], None]) -> None:
+        """Call tick from a daemon thread every summary interval (or pending age, if shorter) until stop()."""
+        interval = min(self.summary_interval, self.max_pending_age)
+        
+        def run():
+            while not self._stopped.wait(interval):
+                tick()
+        
+        self._timer = threading.Thread(target=run, name="perplexity-api-sampler", daemon=True)
+        self._timer.start()
+    
+    def stop(self) -> None:
+        """Stop the timer thread. Safe to call more than once."""
+        self._stopped.set()
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.join(timeout=5)
+    
+    def should_keep(self, success: bool, duration_ms: float) -> bool:
+        """Decide whether a request/response pair is logged and count the decision."""
+        with self._lock:
+            self.seen += 1
+            keep = (
+                not success
+                or (self.slow_ms and duration_ms >= self.slow_ms)
+                or self.seen <= self.keep_first
+                or self._sampled()
+            )
+            if keep:
+                self.kept += 1
+            else:
+                self.dropped += 1
+            return bool(keep)
+    
+    def _sampled(self) -> bool:
+        self._eligible += 1
+        if self.sample_rate > 1 and self._eligible % self.sample_rate:
+            return False
+        if self.max_per_second:
+            second = int(time.monotonic())
+            if second != self._second:
+                self._second = second
+                self._second_count = 0
+            if self._second_count >= self.max_per_second:
+                return False
+            self._second_count += 1
+        return True
+    
+    def take_summary(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Return kept/dropped counts since the last summary and reset them.
+        
+        Returns:
+            Summary event, or None if nothing was dropped or the interval has not elapsed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self.dropped or (not force and now - self._last_summary < self.summary_interval):
+                return None
+            summary = {
+                "timestamp": datetime.now().isoformat(),
+                "type": "sampling",
+                "kept": self.kept,
+                "dropped": self.dropped,
+                "interval_s": round(now - self._last_summary, 3)
+            }
+            self.kept = 0
+            self.dropped = 0
+            self._last_summary = now
+            return summary
+
+
+def _api_sampling_config() -> Optional[ApiEventSampler]:
+    """
+    Read the API event sampling configuration.
+    
+    Environment Variables:
+        PERPLEXITY_API_LOG_SAMPLE_RATE: Log one in N successful requests (default: 1, log all)
+        PERPLEXITY_API_LOG_MAX_PER_SECOND: Maximum successful requests logged per second (default: 0, no cap)
+        PERPLEXITY_API_LOG_SLOW_MS: Always log requests at least this slow (default: 5000)
+        PERPLEXITY_API_LOG_KEEP_FIRST: Always log this many first requests (default: 100)
+        PERPLEXITY_API_LOG_SUMMARY_SECONDS: Seconds between dropped-event summaries (default: 60)
+        PERPLEXITY_API_LOG_PENDING_SECONDS: Log a request unsampled if no response arrives within this many seconds (default: 600)
+    
+    Returns:
+        Sampler, or None if sampling is disabled
+    
+    Raises:
+        ValueError: If PERPLEXITY_API_LOG_SAMPLE_RATE is below 1
+    """
+    sample_rate = int(os.getenv("PERPLEXITY_API_LOG_SAMPLE_RATE", "1"))
+    if sample_rate < 1:
+        raise ValueError(f"Invalid PERPLEXITY_API_LOG_SAMPLE_RATE '{sample_rate}'. Must be 1 or more")
+    max_per_second = int(os.getenv("PERPLEXITY_API_LOG_MAX_PER_SECOND", "0"))
+    if sample_rate == 1 and not max_per_second:
+        return None
+    return ApiEventSampler(
+        sample_rate=sample_rate,
+        max_per_second=max_per_second,
+        slow_ms=float(os.getenv("PERPLEXITY_API_LOG_SLOW_MS", "5000")),
+        keep_first=int(os.getenv("PERPLEXITY_API_LOG_KEEP_FIRST", "100")),
+        summary_interval=float(os.getenv("PERPLEXITY_API_LOG_SUMMARY_SECONDS", "60")),
+        max_pending_age=float(os.getenv("PERPLEXITY_API_LOG_PENDING_SECONDS", "600"))
+    )
+
+
+def _log_sampling_summary(api_logger: logging.Logger, force: bool = False) -> None:
+    """Write the sampler's kept/dropped counts to the API log when due."""
+    sampler = _api_sampler
+    summary = sampler.take_summary(force) if sampler is not None else None
+    if summary:
+        _log_api_event(api_logger, "API_SAMPLING", summary)
+
+
+def _sampler_tick() -> None:
+    """Log requests that never got a response and the sampling summary when due; runs on the sampler's timer."""
+    sampler = _api_sampler
+    if sampler is None:
+        return
+    api_logger = get_api_logger()
+    for request in sampler.expire_pending():
+        _log_api_event(api_logger, "API_REQUEST", _request_event(*request))
+    _log_sampling_summary(api_logger)
+
+
+def _async_logging_config() -> Optional[Dict[str, Any]]:
+    """
+    Read the asynchronous logging configuration.
+    
+    Environment Variables:
+        PERPLEXITY_LOG_ASYNC: Write log files from a background thread (default: false)
+        PERPLEXITY_LOG_QUEUE_SIZE: Maximum queued records (default: 10000)
+        PERPLEXITY_LOG_QUEUE_POLICY: "drop" or "block" when the queue is full (default: drop)
+    
+    Returns:
+        Configuration dict, or None if asynchronous logging is disabled
+    """
+    if os.getenv("PERPLEXITY_LOG_ASYNC", "false").lower() not in ("true", "1", "yes"):
+        return None
+    policy = os.getenv("PERPLEXITY_LOG_QUEUE_POLICY", "drop").lower()
+    if policy not in ("drop", "block"):
+        raise ValueError(f"Invalid PERPLEXITY_LOG_QUEUE_POLICY '{policy}'. Must be 'drop' or 'block'")
+    return {"queue_size": int(os.getenv("PERPLEXITY_LOG_QUEUE_SIZE", "10000")), "policy": policy}
+
+
+def _create_file_handler(path: str) -> logging.FileHandler:
+    """Create a file handler, rotating when configured and buffered when asynchronous logging is enabled."""
+    buffered = _async_logging_config() is not None
+    rotation = _rotation_config()
+    if rotation["max_bytes"] or rotation["max_age"]:
+        return RotatingLogFileHandler(path, buffered=buffered, **rotation)
+    if buffered:
+        return BufferedFileHandler(path)
+    return logging.FileHandler(path)
+
+
+def _attach_handler(logger: logging.Logger, handler: logging.Handler) -> None:
+    """
+    Attach a handler to a logger, behind a bounded queue when asynchronous logging is enabled.
+    
+    The calling thread then only enqueues records; a listener thread formats
+    and writes them.
+    """
+    config = _async_logging_config()
+    if config is None:
+        logger.addHandler(handler)
+        return
+    
+    log_queue = queue.Queue(maxsize=config["queue_size"])
+    queue_handler = BoundedQueueHandler(log_queue, config["policy"])
+    listener = BatchingQueueListener(log_queue, queue_handler, handler)
+    with _listeners_lock:
+        previous = _listeners.pop(logger.name, None)
+        _listeners[logger.name] = listener
+    if previous:
+        previous.stop()
+    listener.start()
+    logger.addHandler(queue_handler)
+
+
+def _stop_listener(logger_name: str) -> None:
+    """Stop the queue listener of a logger, flushing queued records."""
+    with _listeners_lock:
+        listener = _listeners.pop(logger_name, None)
+    if listener:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def shutdown_logging() -> None:
+    """Flush and stop all asynchronous logging listeners and finish pending compression. Safe to call more than once."""
+    global _compressor
+    sampler = _api_sampler
+    if sampler is not None:
+        sampler.stop()
+        for request in sampler.expire_pending(max_age=0):
+            _log_api_event(get_api_logger(), "API_REQUEST", _request_event(*request))
+    _log_sampling_summary(get_api_logger(), force=True)
+    with _listeners_lock:
+        names = list(_listeners)
+    for name in names:
+        _stop_listener(name)
+    with _compressor_lock:
+        compressor, _compressor = _compressor, None
+    if compressor:
+        compressor.shutdown(wait=True)
+
+
+atexit.register(shutdown_logging)
+
 
 def setup_logging(
     log_level: str = "INFO",
@@ -39,6 +676,7 @@ def setup_logging(
     logger = logging.getLogger(logger_name)
     
     # Clear any existing handlers
+    _stop_listener(logger_name)
     logger.handlers.clear()
     
     # Check if logging is explicitly disabled
@@ -55,6 +693,7 @@ def setup_logging(
         raise ValueError(f"Invalid PERPLEXITY_LOG_LEVEL '{env_log_level}'. Must be one of: {valid_levels} or 'none'")
     
     logger.setLevel(getattr(logging, env_log_level))
+    logger.disabled = False
     
     # Logging is enabled - require valid log path
     base_log_path = os.getenv("PERPLEXITY_LOG_PATH")
@@ -82,7 +721,7 @@ def setup_logging(
         base_log_path = str(repo_root / base_log_path)
     
     session_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_path = f"{base_log_path.rstrip('/')}/perplexity_{session_timestamp}"
+    log_path = f"{base_log_path.rstrip('/')}/{SESSION_DIR_PREFIX}{session_timestamp}"
     
     # Create log directory - fail fast if it cannot be created
     try:
@@ -98,6 +737,8 @@ def setup_logging(
     except (OSError, PermissionError) as e:
         raise PermissionError(f"Log directory '{log_path}' is not writable: {e}") from e
     
+    _start_session_pruning(base_log_path, log_path)
+    
     # Create formatters
     detailed_formatter = logging.Formatter(
         fmt='%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
@@ -114,10 +755,10 @@ def setup_logging(
     # Single log file for all logging
     log_file_path = log_file or os.path.join(log_path, "perplexity.log")
     try:
-        file_handler = logging.FileHandler(log_file_path)
+        file_handler = _create_file_handler(log_file_path)
         file_handler.setFormatter(detailed_formatter)
         file_handler.setLevel(logging.DEBUG)
-        logger.addHandler(file_handler)
+        _attach_handler(logger, file_handler)
         logger.info(f"Logging to: {log_file_path}")
     except (OSError, IOError) as e:
         logger.warning(f"Could not create log handler for {log_file_path}: {e}")
@@ -135,27 +776,59 @@ def setup_api_logging(log_path: Optional[str]) -> logging.Logger:
     Args:
         log_path: Base directory for log files (None if file logging disabled)
         
+    Environment Variables:
+        PERPLEXITY_API_LOG_FORMAT: "text" (default) or "jsonl" for one compact JSON
+                                object per line in api.jsonl
+    
     Returns:
         API logger instance
+    
+    Raises:
+        ValueError: If PERPLEXITY_API_LOG_FORMAT is invalid
     """
+    global _api_log_format, _api_sampler
+    api_log_format = os.getenv("PERPLEXITY_API_LOG_FORMAT", "text").lower()
+    if api_log_format not in API_LOG_FORMATS:
+        raise ValueError(f"Invalid PERPLEXITY_API_LOG_FORMAT '{api_log_format}'. Must be one of: {API_LOG_FORMATS}")
+    _api_log_format = api_log_format
+    if _api_sampler is not None:
+        _api_sampler.stop()
+    _api_sampler = None
+    
     api_logger = logging.getLogger("perplexity_api")
     api_logger.setLevel(logging.DEBUG)
     
     # Clear any existing handlers
+    _stop_listener(api_logger.name)
     api_logger.handlers.clear()
     
     # Only set up file logging if log_path is available
     if log_path:
-        api_log_file = os.path.join(log_path, "api.log")
+        api_logger.disabled = False
+        _api_sampler = _api_sampling_config()
+        api_log_file = os.path.join(log_path, "api.jsonl" if api_log_format == "jsonl" else "api.log")
         try:
-            api_handler = logging.FileHandler(api_log_file)
-            api_formatter = logging.Formatter(
-                fmt='%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+            api_handler = _create_file_handler(api_log_file)
+            if api_log_format == "jsonl":
+                # Events carry their own timestamp; every line must be valid JSON
+                api_formatter = logging.Formatter(fmt='%(message)s')
+            else:
+                api_formatter = logging.Formatter(
+                    fmt='%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S'
+                )
             api_handler.setFormatter(api_formatter)
-            api_logger.addHandler(api_handler)
-            api_logger.debug(f"API logging to: {api_log_file}")
+            _attach_handler(api_logger, api_handler)
+            if api_log_format == "jsonl":
+                logging.getLogger("perplexity_mcp").debug(f"API logging to: {api_log_file}")
+            else:
+                api_logger.debug(f"API logging to: {api_log_file}")
+            if _api_sampler is not None:
+                _api_sampler.start(_sampler_tick)
+                logging.getLogger("perplexity_mcp").info(
+                    f"API log sampling: 1 in {_api_sampler.sample_rate}, max {_api_sampler.max_per_second or 'unlimited'}/s, "
+                    f"always keeping errors, requests over {_api_sampler.slow_ms:g}ms and the first {_api_sampler.keep_first}"
+                )
         except (OSError, IOError) as e:
             main_logger = logging.getLogger("perplexity_mcp")
             main_logger.warning(f"Could not create API log handler for {api_log_file}: {e}")
@@ -176,6 +849,33 @@ def get_api_logger() -> logging.Logger:
     return logging.getLogger("perplexity_api")
 
 
+def debug_enabled(logger: logging.Logger) -> bool:
+    """
+    Check whether a logger would emit DEBUG records.
+    
+    False when the level is above DEBUG or logging is disabled, so expensive
+    debug-only work can be skipped entirely.
+    """
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+def lazy_debug(logger: logging.Logger, build_message: Callable[[], str]) -> None:
+    """
+    Log a DEBUG message that is only built if DEBUG is enabled.
+    
+    Use instead of logger.debug(f"...") when the message is costly to build,
+    e.g. dumps of parameters, payloads or results:
+    
+        lazy_debug(logger, lambda: f"Response structure: {list(result.keys())}")
+    
+    Args:
+        logger: Logger to write to
+        build_message: Called without arguments to build the message
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(build_message(), stacklevel=2)
+
+
 def log_api_request(method: str, url: str, headers: Dict[str, Any], data: Dict[str, Any]) -> str:
     """
     Log API request details in structured format.
@@ -190,8 +890,24 @@ def log_api_request(method: str, url: str, headers: Dict[str, Any], data: Dict[s
         Request ID for correlation
     """
     api_logger = get_api_logger()
-    request_id = f"req_{int(time.time() * 1000)}_{id(data) % 10000}"
+    request_id = f"req_{uuid.uuid4().hex}"
+    if not debug_enabled(api_logger):
+        return request_id
+    
+    if _api_sampler is not None:
+        # Whether the request is logged depends on its response; hold it until then
+        for evicted in _api_sampler.defer_request(request_id, (datetime.now().isoformat(), method, url, headers, data)):
+            _log_api_event(api_logger, "API_REQUEST", _request_event(*evicted))
+        return request_id
     
+    request_log = _request_event(request_id, datetime.now().isoformat(), method, url, headers, data)
+    _log_api_event(api_logger, "API_REQUEST", request_log)
+    return request_id
+
+
+def _request_event(request_id: str, timestamp: str, method: str, url: str,
+                   headers: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a request event with sensitive and bulky data redacted."""
     # Redact sensitive information
     safe_headers = {k: "[REDACTED]" if "authorization" in k.lower() or "key" in k.lower() else v 
                     for k, v in headers.items()}
@@ -205,18 +921,16 @@ def log_api_request(method: str, url: str, headers: Dict[str, Any], data: Dict[s
         }
         safe_data["messages"] = "[CONTENT_REDACTED_FOR_PRIVACY]"
     
-    request_log = {
+    return {
         "request_id": request_id,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": timestamp,
         "type": "request",
         "method": method,
         "url": url,
+        "model": data.get("model"),
         "headers": safe_headers,
         "data": safe_data
     }
-    
-    api_logger.debug(f"API_REQUEST: {json.dumps(request_log, indent=2)}")
-    return request_id
 
 
 def log_api_response(request_id: str, status_code: int, response_data: Dict[str, Any], 
@@ -232,6 +946,17 @@ def log_api_response(request_id: str, status_code: int, response_data: Dict[str,
         error: Optional error message
     """
     api_logger = get_api_logger()
+    if not debug_enabled(api_logger):
+        return
+    
+    if _api_sampler is not None:
+        request = _api_sampler.pop_request(request_id)
+        keep = _api_sampler.should_keep(status_code < 400 and error is None, duration_ms)
+        _log_sampling_summary(api_logger)
+        if not keep:
+            return
+        if request:
+            _log_api_event(api_logger, "API_REQUEST", _request_event(request_id, *request))
     
     safe_response = response_data.copy() if response_data else {}
     
@@ -249,13 +974,23 @@ def log_api_response(request_id: str, status_code: int, response_data: Dict[str,
         "timestamp": datetime.now().isoformat(),
         "type": "response",
         "status_code": status_code,
-        "duration_ms": duration_ms,
+        "duration_ms": round(duration_ms, 3),
+        "model": safe_response.get("model"),
+        "usage": safe_response.get("usage"),
         "response": safe_response,
         "error": error,
         "success": status_code < 400 and error is None
     }
     
-    api_logger.debug(f"API_RESPONSE: {json.dumps(response_log, indent=2)}")
+    _log_api_event(api_logger, "API_RESPONSE", response_log)
+
+
+def _log_api_event(api_logger: logging.Logger, label: str, event: Dict[str, Any]) -> None:
+    """Write an API event as one line: compact JSON in jsonl format, labelled JSON in text format."""
+    if _api_log_format == "jsonl":
+        api_logger.debug(_api_event_encoder.encode(event))
+    else:
+        api_logger.debug(f"{label}: {json.dumps(event, default=str)}")
 
 
 def debug_decorator(func):
@@ -271,6 +1006,8 @@ def debug_decorator(func):
     @wraps(func)
     async def async_wrapper(*args, **kwargs):
         logger = get_logger()
+        if not debug_enabled(logger):
+            return await func(*args, **kwargs)
         func_name = f"{func.__module__}.{func.__name__}"
         
         # Log function entry
@@ -290,6 +1027,8 @@ def debug_decorator(func):
     @wraps(func)
     def sync_wrapper(*args, **kwargs):
         logger = get_logger()
+        if not debug_enabled(logger):
+            return func(*args, **kwargs)
         func_name = f"{func.__module__}.{func.__name__}"
         
         # Log function entry
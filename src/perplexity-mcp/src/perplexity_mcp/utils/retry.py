@@ -0,0 +1,174 @@
+"""Retry policy with jittered exponential backoff for Perplexity API calls."""
+
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+import httpx
+
+# Connection-level failures that are safe to retry (the request never reached the API)
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# Rate limit headers that announce when capacity is available again
+RATE_LIMIT_RESET_HEADERS = ("x-ratelimit-reset", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """Get the HTTP status code carried by an exception, if any."""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether a failed call may be retried.
+
+    Only rate limiting (429), server errors (5xx) and connection failures are
+    retried; client errors such as 400 or 401 fail immediately.
+
+    Args:
+        error: Exception raised by the API call
+
+    Returns:
+        True if the failure class is retryable
+    """
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code == 429 or 500 <= status_code < 600
+    return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a header duration into seconds.
+
+    Accepts plain seconds ("2", "1.5"), Unix timestamps, HTTP dates and
+    compound durations such as "1m30s" or "250ms".
+
+    Args:
+        value: Header value
+
+    Returns:
+        Seconds to wait, or None if the value cannot be parsed
+    """
+    value = value.strip()
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+        # Large values are absolute Unix timestamps rather than relative delays
+        return max(0.0, seconds - time.time()) if seconds > 1e9 else max(0.0, seconds)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(f"{n}{u}" for n, u in parts) == value:
+        return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """
+    Extract the server-requested wait time from response headers.
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        Seconds to wait, or None if the server gave no hint
+    """
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        delay = parse_duration(retry_after)
+        if delay is not None:
+            return delay
+
+    resets = [parse_duration(headers[name]) for name in RATE_LIMIT_RESET_HEADERS if headers.get(name)]
+    resets = [delay for delay in resets if delay is not None]
+    return max(resets) if resets else None
+
+
+class RetryPolicy:
+    """Retry configuration with jittered exponential backoff and a total deadline."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        min_attempt_time: float = 1.0
+    ):
+        """
+        Initialize retry policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt (PERPLEXITY_MAX_RETRIES)
+            base_delay: Initial backoff delay in seconds (PERPLEXITY_RETRY_BASE_DELAY)
+            max_delay: Upper bound for a single backoff delay (PERPLEXITY_RETRY_MAX_DELAY)
+            min_attempt_time: Minimum time that must remain in the budget for another attempt
+        """
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("PERPLEXITY_MAX_RETRIES", "3"))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("PERPLEXITY_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("PERPLEXITY_RETRY_MAX_DELAY", "20.0"))
+        self.min_attempt_time = min_attempt_time
+
+    def backoff(self, attempt: int, headers: Optional[Mapping[str, Any]] = None) -> float:
+        """
+        Compute the delay before the next attempt.
+
+        Server hints (Retry-After, x-ratelimit-reset*) take precedence; otherwise
+        a "full jitter" exponential backoff is used.
+
+        Args:
+            attempt: Zero-based number of the retry about to be made
+            headers: Headers of the failed response, if any
+
+        Returns:
+            Delay in seconds
+        """
+        retry_after = get_retry_after(headers)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def next_delay(self, error: BaseException, attempt: int, deadline: float) -> Optional[float]:
+        """
+        Decide whether to retry a failed call and how long to wait.
+
+        Args:
+            error: Exception raised by the failed attempt
+            attempt: Zero-based number of the retry about to be made
+            deadline: time.monotonic() value by which the whole call must finish
+
+        Returns:
+            Delay in seconds, or None if the call must not be retried
+        """
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        delay = self.backoff(attempt, getattr(getattr(error, "response", None), "headers", None))
+        if time.monotonic() + delay + self.min_attempt_time > deadline:
+            return None
+        return delay
@@ -0,0 +1,206 @@
+"""Tests for the response cache."""
+
+import threading
+import pytest
+from unittest.mock import patch
+
+from perplexity_mcp.cache import DiskCache, ResponseCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    """Test cases for cache key generation."""
+    
+    def test_key_ignores_dict_ordering(self):
+        """Test that equivalent payloads produce the same key."""
+        first = {"model": "sonar", "messages": [{"role": "user", "content": "q"}], "max_tokens": 10}
+        second = {"max_tokens": 10, "messages": [{"role": "user", "content": "q"}], "model": "sonar"}
+        
+        assert make_cache_key(first) == make_cache_key(second)
+    
+    def test_key_differs_for_different_payloads(self):
+        """Test that different payloads produce different keys."""
+        assert make_cache_key({"model": "sonar"}) != make_cache_key({"model": "sonar-pro"})
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+    
+    def test_get_miss_and_hit(self):
+        """Test hit and miss counters."""
+        cache = ResponseCache(max_entries=10, default_ttl=60, enabled=True)
+        
+        assert cache.get("key") is None
+        cache.set("key", {"choices": []}, ttl=60)
+        assert cache.get("key") == {"choices": []}
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+    
+    def test_get_returns_copy(self):
+        """Test that callers cannot mutate cached entries."""
+        cache = ResponseCache(max_entries=10, enabled=True)
+        cache.set("key", {"choices": [1]}, ttl=60)
+        
+        cache.get("key")["choices"].append(2)
+        
+        assert cache.get("key") == {"choices": [1]}
+    
+    def test_entry_expires(self):
+        """Test that entries expire after their TTL."""
+        cache = ResponseCache(max_entries=10, enabled=True)
+        
+        with patch("perplexity_mcp.cache.time.monotonic", return_value=100.0):
+            cache.set("key", {"ok": True}, ttl=5)
+        with patch("perplexity_mcp.cache.time.monotonic", return_value=104.0):
+            assert cache.get("key") == {"ok": True}
+        with patch("perplexity_mcp.cache.time.monotonic", return_value=105.0):
+            assert cache.get("key") is None
+        
+        assert cache.stats()["entries"] == 0
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2, enabled=True)
+        cache.set("a", {"v": "a"}, ttl=60)
+        cache.set("b", {"v": "b"}, ttl=60)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", {"v": "c"}, ttl=60)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": "a"}
+        assert cache.get("c") == {"v": "c"}
+        assert cache.stats()["evictions"] == 1
+    
+    @pytest.mark.parametrize("data, expected", [
+        ({"model": "sonar"}, 3600),
+        ({"model": "sonar", "search_recency_filter": "day"}, 300),
+        ({"model": "sonar-deep-research"}, 86400),
+        ({"model": "sonar-deep-research", "search_recency_filter": "hour"}, 300),
+        ({"model": "sonar-pro", "search_recency_filter": "month"}, 3600),
+    ])
+    def test_ttl_for(self, data, expected):
+        """Test per-model and recency-based TTL defaults."""
+        cache = ResponseCache(default_ttl=3600, recent_ttl=300, deep_research_ttl=86400)
+        
+        assert cache.ttl_for(data) == expected
+
+
+class TestDiskCache:
+    """Test cases for DiskCache."""
+    
+    def test_disabled_without_directory(self):
+        """Test that the disk cache is disabled when no directory is configured."""
+        cache = DiskCache(cache_dir="")
+        
+        assert not cache.enabled
+        assert cache.get("key") is None
+        assert not cache.should_store({"model": "sonar-deep-research"})
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test that entries survive closing and reopening the cache."""
+        cache = DiskCache(cache_dir=str(tmp_path))
+        cache.set("key", {"choices": [{"message": {"content": "Report"}}]}, ttl=60, model="sonar-deep-research")
+        cache.close()
+        
+        reopened = DiskCache(cache_dir=str(tmp_path))
+        
+        assert reopened.get("key") == {"choices": [{"message": {"content": "Report"}}]}
+        assert reopened.stats()["hits"] == 1
+        reopened.close()
+    
+    def test_expired_entries_are_misses(self, tmp_path):
+        """Test that expired entries are removed on lookup."""
+        cache = DiskCache(cache_dir=str(tmp_path))
+        
+        with patch("perplexity_mcp.cache.time.time", return_value=1000.0):
+            cache.set("key", {"ok": True}, ttl=10)
+        with patch("perplexity_mcp.cache.time.time", return_value=1010.0):
+            assert cache.get("key") is None
+        
+        assert cache.stats()["entries"] == 0
+        cache.close()
+    
+    def test_size_bounded_eviction(self, tmp_path):
+        """Test that least recently used entries are evicted beyond max_bytes."""
+        cache = DiskCache(cache_dir=str(tmp_path), max_bytes=100)
+        payload = {"content": "x" * 30}
+        
+        with patch("perplexity_mcp.cache.time.time", return_value=1.0):
+            cache.set("a", payload, ttl=1000)
+        with patch("perplexity_mcp.cache.time.time", return_value=2.0):
+            cache.set("b", payload, ttl=1000)
+        with patch("perplexity_mcp.cache.time.time", return_value=3.0):
+            cache.get("a")  # "b" is now least recently used
+        with patch("perplexity_mcp.cache.time.time", return_value=4.0):
+            cache.set("c", payload, ttl=1000)
+        
+        stats = cache.stats()
+        assert stats["bytes"] <= 100
+        assert stats["evictions"] == 1
+        with patch("perplexity_mcp.cache.time.time", return_value=5.0):
+            assert cache.get("b") is None
+            assert cache.get("a") == payload
+        cache.close()
+    
+    def test_should_store_only_configured_models(self, tmp_path):
+        """Test that only configured models are persisted."""
+        cache = DiskCache(cache_dir=str(tmp_path), models=["sonar-deep-research"])
+        
+        assert cache.should_store({"model": "sonar-deep-research"})
+        assert not cache.should_store({"model": "sonar"})
+        cache.close()
+    
+    @pytest.mark.asyncio
+    async def test_async_access_runs_off_the_event_loop(self, tmp_path):
+        """Test that aget/aset run SQLite on the cache's worker thread."""
+        cache = DiskCache(cache_dir=str(tmp_path))
+        threads = []
+        original_connection = cache._connection
+        
+        def recording_connection():
+            threads.append(threading.current_thread().name)
+            return original_connection()
+        
+        with patch.object(cache, "_connection", side_effect=recording_connection):
+            await cache.aset("key", {"ok": True}, ttl=60)
+            assert await cache.aget("key") == {"ok": True}
+        
+        assert threads and all(name.startswith("perplexity-disk-cache") for name in threads)
+        cache.close()
+    
+    @pytest.mark.asyncio
+    async def test_reopens_after_close(self, tmp_path):
+        """Test that closing only releases the connection and later lookups reconnect."""
+        cache = DiskCache(cache_dir=str(tmp_path))
+        await cache.aset("key", {"ok": True}, ttl=60)
+        cache.close()
+        
+        assert cache.enabled
+        assert await cache.aget("key") == {"ok": True}
+        cache.close()
+    
+    @pytest.mark.asyncio
+    async def test_aclose_and_astats_run_off_the_event_loop(self, tmp_path):
+        """Test that astats/aclose use the worker thread and aclose stops it."""
+        cache = DiskCache(cache_dir=str(tmp_path))
+        await cache.aset("key", {"ok": True}, ttl=60)
+        executor = cache._executor
+        threads = []
+        original_release = cache._release
+        
+        def recording_release():
+            threads.append(threading.current_thread().name)
+            original_release()
+        
+        assert (await cache.astats())["entries"] == 1
+        with patch.object(cache, "_release", side_effect=recording_release):
+            await cache.aclose()
+        
+        assert threads and threads[0].startswith("perplexity-disk-cache")
+        assert cache._executor is None and cache._conn is None
+        assert executor._shutdown
+        assert await cache.aget("key") == {"ok": True}
+        cache.close()
+        assert cache._executor is None
@@ -1,11 +1,23 @@
 """Tests for Perplexity API client."""
 
+import json
 import pytest
 import os
 from unittest.mock import patch, AsyncMock
 import httpx
 
 from perplexity_mcp.client import PerplexityClient
+from perplexity_mcp.utils.retry import RetryPolicy
+
+
+SSE_BODY = (
+    b'data: {"id": "1", "model": "sonar", "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hello"}}]}\n\n'
+    b': keep-alive\n\n'
+    b'data: {"id": "1", "model": "sonar", "choices": [{"index": 0, "delta": {"content": " world"}}]}\n\n'
+    b'data: {"id": "1", "model": "sonar", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], '
+    b'"citations": ["https://example.com"], "usage": {"total_tokens": 12}}\n\n'
+    b'data: [DONE]\n\n'
+)
 
 
 class TestPerplexityClient:
@@ -140,14 +152,18 @@ class TestPerplexityClient:
             method="POST",
             url="https://api.perplexity.ai/chat/completions",
             status_code=429,
-            text="Rate limit exceeded"
+            text="Rate limit exceeded",
+            is_reusable=True
         )
         
         client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=2, base_delay=0)
         result = await client.query("test")
         
         assert "error" in result
         assert "Rate limit exceeded" in result["error"]
+        assert result["details"]["attempts"] == 3
+        assert len(httpx_mock.get_requests()) == 3
     
     @pytest.mark.asyncio
     async def test_query_network_error(self, httpx_mock):
@@ -224,4 +240,475 @@ class TestPerplexityClient:
         client = PerplexityClient(api_key="invalid-key")
         is_healthy = await client.health_check()
         
-        assert is_healthy is False
\ No newline at end of file
+        assert is_healthy is False
+    
+    @pytest.mark.asyncio
+    async def test_http_client_is_reused_across_queries(self, httpx_mock):
+        """Test that consecutive queries share one pooled HTTP client."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "OK"}}]},
+            status_code=200,
+            is_reusable=True
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        assert client._http_client is None  # Created lazily
+        
+        await client.query("first")
+        http_client = client._http_client
+        await client.query("second")
+        
+        assert http_client is not None
+        assert client._http_client is http_client
+        assert len(httpx_mock.get_requests()) == 2
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_per_request_timeout_with_pooled_client(self, httpx_mock):
+        """Test that custom and deep research timeouts still apply per request."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "OK"}}]},
+            status_code=200,
+            is_reusable=True
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        await client.query("test", custom_timeout=12.5)
+        await client.query("test", model="sonar-deep-research")
+        
+        first, second = httpx_mock.get_requests()
+        assert first.extensions["timeout"]["read"] == 12.5
+        assert second.extensions["timeout"]["read"] == client.deep_research_timeout
+        
+        await client.aclose()
+    
+    def test_http2_is_opt_in(self):
+        """Test HTTP/2 stays off unless requested, since h2 is an optional dependency."""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("PERPLEXITY_HTTP2", None)
+            client = PerplexityClient(api_key="test-key")
+        
+        assert client.http2 is False
+    
+    @pytest.mark.asyncio
+    async def test_pool_configuration_from_environment(self):
+        """Test connection pool limits are read from environment."""
+        with patch.dict(os.environ, {
+            "PERPLEXITY_HTTP2": "false",
+            "PERPLEXITY_MAX_CONNECTIONS": "5",
+            "PERPLEXITY_MAX_KEEPALIVE_CONNECTIONS": "2",
+            "PERPLEXITY_KEEPALIVE_EXPIRY": "7.5"
+        }):
+            client = PerplexityClient(api_key="test-key")
+        
+        assert client.http2 is False
+        assert client.max_connections == 5
+        assert client.max_keepalive_connections == 2
+        assert client.keepalive_expiry == 7.5
+    
+    @pytest.mark.asyncio
+    async def test_aclose_releases_http_client(self):
+        """Test that aclose closes the pooled client and allows re-creation."""
+        client = PerplexityClient(api_key="test-key")
+        http_client = client._get_http_client()
+        
+        await client.aclose()
+        
+        assert http_client.is_closed
+        assert client._http_client is None
+        assert client._get_http_client() is not http_client
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_served_from_cache(self, httpx_mock):
+        """Test that identical queries are served from the response cache."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Cached"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        first = await client.query("same question", search_recency_filter="week")
+        second = await client.query("same question", search_recency_filter="week")
+        
+        assert first == second
+        assert len(httpx_mock.get_requests()) == 1
+        assert (await client.cache_stats())["hits"] == 1
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_bypass_cache(self, httpx_mock):
+        """Test that bypass_cache always queries the API."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Fresh"}}]},
+            status_code=200,
+            is_reusable=True
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        await client.query("same question")
+        await client.query("same question", bypass_cache=True)
+        
+        assert len(httpx_mock.get_requests()) == 2
+        assert (await client.cache_stats())["hits"] == 0
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_errors_are_not_cached(self, httpx_mock):
+        """Test that failed responses are not stored in the cache."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=400,
+            text="Bad request"
+        )
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "OK"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        failed = await client.query("question")
+        succeeded = await client.query("question")
+        
+        assert "error" in failed
+        assert "error" not in succeeded
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_deep_research_served_from_disk_cache_after_restart(self, httpx_mock, tmp_path):
+        """Test that persisted deep research results survive a new client instance."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Deep report"}}]},
+            status_code=200
+        )
+        
+        with patch.dict(os.environ, {"PERPLEXITY_CACHE_DIR": str(tmp_path)}):
+            first_client = PerplexityClient(api_key="test-key")
+            await first_client.query("topic", model="sonar-deep-research")
+            await first_client.aclose()
+            
+            second_client = PerplexityClient(api_key="test-key")
+            result = await second_client.query("topic", model="sonar-deep-research")
+        
+        assert result["choices"][0]["message"]["content"] == "Deep report"
+        assert len(httpx_mock.get_requests()) == 1
+        assert (await second_client.cache_stats())["disk"]["hits"] == 1
+        
+        await second_client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_disk_cache_works_with_memory_cache_disabled(self, httpx_mock, tmp_path):
+        """Test that PERPLEXITY_CACHE_ENABLED=false leaves the disk cache on."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Deep report"}}]},
+            status_code=200
+        )
+        
+        with patch.dict(os.environ, {"PERPLEXITY_CACHE_DIR": str(tmp_path), "PERPLEXITY_CACHE_ENABLED": "false"}):
+            client = PerplexityClient(api_key="test-key")
+            await client.query("topic", model="sonar-deep-research")
+            result = await client.query("topic", model="sonar-deep-research")
+        
+        stats = await client.cache_stats()
+        assert result["choices"][0]["message"]["content"] == "Deep report"
+        assert len(httpx_mock.get_requests()) == 1
+        assert stats["entries"] == 0
+        assert stats["disk"]["hits"] == 1
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_are_coalesced(self, httpx_mock):
+        """Test that concurrent identical queries share one upstream request."""
+        import asyncio
+        
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Shared"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.cache.enabled = False  # Isolate coalescing from caching
+        
+        results = await asyncio.gather(*[client.query("same question") for _ in range(5)])
+        
+        assert all(r["choices"][0]["message"]["content"] == "Shared" for r in results)
+        assert len(httpx_mock.get_requests()) == 1
+        assert client.coalescing_stats() == {"enabled": True, "collapsed": 4, "in_flight": 0}
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_coalesced_queries_share_errors(self, httpx_mock):
+        """Test that waiters receive the same error as the upstream request."""
+        import asyncio
+        
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=401,
+            text="Unauthorized"
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        results = await asyncio.gather(client.query("question"), client.query("question"))
+        
+        assert all("Authentication failed" in r["error"] for r in results)
+        assert len(httpx_mock.get_requests()) == 1
+        
+        await client.aclose()
+
+    
+    @pytest.mark.asyncio
+    async def test_coalesced_queries_share_retries(self, httpx_mock):
+        """Test that a failed flight is retried once for all waiters, not once per waiter."""
+        import asyncio
+        
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=503,
+            text="Service unavailable"
+        )
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Recovered"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=3, base_delay=0)
+        results = await asyncio.gather(*[client.query("question") for _ in range(5)])
+        
+        assert all(r["choices"][0]["message"]["content"] == "Recovered" for r in results)
+        assert len(httpx_mock.get_requests()) == 2
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_retries_server_error_then_succeeds(self, httpx_mock):
+        """Test that 5xx responses are retried until the API succeeds."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=503,
+            text="Service unavailable"
+        )
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Recovered"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=3, base_delay=0)
+        result = await client.query("test")
+        
+        assert result["choices"][0]["message"]["content"] == "Recovered"
+        assert len(httpx_mock.get_requests()) == 2
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_honors_retry_after_header(self, httpx_mock):
+        """Test that the Retry-After header sets the backoff delay."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=429,
+            headers={"Retry-After": "2"}
+        )
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "OK"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=1, base_delay=0)
+        
+        with patch("perplexity_mcp.client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            result = await client.query("test")
+        
+        assert "error" not in result
+        mock_sleep.assert_awaited_once_with(2.0)
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_does_not_retry_client_errors(self, httpx_mock):
+        """Test that non-retryable errors fail on the first attempt."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=400,
+            text="Bad request"
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=3, base_delay=0)
+        result = await client.query("test")
+        
+        assert "Bad request" in result["error"]
+        assert len(httpx_mock.get_requests()) == 1
+    
+    @pytest.mark.asyncio
+    async def test_query_retries_stay_within_timeout_budget(self, httpx_mock):
+        """Test that a Retry-After beyond the request timeout is not waited for."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=429,
+            headers={"Retry-After": "30"}
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=3, base_delay=0)
+        result = await client.query("test", custom_timeout=10.0)
+        
+        assert "Rate limit exceeded" in result["error"]
+        assert len(httpx_mock.get_requests()) == 1
+    
+    @pytest.mark.asyncio
+    async def test_query_passes_through_rate_limiter(self, httpx_mock):
+        """Test that upstream calls are metered per model, but cache hits are not."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"choices": [{"message": {"content": "Limited"}}]},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        await client.query("rate limited question")
+        await client.query("rate limited question")
+        
+        stats = client.rate_limit_stats()
+        assert stats["enabled"]
+        assert stats["models"]["sonar"]["acquired"] == 1
+        assert stats["models"]["sonar"]["queue_depth"] == 0
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_is_bounded_by_timeout(self):
+        """Test that a request the limiter cannot admit within its timeout fails without being sent."""
+        client = PerplexityClient(api_key="test-key")
+        client.rate_limiter._get_limiter("sonar").requests.level = -50
+        
+        result = await client.query("queued question", custom_timeout=5.0)
+        
+        assert "Rate limit exceeded" in result["error"]
+        assert result["details"]["type"] == "RateLimitTimeout"
+        assert result["details"]["retry_after_s"] > 5.0
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_stream_query_yields_chunks(self, httpx_mock):
+        """Test that server-sent events are parsed into chunks as they arrive."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            content=SSE_BODY,
+            headers={"Content-Type": "text/event-stream"},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        with patch("perplexity_mcp.client.logger") as mock_logger:
+            chunks = [chunk async for chunk in client.stream_query("stream me", model="sonar-reasoning")]
+        
+        assert [c["choices"][0]["delta"].get("content") for c in chunks] == ["Hello", " world", None]
+        assert json.loads(httpx_mock.get_requests()[0].content)["stream"] is True
+        assert any("Time to first token" in call.args[0] for call in mock_logger.info.call_args_list)
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_query_with_stream_aggregates_response(self, httpx_mock):
+        """Test that query(stream=True) returns a regular completion response."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            content=SSE_BODY,
+            headers={"Content-Type": "text/event-stream"},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        result = await client.query("stream me", stream=True)
+        
+        assert result["choices"][0]["message"]["content"] == "Hello world"
+        assert result["choices"][0]["finish_reason"] == "stop"
+        assert result["citations"] == ["https://example.com"]
+        assert result["usage"]["total_tokens"] == 12
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_stream_query_retries_before_first_chunk(self, httpx_mock):
+        """Test that a failure before any content is streamed is retried."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            status_code=503
+        )
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            content=SSE_BODY,
+            headers={"Content-Type": "text/event-stream"},
+            status_code=200
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        client.retry_policy = RetryPolicy(max_retries=2, base_delay=0)
+        chunks = [chunk async for chunk in client.stream_query("stream me")]
+        
+        assert len(chunks) == 3
+        assert len(httpx_mock.get_requests()) == 2
+        
+        await client.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_stream_query_raises_client_errors(self, httpx_mock):
+        """Test that non-retryable errors are raised to the consumer."""
+        httpx_mock.add_response(
+            method="POST",
+            url="https://api.perplexity.ai/chat/completions",
+            json={"error": "bad"},
+            status_code=400
+        )
+        
+        client = PerplexityClient(api_key="test-key")
+        with pytest.raises(httpx.HTTPStatusError):
+            async for _ in client.stream_query("stream me"):
+                pass
+        
+        await client.aclose()
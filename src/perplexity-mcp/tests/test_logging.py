@@ -4,9 +4,31 @@ import pytest
 import logging
 import tempfile
 import os
-from unittest.mock import patch
+import gzip
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
 
-from perplexity_mcp.utils.logging import setup_logging, get_logger
+from perplexity_mcp.utils.logging import (
+    setup_logging,
+    setup_api_logging,
+    get_logger,
+    get_api_logger,
+    log_api_request,
+    log_api_response,
+    shutdown_logging,
+    debug_enabled,
+    lazy_debug,
+    prune_log_sessions,
+    RotatingLogFileHandler,
+    ApiEventSampler,
+    BoundedQueueHandler,
+    BatchingQueueListener,
+    BufferedFileHandler
+)
 
 
 class TestLoggingUtils:
@@ -160,4 +182,422 @@ class TestLoggingUtils:
         
         logger = setup_logging(log_level=log_level, log_file=log_file)
         
-        assert logger.level == logging.DEBUG
\ No newline at end of file
+        assert logger.level == logging.DEBUG
+
+
+class TestAsyncLogging:
+    """Test cases for the opt-in queue-based logging pipeline."""
+    
+    def test_api_logging_through_queue(self, tmp_path):
+        """Test that records reach the file through the listener and are flushed on shutdown."""
+        with patch.dict(os.environ, {"PERPLEXITY_LOG_ASYNC": "true"}):
+            api_logger = setup_api_logging(str(tmp_path))
+        
+        try:
+            assert isinstance(api_logger.handlers[0], BoundedQueueHandler)
+            for i in range(500):
+                api_logger.debug(f"event {i}")
+        finally:
+            shutdown_logging()
+            api_logger.handlers.clear()
+        
+        lines = (tmp_path / "api.log").read_text().splitlines()
+        assert lines[-1].endswith("event 499")
+        assert len([line for line in lines if "event" in line]) == 500
+    
+    def test_drop_policy_counts_dropped_records(self):
+        """Test that a full queue drops records instead of blocking the caller."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy="drop")
+        logger = logging.getLogger("perplexity_test_drop")
+        logger.addHandler(handler)
+        logger.propagate = False
+        
+        try:
+            for i in range(5):
+                logger.warning(f"message {i}")
+        finally:
+            logger.removeHandler(handler)
+        
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+    
+    def test_listener_reports_dropped_records(self, tmp_path):
+        """Test that dropped records are reported in the log file."""
+        log_queue = queue.Queue(maxsize=10)
+        queue_handler = BoundedQueueHandler(log_queue)
+        file_handler = BufferedFileHandler(str(tmp_path / "out.log"))
+        listener = BatchingQueueListener(log_queue, queue_handler, file_handler)
+        queue_handler.dropped = 7
+        
+        listener.start()
+        queue_handler.handle(logging.LogRecord("x", logging.INFO, __file__, 1, "kept", None, None))
+        listener.stop()
+        file_handler.close()
+        
+        content = (tmp_path / "out.log").read_text()
+        assert "kept" in content
+        assert "dropped 7 records" in content
+    
+    def test_invalid_queue_policy(self, tmp_path):
+        """Test that an unknown queue policy is rejected."""
+        with patch.dict(os.environ, {"PERPLEXITY_LOG_ASYNC": "true", "PERPLEXITY_LOG_QUEUE_POLICY": "wait"}):
+            with pytest.raises(ValueError, match="PERPLEXITY_LOG_QUEUE_POLICY"):
+                setup_api_logging(str(tmp_path))
+
+
+class TestAPILogFormat:
+    """Test the compact JSON-lines API log format."""
+    
+    def teardown_method(self):
+        with patch.dict(os.environ, {"PERPLEXITY_API_LOG_FORMAT": "text"}):
+            setup_api_logging(None)
+    
+    def test_jsonl_events_are_compact_objects(self):
+        """Test that each API event is one parseable line with the stable schema."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {"PERPLEXITY_API_LOG_FORMAT": "jsonl"}):
+                api_logger = setup_api_logging(temp_dir)
+            
+            request_id = log_api_request(
+                "POST", "https://api.perplexity.ai/chat/completions",
+                {"Authorization": "Bearer secret-key"},
+                {"model": "sonar", "messages": [{"role": "user", "content": "Hello"}]}
+            )
+            log_api_response(
+                request_id, 200,
+                {"model": "sonar", "usage": {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12}},
+                123.4567
+            )
+            for handler in api_logger.handlers:
+                handler.flush()
+            
+            lines = (Path(temp_dir) / "api.jsonl").read_text().splitlines()
+            events = [json.loads(line) for line in lines]
+            
+            assert [event["type"] for event in events] == ["request", "response"]
+            assert all(event["request_id"] == request_id for event in events)
+            assert events[0]["model"] == "sonar"
+            assert events[0]["headers"]["Authorization"] == "[REDACTED]"
+            assert events[1]["duration_ms"] == 123.457
+            assert events[1]["usage"]["total_tokens"] == 12
+            assert events[1]["success"] is True
+            assert lines[1] == json.dumps(events[1], separators=(",", ":"))
+    
+    def test_text_events_are_single_lines(self):
+        """Test that the default text format writes one line per event."""
+        with patch('perplexity_mcp.utils.logging.get_api_logger') as mock_get_logger:
+            log_api_response("req_789", 500, {}, 12.0, "Server error")
+            
+            message = mock_get_logger.return_value.debug.call_args[0][0]
+            assert message.startswith("API_RESPONSE: ")
+            assert "\n" not in message
+            assert json.loads(message[len("API_RESPONSE: "):])["usage"] is None
+    
+    def test_invalid_api_log_format(self):
+        """Test that an unknown API log format is rejected."""
+        with patch.dict(os.environ, {"PERPLEXITY_API_LOG_FORMAT": "yaml"}):
+            with pytest.raises(ValueError, match="PERPLEXITY_API_LOG_FORMAT"):
+                setup_api_logging(None)
+
+
+class TestLazyDebug:
+    """Test level-guarded debug helpers."""
+    
+    def test_lazy_debug_skips_message_when_disabled(self):
+        """Test that the message is not built above DEBUG level."""
+        logger = logging.getLogger("perplexity_mcp_test_lazy")
+        logger.setLevel(logging.INFO)
+        build = MagicMock(return_value="expensive")
+        
+        lazy_debug(logger, build)
+        
+        assert debug_enabled(logger) is False
+        build.assert_not_called()
+    
+    def test_lazy_debug_builds_message_when_enabled(self):
+        """Test that the message is built and logged at DEBUG level."""
+        logger = logging.getLogger("perplexity_mcp_test_lazy")
+        logger.setLevel(logging.DEBUG)
+        
+        with patch.object(logger, "debug") as mock_debug:
+            lazy_debug(logger, lambda: "expensive")
+        
+        mock_debug.assert_called_once_with("expensive", stacklevel=2)
+    
+    def test_api_logging_skipped_when_disabled(self):
+        """Test that request and response payloads are not processed when API logging is off."""
+        api_logger = setup_api_logging(None)
+        data = MagicMock()
+        
+        request_id = log_api_request("POST", "https://example.com", {}, data)
+        log_api_response(request_id, 200, data, 1.0)
+        
+        assert request_id.startswith("req_")
+        assert debug_enabled(api_logger) is False
+        data.copy.assert_not_called()
+
+
+class TestLogRotation:
+    """Test log rotation, compression and session retention."""
+    
+    def test_size_rotation_compresses_segments(self):
+        """Test that rotated segments are gzip-compressed and limited to backup_count."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "server.log")
+            handler = RotatingLogFileHandler(log_file, max_bytes=200, backup_count=2)
+            logger = logging.getLogger("perplexity_mcp_test_rotation")
+            logger.addHandler(handler)
+            logger.propagate = False
+            
+            try:
+                for i in range(40):
+                    logger.warning(f"line {i:02d} " + "x" * 40)
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+                shutdown_logging()
+            
+            segments = sorted(Path(temp_dir).glob("server.log.*"))
+            assert len(segments) == 2
+            assert all(segment.suffix == ".gz" for segment in segments)
+            assert "line 39" in Path(log_file).read_text()
+            assert "line" in gzip.open(segments[-1], "rt").read()
+    
+    def test_size_counts_encoded_bytes(self):
+        """Test that the tracked size matches the file on disk for non-ASCII messages."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "server.log")
+            handler = RotatingLogFileHandler(log_file, max_bytes=10 ** 6)
+            logger = logging.getLogger("perplexity_mcp_test_rotation_bytes")
+            logger.addHandler(handler)
+            logger.propagate = False
+            
+            try:
+                for _ in range(10):
+                    logger.warning("Überprüfung 検証 ✓")
+                handler.flush()
+                assert handler.size == os.path.getsize(log_file)
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+    
+    def test_age_rotation(self):
+        """Test that a file older than max_age is rotated on the next record."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "server.log")
+            handler = RotatingLogFileHandler(log_file, max_age=3600)
+            record = logging.LogRecord("x", logging.INFO, __file__, 1, "message", None, None)
+            
+            handler.emit(record)
+            handler.rollover_at = time.time() - 1
+            handler.emit(record)
+            handler.close()
+            shutdown_logging()
+            
+            assert len(list(Path(temp_dir).glob("server.log.*.gz"))) == 1
+            assert handler.rollover_at > time.time()
+    
+    def test_prune_log_sessions(self):
+        """Test that idle and excess sessions are deleted and active ones kept."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old = time.time() - 40 * 86400
+            for name, mtime in (
+                ("perplexity_20240101_000000", old),
+                ("perplexity_20240201_000000", time.time() - 2 * 86400),
+                ("perplexity_20240301_000000", time.time() - 86400),
+                ("perplexity_20240401_000000", time.time()),
+                ("unrelated", old)
+            ):
+                session = Path(temp_dir) / name
+                session.mkdir()
+                (session / "server.log").write_text("log")
+                os.utime(session / "server.log", (mtime, mtime))
+                os.utime(session, (mtime, mtime))
+            
+            removed = prune_log_sessions(temp_dir, retention_days=30, max_sessions=2)
+            
+            remaining = sorted(p.name for p in Path(temp_dir).iterdir())
+            assert removed == 2
+            assert remaining == ["perplexity_20240301_000000", "perplexity_20240401_000000", "unrelated"]
+    
+    def test_prune_log_sessions_skips_unreadable_sessions(self):
+        """Test that a session that cannot be scanned is skipped without stopping the prune."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old = time.time() - 40 * 86400
+            for name in ("perplexity_20240101_000000", "perplexity_20240201_000000", "perplexity_20240301_000000"):
+                session = Path(temp_dir) / name
+                session.mkdir()
+                os.utime(session, (old, old))
+            real_scandir = os.scandir
+            
+            def flaky_scandir(path):
+                if isinstance(path, str) and path.endswith("perplexity_20240201_000000"):
+                    raise PermissionError(path)
+                return real_scandir(path)
+            
+            with patch("os.scandir", side_effect=flaky_scandir):
+                removed = prune_log_sessions(temp_dir, retention_days=30, max_sessions=0)
+            
+            remaining = sorted(p.name for p in Path(temp_dir).iterdir())
+            assert removed == 2
+            assert remaining == ["perplexity_20240201_000000"]
+    
+    def test_setup_logging_keeps_sessions_by_default(self):
+        """Test that old sessions are only pruned when retention is configured."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old_session = Path(temp_dir) / "perplexity_20240101_000000"
+            old_session.mkdir()
+            old = time.time() - 400 * 86400
+            os.utime(old_session, (old, old))
+            
+            with patch.dict(os.environ, {"PERPLEXITY_LOG_LEVEL": "INFO", "PERPLEXITY_LOG_PATH": temp_dir}):
+                os.environ.pop("PERPLEXITY_LOG_RETENTION_DAYS", None)
+                os.environ.pop("PERPLEXITY_LOG_MAX_SESSIONS", None)
+                setup_logging()
+            
+            assert "log-retention" not in [thread.name for thread in threading.enumerate()]
+            assert old_session.exists()
+            with patch.dict(os.environ, {"PERPLEXITY_LOG_LEVEL": "none"}):
+                setup_logging()
+    
+    def test_setup_logging_prunes_in_background(self):
+        """Test that setup_logging prunes old sessions without waiting for it."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old_session = Path(temp_dir) / "perplexity_20240101_000000"
+            old_session.mkdir()
+            old = time.time() - 40 * 86400
+            os.utime(old_session, (old, old))
+            
+            with patch.dict(os.environ, {
+                "PERPLEXITY_LOG_LEVEL": "INFO",
+                "PERPLEXITY_LOG_PATH": temp_dir,
+                "PERPLEXITY_LOG_RETENTION_DAYS": "30"
+            }):
+                setup_logging()
+            for thread in threading.enumerate():
+                if thread.name == "log-retention":
+                    thread.join(timeout=5)
+            
+            assert not old_session.exists()
+            with patch.dict(os.environ, {"PERPLEXITY_LOG_LEVEL": "none"}):
+                setup_logging()
+
+
+class TestApiSampling:
+    """Test sampling of high-volume API events."""
+    
+    def teardown_method(self):
+        setup_api_logging(None)
+    
+    def test_sample_rate_keeps_failures_and_slow_requests(self):
+        """Test 1-in-N sampling of successful requests, always keeping failed and slow ones."""
+        sampler = ApiEventSampler(sample_rate=3, slow_ms=1000)
+        
+        kept = [sampler.should_keep(True, 10.0) for _ in range(9)]
+        
+        assert kept.count(True) == 3
+        assert sampler.should_keep(False, 10.0) is True
+        assert sampler.should_keep(True, 1500.0) is True
+        assert (sampler.kept, sampler.dropped) == (5, 6)
+    
+    def test_sample_rate_ignores_always_kept_requests(self):
+        """Test that failures and keep_first requests do not shift the 1-in-N sampling."""
+        sampler = ApiEventSampler(sample_rate=3, keep_first=2)
+        
+        kept = []
+        for _ in range(6):
+            kept.append(sampler.should_keep(True, 10.0))
+            sampler.should_keep(False, 10.0)
+            sampler.should_keep(False, 10.0)
+        
+        # The first success falls within keep_first; after that every third success is kept
+        assert kept == [True, False, False, True, False, False]
+    
+    def test_per_second_cap(self):
+        """Test that at most max_per_second successful requests are kept per second."""
+        sampler = ApiEventSampler(max_per_second=2, keep_first=1)
+        
+        with patch("time.monotonic", return_value=1000.0):
+            kept = [sampler.should_keep(True, 10.0) for _ in range(5)]
+        
+        assert kept == [True, True, True, False, False]
+    
+    def test_sampled_api_log(self):
+        """Test that dropped pairs leave no events and a summary records how many were dropped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {
+                "PERPLEXITY_API_LOG_FORMAT": "jsonl",
+                "PERPLEXITY_API_LOG_SAMPLE_RATE": "1000",
+                "PERPLEXITY_API_LOG_KEEP_FIRST": "1",
+                "PERPLEXITY_API_LOG_SLOW_MS": "100"
+            }):
+                setup_api_logging(temp_dir)
+            
+            for status_code, duration, error in [(200, 5.0, None)] * 5 + [(500, 5.0, "Server error"), (200, 250.0, None)]:
+                request_id = log_api_request("POST", "https://example.com", {}, {"model": "test"})
+                log_api_response(request_id, status_code, {}, duration, error)
+            shutdown_logging()
+            
+            events = [json.loads(line) for line in (Path(temp_dir) / "api.jsonl").read_text().splitlines()]
+            
+            assert [event["type"] for event in events] == ["request", "response"] * 3 + ["sampling"]
+            assert [event["status_code"] for event in events if event["type"] == "response"] == [200, 500, 200]
+            assert events[-1]["dropped"] == 4
+            assert events[-1]["kept"] == 3
+    
+    def test_request_ids_are_unique(self):
+        """Test that requests logged at the same moment with the same payload get distinct ids."""
+        data = {"model": "test"}
+        
+        with patch("time.time", return_value=1000.0):
+            request_ids = {log_api_request("POST", "https://example.com", {}, data) for _ in range(100)}
+        
+        assert len(request_ids) == 100
+    
+    def test_requests_without_response_expire(self):
+        """Test that held requests are released unsampled once they are older than max_pending_age."""
+        sampler = ApiEventSampler(sample_rate=10, max_pending_age=30.0)
+        
+        with patch("time.monotonic", return_value=1000.0):
+            assert sampler.defer_request("req_a", ("ts", "POST")) == []
+        with patch("time.monotonic", return_value=1020.0):
+            assert sampler.defer_request("req_b", ("ts", "POST")) == []
+            assert sampler.expire_pending() == []
+        with patch("time.monotonic", return_value=1031.0):
+            assert sampler.expire_pending() == [("req_a", "ts", "POST")]
+        
+        assert list(sampler.pending) == ["req_b"]
+        assert sampler.expire_pending(max_age=0) == [("req_b", "ts", "POST")]
+    
+    def test_summary_is_written_without_further_events(self):
+        """Test that the timer writes the summary even when no more responses are logged."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {
+                "PERPLEXITY_API_LOG_FORMAT": "jsonl",
+                "PERPLEXITY_API_LOG_SAMPLE_RATE": "1000",
+                "PERPLEXITY_API_LOG_KEEP_FIRST": "0",
+                "PERPLEXITY_API_LOG_SUMMARY_SECONDS": "0.05"
+            }):
+                setup_api_logging(temp_dir)
+            
+            for _ in range(3):
+                request_id = log_api_request("POST", "https://example.com", {}, {"model": "test"})
+                log_api_response(request_id, 200, {}, 5.0)
+            
+            api_log = Path(temp_dir) / "api.jsonl"
+            deadline = time.monotonic() + 5
+            while "sampling" not in api_log.read_text() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            
+            events = [json.loads(line) for line in api_log.read_text().splitlines()]
+            setup_api_logging(None)
+            
+            assert [event["type"] for event in events] == ["sampling"]
+            assert events[0]["dropped"] == 3
+    
+    def test_invalid_sample_rate(self):
+        """Test that a sample rate below 1 is rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.dict(os.environ, {"PERPLEXITY_API_LOG_SAMPLE_RATE": "0"}):
+                with pytest.raises(ValueError, match="PERPLEXITY_API_LOG_SAMPLE_RATE"):
+                    setup_api_logging(temp_dir)
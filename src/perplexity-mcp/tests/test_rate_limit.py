@@ -0,0 +1,152 @@
+"""Tests for the client-side rate limiter."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from perplexity_mcp.rate_limit import ModelRateLimiter, RateLimiter, RateLimitTimeout, TokenBucket, estimate_tokens
+
+
+class TestEstimateTokens:
+    """Test cases for token estimation."""
+
+    def test_counts_prompt_and_completion_budget(self):
+        """Test that prompt characters and max_tokens are both counted."""
+        messages = [
+            {"role": "system", "content": "a" * 40},
+            {"role": "user", "content": "b" * 80}
+        ]
+
+        assert estimate_tokens(messages, 1000) == 1030
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    def test_refills_over_time(self):
+        """Test that an empty bucket reports the refill delay."""
+        with patch("perplexity_mcp.rate_limit.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(60)
+            bucket.consume(60)
+            assert bucket.time_until(1) == pytest.approx(1.0)
+
+        with patch("perplexity_mcp.rate_limit.time.monotonic", return_value=101.0):
+            assert bucket.time_until(1) == 0.0
+
+    def test_oversized_request_is_clamped_to_capacity(self):
+        """Test that a request larger than the bucket does not wait forever."""
+        with patch("perplexity_mcp.rate_limit.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(100)
+            assert bucket.time_until(5000) == 0.0
+
+    def test_zero_limit_is_unlimited(self):
+        """Test that a zero limit never delays."""
+        bucket = TokenBucket(0)
+        bucket.consume(10 ** 6)
+
+        assert bucket.unlimited
+        assert bucket.time_until(10 ** 6) == 0.0
+
+
+class TestModelRateLimiter:
+    """Test cases for ModelRateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_queued_callers_are_served_in_order(self):
+        """Test that waiting callers are admitted FIFO and metrics are recorded."""
+        limiter = ModelRateLimiter("sonar", requests_per_minute=6000, tokens_per_minute=0)
+        limiter.requests.level = 0
+        order = []
+
+        async def caller(index):
+            await limiter.acquire(10)
+            order.append(index)
+
+        tasks = [asyncio.ensure_future(caller(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 3
+
+        await asyncio.gather(*tasks)
+
+        stats = limiter.stats()
+        assert order == [0, 1, 2]
+        assert stats["queue_depth"] == 0
+        assert stats["acquired"] == 3
+        assert stats["delayed"] == 3
+        assert stats["max_wait_s"] > 0
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_delays_requests(self):
+        """Test that exhausted token capacity delays requests."""
+        limiter = ModelRateLimiter("sonar", requests_per_minute=0, tokens_per_minute=60000)
+        limiter.tokens.level = 0
+
+        waited = await limiter.acquire(10)
+
+        assert waited > 0
+
+
+    @pytest.mark.asyncio
+    async def test_wait_beyond_timeout_is_rejected(self):
+        """Test that a wait longer than the remaining budget raises without reserving capacity."""
+        limiter = ModelRateLimiter("sonar", requests_per_minute=60, tokens_per_minute=0)
+        limiter.requests.level = 0
+
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire(10, timeout=0.5)
+
+        assert limiter.requests.time_until(1) == pytest.approx(1.0, abs=0.05)
+        assert limiter.stats()["rejected"] == 1
+        assert limiter.stats()["acquired"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_returns_its_reservation(self):
+        """Test that cancelling a queued caller frees its slot for the next one."""
+        limiter = ModelRateLimiter("sonar", requests_per_minute=60, tokens_per_minute=0)
+        limiter.requests.level = 0
+
+        task = asyncio.ensure_future(limiter.acquire(10))
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+        assert limiter.requests.time_until(1) == pytest.approx(2.0, abs=0.05)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert limiter.queue_depth == 0
+        assert limiter.requests.time_until(1) == pytest.approx(1.0, abs=0.05)
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_separate_buckets_per_model(self):
+        """Test that deep research uses its own limits."""
+        limiter = RateLimiter(enabled=True, requests_per_minute=50, tokens_per_minute=0,
+                              deep_research_requests_per_minute=5, deep_research_tokens_per_minute=0)
+
+        await limiter.acquire("sonar", 100)
+        await limiter.acquire("sonar-deep-research", 100)
+
+        stats = limiter.stats()
+        assert stats["models"]["sonar"]["requests_per_minute"] == 50
+        assert stats["models"]["sonar-deep-research"]["requests_per_minute"] == 5
+        assert stats["models"]["sonar"]["acquired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_limiter_does_not_track(self):
+        """Test that a disabled limiter admits requests immediately."""
+        limiter = RateLimiter(enabled=False)
+
+        assert await limiter.acquire("sonar", 100) == 0.0
+        assert limiter.stats() == {"enabled": False, "models": {}}
+
+    @patch.dict("os.environ", {"PERPLEXITY_RATE_LIMIT_RPM": "20", "PERPLEXITY_DEEP_RESEARCH_TPM": "50000"})
+    def test_env_configuration(self):
+        """Test that limits are read from the environment."""
+        limiter = RateLimiter()
+
+        assert limiter.requests_per_minute == 20
+        assert limiter.deep_research_tokens_per_minute == 50000
@@ -0,0 +1,92 @@
+"""Tests for retry utilities."""
+
+import pytest
+import time
+from unittest.mock import patch
+import httpx
+
+from perplexity_mcp.utils.retry import RetryPolicy, get_retry_after, is_retryable, parse_duration
+
+
+def make_status_error(status_code: int, headers: dict = None) -> httpx.HTTPStatusError:
+    """Build an HTTPStatusError for the given status."""
+    request = httpx.Request("POST", "https://api.perplexity.ai/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestRetryHelpers:
+    """Test cases for retry helper functions."""
+    
+    @pytest.mark.parametrize("status_code, expected", [
+        (429, True), (500, True), (503, True), (400, False), (401, False), (404, False)
+    ])
+    def test_is_retryable_status(self, status_code, expected):
+        """Test that only 429 and 5xx statuses are retryable."""
+        assert is_retryable(make_status_error(status_code)) is expected
+    
+    def test_is_retryable_connection_errors(self):
+        """Test that connect errors are retryable but read timeouts are not."""
+        assert is_retryable(httpx.ConnectError("refused"))
+        assert is_retryable(httpx.ConnectTimeout("timeout"))
+        assert not is_retryable(httpx.ReadTimeout("timeout"))
+        assert not is_retryable(ValueError("boom"))
+    
+    @pytest.mark.parametrize("value, expected", [
+        ("2", 2.0), ("1.5", 1.5), ("250ms", 0.25), ("1m30s", 90.0), ("6m0s", 360.0), ("soon", None)
+    ])
+    def test_parse_duration(self, value, expected):
+        """Test parsing of header durations."""
+        assert parse_duration(value) == expected
+    
+    def test_parse_duration_unix_timestamp(self):
+        """Test that absolute timestamps are converted to relative delays."""
+        with patch("perplexity_mcp.utils.retry.time.time", return_value=1_700_000_000.0):
+            assert parse_duration("1700000005") == 5.0
+    
+    def test_get_retry_after_prefers_retry_after(self):
+        """Test header precedence for the server-requested delay."""
+        assert get_retry_after({"retry-after": "3", "x-ratelimit-reset-requests": "10s"}) == 3.0
+        assert get_retry_after({"retry-after-ms": "1500"}) == 1.5
+        assert get_retry_after({"x-ratelimit-reset-requests": "2s", "x-ratelimit-reset-tokens": "5s"}) == 5.0
+        assert get_retry_after({}) is None
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy."""
+    
+    def test_backoff_grows_exponentially_with_cap(self):
+        """Test that jittered backoff stays within the exponential envelope."""
+        policy = RetryPolicy(max_retries=5, base_delay=1.0, max_delay=4.0)
+        
+        with patch("perplexity_mcp.utils.retry.random.uniform", side_effect=lambda a, b: b):
+            assert [policy.backoff(n) for n in range(4)] == [1.0, 2.0, 4.0, 4.0]
+    
+    def test_next_delay_stops_after_max_retries(self):
+        """Test that no delay is returned once retries are exhausted."""
+        policy = RetryPolicy(max_retries=2, base_delay=0)
+        deadline = time.monotonic() + 60
+        
+        assert policy.next_delay(make_status_error(503), 1, deadline) is not None
+        assert policy.next_delay(make_status_error(503), 2, deadline) is None
+    
+    def test_next_delay_respects_deadline(self):
+        """Test that retries are skipped when they would exceed the deadline."""
+        policy = RetryPolicy(max_retries=3, base_delay=0)
+        error = make_status_error(429, {"Retry-After": "5"})
+        
+        assert policy.next_delay(error, 0, time.monotonic() + 3) is None
+        assert policy.next_delay(error, 0, time.monotonic() + 30) == pytest.approx(5.0)
+    
+    def test_configuration_from_environment(self):
+        """Test retry configuration from environment variables."""
+        with patch.dict("os.environ", {
+            "PERPLEXITY_MAX_RETRIES": "5",
+            "PERPLEXITY_RETRY_BASE_DELAY": "0.1",
+            "PERPLEXITY_RETRY_MAX_DELAY": "3"
+        }):
+            policy = RetryPolicy()
+        
+        assert policy.max_retries == 5
+        assert policy.base_delay == 0.1
+        assert policy.max_delay == 3.0
@@ -1,5 +1,6 @@
 """Tests for FastMCP server implementation."""
 
+import asyncio
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 import os
@@ -14,6 +15,19 @@ def mock_perplexity_client():
     """Mock Perplexity client for testing."""
     mock_client = AsyncMock()
     mock_client.AVAILABLE_MODELS = ["sonar", "sonar-pro", "sonar-reasoning", "sonar-deep-research"]
+    mock_client.cache_stats = AsyncMock(return_value={
+        "enabled": True, "hits": 3, "misses": 1, "hit_rate": 0.75,
+        "evictions": 0, "entries": 1, "max_entries": 256
+    })
+    mock_client.coalescing_stats = MagicMock(return_value={
+        "enabled": True, "collapsed": 2, "in_flight": 0
+    })
+    mock_client.rate_limit_stats = MagicMock(return_value={
+        "enabled": True,
+        "models": {
+            "sonar": {"queue_depth": 1, "acquired": 4, "delayed": 2, "avg_wait_s": 0.5, "max_wait_s": 1.25}
+        }
+    })
     return mock_client
 
 
@@ -180,6 +194,9 @@ class TestMCPTools:
         
         assert "✅" in result
         assert "accessible and working correctly" in result
+        assert "hits=3, misses=1" in result
+        assert "collapsed=2" in result
+        assert "sonar (queue=1, delayed=2/4, avg_wait=0.50s, max_wait=1.25s)" in result
         mock_perplexity_client.health_check.assert_called_once()
     
     @pytest.mark.asyncio
@@ -207,6 +224,99 @@ class TestMCPTools:
         assert "Health check failed" in result
         assert "Connection error" in result
 
+    @pytest.mark.asyncio
+    async def test_perplexity_search_stream_forwards_progress(self, mock_perplexity_client):
+        """Test that streamed deltas are forwarded as progress notifications."""
+        async def fake_stream(**kwargs):
+            for text in ["Hello", ", ", "world"]:
+                yield {"choices": [{"delta": {"content": text}}]}
+            yield {"choices": [{"delta": {}, "finish_reason": "stop"}], "citations": ["https://example.com"]}
+        
+        mock_perplexity_client.stream_query = MagicMock(side_effect=fake_stream)
+        ctx = AsyncMock()
+        
+        with patch.object(server, 'perplexity_client', mock_perplexity_client), \
+             patch.object(server, 'STREAM_PROGRESS_INTERVAL', 0):
+            result = await server.perplexity_search_stream("test query", ctx, model="sonar-reasoning")
+        
+        assert result.startswith("Hello, world")
+        assert "1. https://example.com" in result
+        messages = [call.kwargs["message"] for call in ctx.report_progress.await_args_list]
+        assert messages == ["Hello", ", ", "world"]
+        assert ctx.report_progress.await_args_list[-1].kwargs["progress"] == len("Hello, world")
+        assert mock_perplexity_client.stream_query.call_args.kwargs["model"] == "sonar-reasoning"
+    
+    @pytest.mark.asyncio
+    async def test_perplexity_search_stream_error_keeps_partial_content(self, mock_perplexity_client):
+        """Test that a failing stream reports the error and the content received so far."""
+        async def failing_stream(**kwargs):
+            yield {"choices": [{"delta": {"content": "Partial"}}]}
+            raise RuntimeError("connection dropped")
+        
+        mock_perplexity_client.stream_query = MagicMock(side_effect=failing_stream)
+        
+        with patch.object(server, 'perplexity_client', mock_perplexity_client):
+            result = await server.perplexity_search_stream("test query", AsyncMock())
+        
+        assert "Research failed" in result
+        assert "connection dropped" in result
+        assert "Partial response:\nPartial" in result
+
+    @pytest.mark.asyncio
+    async def test_perplexity_batch_query_runs_concurrently_in_order(self, mock_perplexity_client):
+        """Test that batch questions run concurrently and answers keep question order."""
+        active = 0
+        peak = 0
+        
+        async def fake_query(prompt, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Later questions finish first to check ordering
+            await asyncio.sleep(0.01 * (5 - int(prompt[-1])))
+            active -= 1
+            return {"choices": [{"message": {"content": f"Answer {prompt[-1]}"}}]}
+        
+        mock_perplexity_client.query.side_effect = fake_query
+        questions = [f"Question {i}" for i in range(5)]
+        
+        with patch.object(server, 'perplexity_client', mock_perplexity_client):
+            result = await server.perplexity_batch_query(questions, max_concurrency=3)
+        
+        positions = [result.index(f"### {i + 1}. Question {i}\n\nAnswer {i}") for i in range(5)]
+        assert positions == sorted(positions)
+        assert peak == 3
+        assert mock_perplexity_client.query.call_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_perplexity_batch_query_isolates_errors(self, mock_perplexity_client):
+        """Test that one failing question does not fail the batch."""
+        async def fake_query(prompt, **kwargs):
+            if prompt == "bad":
+                raise RuntimeError("boom")
+            if prompt == "limited":
+                return {"error": "Rate limit exceeded"}
+            return {"choices": [{"message": {"content": "fine"}}]}
+        
+        mock_perplexity_client.query.side_effect = fake_query
+        
+        with patch.object(server, 'perplexity_client', mock_perplexity_client):
+            result = await server.perplexity_batch_query(["good", "bad", "limited"])
+        
+        assert "### 1. good\n\nfine" in result
+        assert "### 2. bad\n\n❌ Query failed: boom" in result
+        assert "### 3. limited\n\n❌ Query failed: Rate limit exceeded" in result
+    
+    @pytest.mark.asyncio
+    async def test_perplexity_batch_query_limits(self, mock_perplexity_client):
+        """Test empty and oversized batches are rejected without API calls."""
+        with patch.object(server, 'perplexity_client', mock_perplexity_client), \
+             patch.object(server, 'BATCH_MAX_QUESTIONS', 2):
+            assert "No questions" in await server.perplexity_batch_query([])
+            assert "Too many questions" in await server.perplexity_batch_query(["a", "b", "c"])
+        
+        mock_perplexity_client.query.assert_not_called()
+
 
 class TestServerInitialization:
     """Test cases for server initialization."""